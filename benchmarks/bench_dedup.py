@@ -0,0 +1,72 @@
+"""Benchmark of deduplicating inserts into a growing ``raw_logs`` table.
+
+Compares the former ``WHERE id NOT IN (SELECT id FROM raw_logs)`` insert with
+the primary key backed ``INSERT OR IGNORE`` used by ``ContestBase``, reporting
+the cost of one log insert as the table grows.
+
+Usage::
+
+    python benchmarks/bench_dedup.py --rows-per-log 5000 --logs 400 --every 50
+"""
+import argparse
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+
+def make_frame(log: int, rows: int) -> pd.DataFrame:
+    """Builds a QSO-like frame for one log with unique ids."""
+    rng = np.random.default_rng(log)
+    mycall = f"EA{log}X"
+    return pd.DataFrame(
+        {
+            "frequency": rng.choice([3520, 7020, 14020, 21020, 28020], rows),
+            "datetime": pd.Timestamp("2024-11-23") + pd.to_timedelta(rng.integers(0, 2880, rows), unit="m"),
+            "mycall": mycall,
+            "call": [f"K{i % 10}AB" for i in range(rows)],
+            "id": [f"{mycall}_{i}" for i in range(rows)],
+        }
+    )
+
+
+def insert_not_in(con: duckdb.DuckDBPyConnection, frame: pd.DataFrame) -> None:
+    con.register("frame", frame)
+    con.execute("INSERT INTO not_in SELECT * FROM frame WHERE id NOT IN (SELECT id FROM not_in)")
+
+
+def insert_or_ignore(con: duckdb.DuckDBPyConnection, frame: pd.DataFrame) -> None:
+    con.register("frame", frame)
+    con.execute("INSERT OR IGNORE INTO keyed BY NAME SELECT * FROM frame")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows-per-log", type=int, default=5000)
+    parser.add_argument("--logs", type=int, default=400)
+    parser.add_argument("--every", type=int, default=50, help="report every N logs")
+    args = parser.parse_args()
+
+    con = duckdb.connect()
+    con.register("frame", make_frame(0, 1))
+    con.execute("CREATE TABLE not_in AS SELECT * FROM frame WHERE FALSE")
+    con.execute("CREATE TABLE keyed AS SELECT * FROM frame WHERE FALSE")
+    con.execute("ALTER TABLE keyed ADD PRIMARY KEY (id)")
+
+    print(f"{'table rows':>12} {'NOT IN [ms]':>12} {'OR IGNORE [ms]':>15}")
+    for log in range(args.logs):
+        frame = make_frame(log, args.rows_per_log)
+        start = time.perf_counter()
+        insert_not_in(con, frame)
+        not_in = time.perf_counter() - start
+        start = time.perf_counter()
+        insert_or_ignore(con, frame)
+        ignore = time.perf_counter() - start
+        if log % args.every == 0 or log == args.logs - 1:
+            rows = (log + 1) * args.rows_per_log
+            print(f"{rows:>12,} {1000 * not_in:>12.1f} {1000 * ignore:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
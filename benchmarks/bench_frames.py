@@ -0,0 +1,87 @@
+"""Benchmark of the memory of compact QSO and spot frames, and of their insert.
+
+Compares the frames built by `LogBase.parse_qsos` and
+`ReverseBeaconReader.clean` (categoricals, narrow integers and Arrow-backed
+strings) with the same frames in the former representation (object strings and
+64-bit integers): deep memory usage and the time to insert them into a DuckDB
+table through `ContestBase.insert_frame`.
+
+Usage::
+
+    python benchmarks/bench_frames.py --logs 500 --contacts 500000 --spots 2000000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from generators import make_cabrillo_logs
+from generators import make_rbn_zip
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.log.base import QSO_SQL_TYPES
+from hamcontestlog.log.online import LogOnline
+from hamcontestlog.rbn.rbn import RBN_SPOT_TYPES
+from hamcontestlog.rbn.rbn import ReverseBeaconReader
+from hamcontestlog.utils.frames import concat_frames
+
+
+def widen(frame: pd.DataFrame) -> pd.DataFrame:
+    """The frame with object strings and 64-bit integers, as parsed before."""
+    wide = {}
+    for column, dtype in frame.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            wide[column] = frame[column].astype(np.int64)
+        elif isinstance(dtype, (pd.CategoricalDtype, pd.ArrowDtype, pd.StringDtype)):
+            wide[column] = frame[column].astype(object)
+        else:
+            wide[column] = frame[column]
+    return pd.DataFrame(wide)
+
+
+def insert_seconds(contest: ContestCQWW, table: str, frame: pd.DataFrame, types: dict) -> float:
+    with contest.write_session():
+        start = time.perf_counter()
+        contest.insert_frame(table=table, frame=frame, types=types)
+        return time.perf_counter() - start
+
+
+def report(name: str, compact: pd.DataFrame, contest: ContestCQWW, table: str, types: dict) -> None:
+    wide = widen(compact)
+    sizes = [frame.memory_usage(deep=True).sum() for frame in (wide, compact)]
+    seconds = [
+        insert_seconds(contest, f"{table}_{variant}", frame, types) for variant, frame in (("wide", wide), ("compact", compact))
+    ]
+    print(f"{name}: {len(compact):,} rows")
+    print(f"  wide:    {sizes[0] / 2**20:9.1f} MiB  insert {seconds[0]:7.3f} s")
+    print(f"  compact: {sizes[1] / 2**20:9.1f} MiB  insert {seconds[1]:7.3f} s  ({sizes[0] / sizes[1]:.1f}x smaller)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=500)
+    parser.add_argument("--contacts", type=int, default=500_000)
+    parser.add_argument("--spots", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    logs = make_cabrillo_logs(args.logs, args.contacts)
+    qsos = concat_frames([LogOnline(path=call, text=text).log for call, text in logs.items()])
+    with zipfile.ZipFile(io.BytesIO(make_rbn_zip(args.spots, missing_continents=0.0))) as z:
+        raw = ReverseBeaconReader.read_csv(z.open(z.namelist()[0]))
+    reader = ReverseBeaconReader.__new__(ReverseBeaconReader)
+    spots = reader.clean(raw)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        contest = ContestCQWW(os.path.join(tmp, "contest.duckdb"))
+        with contest.write_session():
+            contest.con.execute("CREATE SCHEMA cw2024")
+        report("QSOs", qsos, contest, "cw2024.raw_logs", QSO_SQL_TYPES)
+        report("RBN spots", spots, contest, "cw2024.raw_rbn", RBN_SPOT_TYPES)
+
+
+if __name__ == "__main__":
+    main()
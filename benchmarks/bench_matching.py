@@ -0,0 +1,67 @@
+"""Benchmark of cross-log QSO matching.
+
+Loads a synthetic contest into ``raw_logs`` and reports the time of a full
+``ContestBase.match_qsos`` run and of an incremental run after a few more logs
+arrive, checking that the incremental result equals a full run.
+
+Usage::
+
+    python benchmarks/bench_matching.py --logs 2000 --contacts 2000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from generators import make_contest_qsos
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.manifest import ManifestEntry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=2000)
+    parser.add_argument("--contacts", type=int, default=2_000_000)
+    parser.add_argument("--new-logs", type=int, default=10)
+    args = parser.parse_args()
+
+    qsos = make_contest_qsos(args.logs, args.contacts)
+    new_calls = qsos["mycall"].drop_duplicates().sample(args.new_logs, random_state=0).tolist()
+    new = qsos[qsos["mycall"].isin(new_calls)]
+    print(f"{len(qsos):,} QSOs in {args.logs:,} logs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        contest = ContestCQWW(os.path.join(tmp, "contest.duckdb"))
+        with contest.write_session():
+            contest.con.execute("CREATE SCHEMA cw2024")
+            contest.manifest("cw2024")
+            contest.insert_frame(table="cw2024.raw_logs", frame=qsos[~qsos["mycall"].isin(new_calls)])
+
+        start = time.perf_counter()
+        n_matched = contest.match_qsos("cw2024")
+        print(f"full match:         {time.perf_counter() - start:7.2f} s  {n_matched:,} QSOs")
+
+        with contest.write_session():
+            entries = [
+                ManifestEntry(call, call, call, int((new["mycall"] == call).sum()), datetime.now()) for call in new_calls
+            ]
+            contest.replace_logs(schema="cw2024", entries=entries, frames=[new])
+        start = time.perf_counter()
+        n_matched = contest.match_qsos("cw2024")
+        print(f"+{args.new_logs} logs, incremental: {time.perf_counter() - start:7.2f} s  {n_matched:,} QSOs")
+
+        statuses = contest.query("SELECT status, count(*) AS qsos FROM cw2024.qso_matches GROUP BY ALL ORDER BY ALL")
+        print(statuses.to_string(index=False))
+
+        incremental = contest.query("SELECT * FROM cw2024.qso_matches ORDER BY id")
+        contest.match_qsos("cw2024", full=True)
+        full = contest.query("SELECT * FROM cw2024.qso_matches ORDER BY id")
+        pd.testing.assert_frame_equal(incremental, full)
+        print("incremental result equals a full run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark of the correlation of QSOs with RBN spots.
+
+Builds a synthetic contest with ``--spots`` RBN spots of the stations with a
+log, and times ``ContestBase.correlate_rbn`` (as-of join) against the range
+join it replaces, which joins each QSO to all the spots of its station in the
+window and keeps the last one.
+
+Usage::
+
+    python benchmarks/bench_qso_spots.py --logs 1000 --contacts 1000000 --spots 20000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from generators import make_contest_qsos
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.rates import band_sql
+
+
+RANGE_JOIN_SQL = f"""
+    SELECT q.id, s.callsign, s.freq, s.db, s.speed
+    FROM (SELECT id, mycall, {band_sql()} AS band, CAST(datetime AS TIMESTAMP) AS datetime FROM cw2024.raw_logs) AS q
+    LEFT JOIN cw2024.raw_rbn AS s
+        ON q.mycall = s.dx AND q.band = s.band
+        AND s.datetime BETWEEN q.datetime - INTERVAL 10 MINUTE AND q.datetime
+    QUALIFY row_number() OVER (PARTITION BY q.id ORDER BY s.datetime DESC) = 1
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=1000)
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--spots", type=int, default=20_000_000)
+    parser.add_argument("--skip-range-join", action="store_true")
+    args = parser.parse_args()
+
+    qsos = make_contest_qsos(args.logs, args.contacts)
+    with tempfile.TemporaryDirectory() as tmp:
+        contest = ContestCQWW(os.path.join(tmp, "contest.duckdb"))
+        with contest.write_session():
+            contest.con.execute("CREATE SCHEMA cw2024")
+            contest.insert_frame(table="cw2024.raw_logs", frame=qsos)
+            del qsos
+            # Spots of the stations with a log, spread over the 48 hours and the bands
+            contest.con.execute(
+                f"""
+                CREATE TABLE cw2024.raw_rbn AS
+                WITH calls AS (SELECT list(DISTINCT mycall) AS calls FROM cw2024.raw_logs)
+                SELECT
+                    'SK' || (i % 300) AS callsign,
+                    [160, 80, 40, 20, 15, 10][1 + b] AS band,
+                    [1830, 3530, 7030, 14030, 21030, 28030][1 + b] + (hash(i) % 50) / 2 AS freq,
+                    calls[1 + (hash(i * 7) % len(calls))::BIGINT] AS dx,
+                    CAST(5 + hash(i * 11) % 30 AS BIGINT) AS db,
+                    CAST(20 + hash(i * 13) % 20 AS BIGINT) AS speed,
+                    TIMESTAMP '2024-11-23' + to_seconds(CAST(hash(i * 17) % 172800 AS BIGINT)) AS datetime
+                FROM (SELECT i, CAST(hash(i * 19) % 6 AS BIGINT) AS b FROM range({args.spots}) AS r(i)), calls
+                """
+            )
+        n_qsos = contest.con.execute("SELECT count(*) FROM cw2024.raw_logs").fetchone()[0]
+        n_spots = contest.con.execute("SELECT count(*) FROM cw2024.raw_rbn").fetchone()[0]
+        print(f"{n_qsos:,} QSOs, {n_spots:,} spots")
+
+        start = time.perf_counter()
+        n_correlated = contest.correlate_rbn("cw2024")
+        print(f"  as-of join: {time.perf_counter() - start:7.2f} s  {n_correlated:,} QSOs")
+        n_spotted = contest.con.execute("SELECT count(spot_skimmer) FROM cw2024.qso_spots").fetchone()[0]
+        print(f"{n_spotted:,} QSOs with a spot in the last 10 minutes")
+
+        if not args.skip_range_join:
+            start = time.perf_counter()
+            n_range = contest.con.execute(f"SELECT count(callsign) FROM ({RANGE_JOIN_SQL})").fetchone()[0]
+            print(f"  range join: {time.perf_counter() - start:7.2f} s  {n_range:,} QSOs with a spot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark of the peak memory of reading a large result: query vs query_batches.
+
+Runs an aggregation over every row of a synthetic ``raw_rbn``-sized result,
+either from one DataFrame (`ContestBase.query`) or batch by batch
+(`ContestBase.query_batches`, as DataFrames or Arrow record batches). Each
+variant runs in a fresh process so that its peak memory can be reported.
+
+Usage::
+
+    python benchmarks/bench_query_batches.py --rows 20000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_variant(variant: str, n_rows: int, storage_path: str) -> None:
+    """Runs one variant and prints its timing and peak memory as JSON."""
+    import pyarrow.compute as pc
+
+    from hamcontestlog.contest.cqww import ContestCQWW
+
+    contest = ContestCQWW(storage_path)
+    query = (
+        "SELECT 'K' || (i % 50000) || 'ABC' AS dx, 'DL' || (i % 300) || 'XYZ' AS callsign,"
+        f" 14000 + (i % 350) / 10 AS freq, i % 45 AS db FROM range({n_rows}) t(i)"
+    )
+    start = time.perf_counter()
+    if variant == "query":
+        total = int(contest.query(query)["db"].sum())
+    else:
+        batches = contest.query_batches(query, batch_size=100_000, arrow=variant == "arrow")
+        total = sum(int(batch["db"].sum()) if variant == "batches" else pc.sum(batch["db"]).as_py() for batch in batches)
+    elapsed = time.perf_counter() - start
+    with open("/proc/self/status") as f:
+        peak = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+    print(json.dumps({"seconds": elapsed, "peak": peak, "total": total}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        run_variant(args.variant, args.rows, args.db)
+        return
+
+    print(f"{args.rows:,} rows")
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in ("query", "batches", "arrow"):
+            out = subprocess.run(
+                [
+                    sys.executable, __file__, "--variant", variant, "--rows", str(args.rows),
+                    "--db", os.path.join(tmp, f"{variant}.duckdb"),
+                ],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{variant:>8}: {result['seconds']:7.2f} s  peak RSS {result['peak'] / 2**20:8.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
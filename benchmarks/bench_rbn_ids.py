@@ -0,0 +1,65 @@
+"""Benchmark of RBN spot ids: per-row SHA-256 hex strings vs vectorized 64-bit ids.
+
+Reports the time to compute the ids for one synthetic daily file and the size
+of a ``raw_rbn`` DuckDB table keyed by each kind of id.
+
+Usage::
+
+    python benchmarks/bench_rbn_ids.py --spots 1000000
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+import duckdb
+import pandas as pd
+
+from generators import make_rbn_frame
+from hamcontestlog.rbn.rbn import spot_ids
+
+
+def sha256_ids(data: pd.DataFrame) -> pd.Series:
+    """Former id: SHA-256 hex digest of a concatenated string, one Python call per row."""
+    dummy = data["dx"] + data["callsign"] + data["date"] + data["freq"].astype(str)
+    return dummy.apply(lambda val: hashlib.sha256(val.encode()).hexdigest())
+
+
+def table_size(data: pd.DataFrame) -> int:
+    """Size on disk of a DuckDB file holding ``data`` with a primary key on id."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rbn.duckdb")
+        con = duckdb.connect(path)
+        con.register("data", data)
+        con.execute("CREATE TABLE raw_rbn AS SELECT * FROM data WHERE FALSE")
+        con.execute("ALTER TABLE raw_rbn ADD PRIMARY KEY (id)")
+        con.execute("INSERT OR IGNORE INTO raw_rbn SELECT * FROM data")
+        con.execute("CHECKPOINT")
+        con.close()
+        return os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spots", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    raw = make_rbn_frame(args.spots)
+    data = raw.assign(datetime=pd.to_datetime(raw["date"]))[["callsign", "freq", "dx", "datetime", "date"]]
+
+    start = time.perf_counter()
+    old = data.drop(columns="date").assign(id=sha256_ids(data))
+    before = time.perf_counter() - start
+    start = time.perf_counter()
+    new = data.drop(columns="date").assign(id=spot_ids(data))
+    after = time.perf_counter() - start
+
+    print(f"{args.spots:,} spots")
+    print(f"sha256 hex ids: {before:8.3f} s  table {table_size(old) / 2**20:8.1f} MiB")
+    print(f"64-bit ids:     {after:8.3f} s  table {table_size(new) / 2**20:8.1f} MiB")
+    print(f"speed-up: {before / after:.1f}x, unique ids: {new['id'].nunique():,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark of RBN ingestion: pandas DataFrame vs DuckDB reading the CSV.
+
+Ingests one synthetic daily RBN file into a contest database whose
+``raw_logs`` holds ``--calls`` calls, either through ``ReverseBeaconReader`` and
+``ContestBase.add_rbn`` (pandas) or through ``ContestBase.add_rbn_csv``, where
+cleaning and the call filter run in DuckDB. Each variant runs in a fresh
+process so that its peak memory can be reported.
+
+Usage::
+
+    python benchmarks/bench_rbn_ingest.py --spots 2000000 --calls 3000
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+from generators import make_rbn_zip
+
+
+def run_variant(variant: str, path: str, n_calls: int, storage_path: str) -> None:
+    """Runs one variant and prints its timing and peak memory as JSON."""
+    from hamcontestlog.contest.cqww import ContestCQWW
+    from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+    contest = ContestCQWW(storage_path)
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.con.execute(
+            f"""
+            CREATE TABLE cw2024.raw_logs AS
+            SELECT DISTINCT dx AS mycall FROM read_csv(?, header = true) LIMIT {n_calls}
+            """,
+            [path],
+        )
+        start = time.perf_counter()
+        if variant == "pandas":
+            ReverseBeaconReader.get_raw_data = classmethod(lambda cls, url: cls.read_csv(open(path, "rb")))
+            calls = [c[0] for c in contest.con.execute("SELECT mycall FROM cw2024.raw_logs").fetchall()]
+            contest.add_rbn(schema="cw2024", rbn=ReverseBeaconReader(date=datetime.date(2024, 11, 23)), calls=calls)
+        else:
+            contest.add_rbn_csv(schema="cw2024", paths=[path])
+        elapsed = time.perf_counter() - start
+        rows = contest.con.execute("SELECT count(*) FROM cw2024.raw_rbn").fetchone()[0]
+    with open("/proc/self/status") as f:
+        peak = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+    print(json.dumps({"seconds": elapsed, "peak": peak, "rows": rows}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spots", type=int, default=2_000_000)
+    parser.add_argument("--calls", type=int, default=3000)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        run_variant(args.variant, args.path, args.calls, args.db)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with zipfile.ZipFile(io.BytesIO(make_rbn_zip(args.spots))) as z:
+            path = z.extract(z.namelist()[0], path=tmp)
+
+        print(f"{args.spots:,} spots, {args.calls:,} calls with a log")
+        for variant in ("pandas", "duckdb"):
+            out = subprocess.run(
+                [
+                    sys.executable, __file__, "--variant", variant, "--path", path,
+                    "--calls", str(args.calls), "--db", os.path.join(tmp, f"{variant}.duckdb"),
+                ],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{variant:>7}: {result['seconds']:7.2f} s  peak RSS {result['peak'] / 2**20:8.0f} MiB"
+                f"  {result['rows']:,} spots kept"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark of reading a daily RBN ZIP archive.
+
+Compares the former reader (spool the ZIP to a temporary file in 8 KB chunks,
+then ``pd.read_csv`` of all columns with inferred types) with
+``ReverseBeaconReader.get_raw_data``. Each variant runs in a fresh process so
+that its peak memory (max RSS) can be reported.
+
+Usage::
+
+    python benchmarks/bench_rbn_read.py --spots 2000000
+"""
+import argparse
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from functools import partial
+
+import pandas as pd
+import requests
+
+
+def read_tempfile(url: str) -> pd.DataFrame:
+    """Former implementation of ``ReverseBeaconReader.get_raw_data``."""
+    with requests.get(url, stream=True) as r:
+        r.raise_for_status()
+        with tempfile.NamedTemporaryFile(suffix=".zip") as tmp_file:
+            for chunk in r.iter_content(chunk_size=8192):
+                tmp_file.write(chunk)
+            tmp_file.flush()
+            with zipfile.ZipFile(tmp_file.name, "r") as z:
+                dfs = []
+                for csv_file in [f for f in z.namelist() if f.lower().endswith(".csv")]:
+                    with z.open(csv_file) as f:
+                        dfs.append(pd.read_csv(f))
+                return pd.concat(dfs, ignore_index=True)
+
+
+def run_variant(variant: str, url: str) -> None:
+    """Runs one variant and prints its timing and peak memory as JSON."""
+    from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+    start = time.perf_counter()
+    data = read_tempfile(url) if variant == "tempfile" else ReverseBeaconReader.get_raw_data(url)
+    elapsed = time.perf_counter() - start
+    # VmHWM, unlike ru_maxrss, is not inherited from the benchmark parent across exec
+    with open("/proc/self/status") as f:
+        peak = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+    print(json.dumps({"seconds": elapsed, "peak": peak, "rows": len(data), "frame": int(data.memory_usage(deep=True).sum())}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spots", type=int, default=2_000_000)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        run_variant(args.variant, args.url)
+        return
+
+    from generators import make_rbn_zip
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "20241123.zip"), "wb") as f:
+            f.write(make_rbn_zip(args.spots))
+        handler = partial(http.server.SimpleHTTPRequestHandler, directory=tmp)
+        handler.log_message = lambda *a: None
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/20241123.zip"
+
+        print(f"{args.spots:,} spots")
+        for variant in ("tempfile", "streamed"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--variant", variant, "--url", url],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{variant:>9}: {result['seconds']:7.2f} s  peak RSS {result['peak'] / 2**20:8.0f} MiB"
+                f"  frame {result['frame'] / 2**20:7.0f} MiB"
+            )
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
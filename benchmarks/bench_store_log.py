@@ -0,0 +1,88 @@
+"""Benchmark of ``LogBase.store_log`` on large synthetic multi-op logs.
+
+Compares the previous row-by-row parser (one dictionary and one
+``datetime.strptime`` call per QSO) with the columnar parser.
+
+Usage::
+
+    python benchmarks/bench_store_log.py --qsos 20000 --logs 20
+"""
+import argparse
+import io
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from generators import make_log
+from hamcontestlog.log.base import LogBase
+
+
+class LogText(LogBase):
+    def __init__(self, path: str, text: str):
+        super().__init__(path=path)
+        self.text = text
+
+    def open_file(self, path: str) -> io.StringIO:
+        return io.StringIO(self.text)
+
+
+def store_log_rowwise(log: LogText):
+    """Reference implementation of the former row-by-row parser."""
+    metadata = {}
+    qsos = []
+    with log.open_file(log.path) as f:
+        for line in f.readlines():
+            if line.startswith("QSO:"):
+                qso = line.strip().split()
+                qsos.append(
+                    {
+                        "frequency": int(qso[1]),
+                        "mode": qso[2],
+                        "datetime": datetime.strptime(f"{qso[3]} {qso[4]}", "%Y-%m-%d %H%M"),
+                        "mycall": qso[5],
+                        "myrst": int(qso[6]),
+                        "myexch": qso[7],
+                        "call": qso[8],
+                        "rst": qso[9],
+                        "exch": qso[10],
+                        "radio": 0 if len(qso) < 12 else qso[11],
+                    }
+                )
+            elif not line.startswith("X-QSO"):
+                meta_line = line.strip().split(":")
+                metadata[meta_line[0]] = meta_line[1].strip()
+    metadata_df = pd.DataFrame([metadata])
+    qsos_df = pd.DataFrame(qsos).assign(id=lambda x: x["mycall"] + "_" + x.index.astype(str))
+    return metadata_df, qsos_df
+
+
+def timed(func, logs):
+    start = time.perf_counter()
+    results = [func(log) for log in logs]
+    return time.perf_counter() - start, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--qsos", type=int, default=20000, help="QSOs per log")
+    parser.add_argument("--logs", type=int, default=10, help="number of logs")
+    args = parser.parse_args()
+
+    logs = [LogText(f"log{i}", make_log(args.qsos, seed=i)) for i in range(args.logs)]
+    before, expected = timed(store_log_rowwise, logs)
+    after, results = timed(lambda log: log.store_log(log.path), logs)
+
+    for (meta_a, qsos_a), (meta_b, qsos_b) in zip(expected, results):
+        pd.testing.assert_frame_equal(meta_a, meta_b)
+        pd.testing.assert_frame_equal(qsos_a, qsos_b)
+
+    total = args.qsos * args.logs
+    print(f"{args.logs} logs x {args.qsos} QSOs")
+    print(f"row-wise: {before:8.3f} s  ({total / before:12,.0f} QSO/s)")
+    print(f"columnar: {after:8.3f} s  ({total / after:12,.0f} QSO/s)")
+    print(f"speed-up: {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
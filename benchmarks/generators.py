@@ -0,0 +1,183 @@
+"""Deterministic synthetic data for the benchmarks."""
+from datetime import datetime
+from datetime import timedelta
+import io
+import random
+from typing import Dict
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+CONTINENTS = {"EA": "EU", "DL": "EU", "OH": "EU", "K": "NA", "VE": "NA", "JA": "AS", "PY": "SA", "VK": "OC", "ZS": "AF"}
+RBN_BANDS = {
+    "160m": 1800.0, "80m": 3500.0, "40m": 7000.0, "20m": 14000.0,
+    "15m": 21000.0, "10m": 28000.0, "2m": 144000.0, "70cm": 432000.0,
+}
+RBN_COLUMNS = [
+    "callsign", "de_pfx", "de_cont", "freq", "band", "dx", "dx_pfx",
+    "dx_cont", "mode", "db", "date", "speed", "tx_mode",
+]
+
+
+def make_calls(n_calls: int, seed: int = 0) -> pd.DataFrame:
+    """Builds ``n_calls`` distinct callsigns with their prefix and continent."""
+    rng = np.random.default_rng(seed)
+    prefixes = np.array(list(CONTINENTS))
+    rows = {}
+    while len(rows) < n_calls:
+        prefix = prefixes[rng.integers(len(prefixes))]
+        digit = rng.integers(10)
+        suffix = "".join(rng.choice(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"), rng.integers(1, 4)))
+        rows[f"{prefix}{digit}{suffix}"] = (f"{prefix}{digit}" if prefix == "K" else prefix, CONTINENTS[prefix])
+    calls = pd.DataFrame.from_dict(rows, orient="index", columns=["pfx", "cont"])
+    return calls.rename_axis("call").reset_index()
+
+
+def make_rbn_frame(
+    n_spots: int, day: str = "2024-11-23", n_calls: int = 5000, seed: int = 0, missing_continents: float = 0.1
+) -> pd.DataFrame:
+    """Builds a raw RBN daily CSV frame with ``n_spots`` spots.
+
+    A ``missing_continents`` share of the continents is left empty so that the
+    continent back-fill runs (it needs the countryfile, so offline runs use 0),
+    and a few spots are on VHF/UHF bands that get filtered.
+    """
+    rng = np.random.default_rng(seed)
+    calls = make_calls(n_calls, seed=seed)
+    skimmers = calls.sample(min(300, n_calls), random_state=seed).reset_index(drop=True)
+    de = skimmers.iloc[rng.integers(0, len(skimmers), n_spots)].reset_index(drop=True)
+    dx = calls.iloc[rng.integers(0, len(calls), n_spots)].reset_index(drop=True)
+    bands = np.array(list(RBN_BANDS))[rng.choice(len(RBN_BANDS), n_spots, p=[0.08, 0.15, 0.25, 0.25, 0.14, 0.11, 0.01, 0.01])]
+    base = pd.Series(bands).map(RBN_BANDS).to_numpy()
+    seconds = np.sort(rng.integers(0, 86400, n_spots))
+    frame = pd.DataFrame(
+        {
+            "callsign": de["call"],
+            "de_pfx": de["pfx"],
+            "de_cont": de["cont"].where(rng.random(n_spots) >= missing_continents),
+            "freq": np.round(base + rng.integers(0, 600, n_spots) / 10, 1),
+            "band": bands,
+            "dx": dx["call"],
+            "dx_pfx": dx["pfx"],
+            "dx_cont": dx["cont"].where(rng.random(n_spots) >= missing_continents),
+            "mode": "CW",
+            "db": rng.integers(1, 45, n_spots),
+            "date": (pd.Timestamp(day) + pd.to_timedelta(seconds, unit="s")).strftime("%Y-%m-%d %H:%M:%S"),
+            "speed": rng.integers(18, 40, n_spots),
+            "tx_mode": "CQ",
+        }
+    )
+    return frame[RBN_COLUMNS]
+
+
+def make_rbn_zip(n_spots: int, day: str = "2024-11-23", seed: int = 0, **kwargs) -> bytes:
+    """Builds a daily RBN history ZIP archive (``YYYYMMDD.csv`` inside).
+
+    Other keyword arguments are passed to `make_rbn_frame`.
+    """
+    frame = make_rbn_frame(n_spots, day=day, seed=seed, **kwargs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr(f"{pd.Timestamp(day):%Y%m%d}.csv", frame.to_csv(index=False))
+    return buffer.getvalue()
+
+
+def make_contest_qsos(n_logs: int, n_contacts: int, seed: int = 0) -> pd.DataFrame:
+    """Builds ``raw_logs`` rows of a contest where ``n_logs`` stations worked each other.
+
+    Each contact is logged by both stations with up to a minute of clock
+    difference, except that about 20% of the stations worked have no log.
+    About 2% of the contacts are missing in the other log (not in log), and
+    1% each have a busted call or a busted exchange.
+    """
+    rng = np.random.default_rng(seed)
+    calls = make_calls(int(n_logs * 1.25), seed=seed)["call"].to_numpy()
+    zones = rng.integers(1, 41, len(calls)).astype(str)
+    bands = np.array([1830, 3530, 7030, 14030, 21030, 28030])
+
+    a = rng.integers(0, n_logs, n_contacts)
+    b = (a + rng.integers(1, len(calls), n_contacts)) % len(calls)
+    frequency = bands[rng.integers(len(bands), size=n_contacts)] + rng.integers(0, 20, n_contacts)
+    minute = rng.integers(0, 2880, n_contacts)
+    start = np.datetime64("2024-11-23T00:00")
+
+    logged_call = calls[b].astype(object)
+    busted = rng.random(n_contacts) < 0.01
+    logged_call[busted] = [call[:-1] + ("Q" if call[-1] != "Q" else "X") for call in logged_call[busted]]
+    exch = zones[b].astype(object)
+    exch[rng.random(n_contacts) < 0.01] = "99"
+    side_a = pd.DataFrame(
+        {"mycall": calls[a], "call": logged_call, "frequency": frequency, "minute": minute,
+         "myexch": zones[a], "exch": exch}
+    )
+    back = (b < n_logs) & (rng.random(n_contacts) >= 0.02)
+    side_b = pd.DataFrame(
+        {"mycall": calls[b][back], "call": calls[a][back], "frequency": frequency[back],
+         "minute": minute[back] + rng.integers(-1, 2, back.sum()), "myexch": zones[b][back], "exch": zones[a][back]}
+    )
+    qsos = pd.concat([side_a, side_b], ignore_index=True)
+    qsos["datetime"] = start + qsos.pop("minute").clip(0).to_numpy().astype("timedelta64[m]")
+    qsos = qsos.sort_values(["mycall", "datetime"], ignore_index=True)
+    qsos["mode"] = "CW"
+    qsos["myrst"] = 599
+    qsos["rst"] = "599"
+    qsos["radio"] = "0"
+    qsos["id"] = qsos["mycall"] + "_" + qsos.groupby("mycall").cumcount().astype(str)
+    return qsos[["frequency", "mode", "datetime", "mycall", "myrst", "myexch", "call", "rst", "exch", "radio", "id"]]
+
+
+CABRILLO_HEADER = """\
+START-OF-LOG: 3.0
+CONTEST: {contest}
+CALLSIGN: {call}
+CATEGORY-OPERATOR: {operator}
+CATEGORY-TRANSMITTER: {transmitter}
+OPERATORS: {operators}
+"""
+CABRILLO_BANDS = [1830, 3520, 7020, 14020, 21020, 28020]
+
+
+def make_log(n_qsos: int, seed: int = 0) -> str:
+    """Builds a multi-op Cabrillo log with ``n_qsos`` QSOs spread over 48 hours."""
+    rng = random.Random(seed)
+    start = datetime(2024, 11, 23)
+    lines = [
+        CABRILLO_HEADER.format(
+            contest="CQ-WW-CW", call="EF6T", operator="MULTI-OP", transmitter="MULTI", operators="EA3M EA3AIR EA3KU"
+        )
+    ]
+    for i in range(n_qsos):
+        t = start + timedelta(minutes=int(i * 2880 / max(n_qsos, 1)))
+        call = "".join(rng.choice("ABCDEFGHIKLMNOPRSTUVWXYZ") for _ in range(2))
+        call += str(rng.randint(0, 9)) + "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))
+        lines.append(
+            f"QSO: {rng.choice(CABRILLO_BANDS):>6} CW {t:%Y-%m-%d %H%M} EF6T          599 14     "
+            f"{call:<13} 599 {rng.randint(1, 40):02d}     {rng.randint(0, 5)}\n"
+        )
+    lines.append("END-OF-LOG:\n")
+    return "".join(lines)
+
+
+def make_cabrillo_logs(n_logs: int, n_contacts: int, contest: str = "CQ-WW-CW", seed: int = 0) -> Dict[str, str]:
+    """Renders the logs of `make_contest_qsos` as Cabrillo files, by call.
+
+    Calls and QSOs match the RBN spots of `make_rbn_frame` with the same seed,
+    so ingesting both exercises the call filter of the RBN ingestion.
+    """
+    qsos = make_contest_qsos(n_logs, n_contacts, seed=seed)
+    lines = (
+        "QSO: " + qsos["frequency"].astype(str).str.rjust(6) + " " + qsos["mode"]
+        + " " + qsos["datetime"].dt.strftime("%Y-%m-%d %H%M") + " " + qsos["mycall"].str.ljust(13)
+        + " " + qsos["myrst"].astype(str) + " " + qsos["myexch"].str.ljust(6)
+        + " " + qsos["call"].str.ljust(13) + " " + qsos["rst"] + " " + qsos["exch"].str.ljust(6)
+        + " " + qsos["radio"] + "\n"
+    )
+    logs = {}
+    for call, body in lines.groupby(qsos["mycall"], sort=False):
+        header = CABRILLO_HEADER.format(
+            contest=contest, call=call, operator="SINGLE-OP", transmitter="ONE", operators=call
+        )
+        logs[call] = header + "".join(body) + "END-OF-LOG:\n"
+    return logs
@@ -0,0 +1,191 @@
+"""End-to-end ingestion benchmarks, run offline and stored as JSON.
+
+Synthetic CQWW/IARU logs and RBN days are served by a local `ContestSite`, and
+each case runs the public entry points against it in a fresh database:
+
+* ``store_log``: `LogBase.store_log` on the Cabrillo logs, already in memory,
+* ``rbn_load``: `ReverseBeaconReader` download, parse and clean of one day,
+* ``ingest_cqww`` / ``ingest_iaru``: `ContestBase.add_online_logs`,
+* ``ingest_rbn_duckdb`` / ``ingest_rbn_pandas``: `ContestBase.add_online_rbn`
+  (with `ContestBase.add_rbn_csv` and `ContestBase.add_rbn`) after the logs.
+
+The seconds, rows and per-stage profile of each case are written to
+``benchmarks/results/{timestamp}.json`` together with the parameters and the
+git commit; ``--compare`` prints the speed-up against an earlier result.
+The HTTP cache and the RBN archive are disabled, so that every run downloads.
+
+Usage::
+
+    python benchmarks/run.py --logs 500 --contacts 300000 --spots 1000000
+    python benchmarks/run.py --compare benchmarks/results/20241123-120000.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+from generators import make_cabrillo_logs
+from generators import make_rbn_zip
+from server import ContestSite
+from server import local_urls
+
+
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+YEAR = 2024
+MODE = "cw"
+
+
+def run_case(func: Callable[[], int]) -> Dict[str, object]:
+    """Times one case, returning its seconds, rows and profiled stages."""
+    from hamcontestlog.utils.profiling import profiling
+
+    with profiling() as profiler:
+        start = time.perf_counter()
+        rows = func()
+        seconds = time.perf_counter() - start
+    stages = {
+        name: {
+            "wall": s.wall, "busy": s.busy, "tasks": s.tasks, "rows": s.rows, "bytes": s.bytes,
+            "retries": s.retries, "cache_hits": s.cache_hits, "failures": s.failures,
+        }
+        for name, s in profiler.stages.items()
+    }
+    return {"seconds": seconds, "rows": rows, "rows_per_second": rows / seconds if seconds else None, "stages": stages}
+
+
+def count_rows(contest, table: str) -> int:
+    return contest.con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+
+def run_cases(logs: Dict[str, str], site: ContestSite, directory: str, cases: list) -> Dict[str, Dict[str, object]]:
+    from hamcontestlog.contest.cqww import ContestCQWW
+    from hamcontestlog.contest.iaru import ContestIARU
+    from hamcontestlog.log.online import LogOnline
+    from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+    def store_log() -> int:
+        return sum(len(LogOnline(path=call, text=text).log) for call, text in logs.items())
+
+    def rbn_load() -> int:
+        day = ContestCQWW.contest_dates(year=YEAR, mode=MODE)[0]
+        return len(ReverseBeaconReader(date=day).data)
+
+    def ingest(contest_class: type) -> Callable[[], int]:
+        def run() -> int:
+            contest = contest_class(os.path.join(directory, f"{contest_class.__name__}.duckdb"))
+            contest.add_online_logs(year=YEAR, mode=MODE)
+            return count_rows(contest, f"{MODE}{YEAR}.raw_logs")
+        return run
+
+    def ingest_rbn(engine: str) -> Callable[[], int]:
+        def run() -> int:
+            path = os.path.join(directory, f"rbn_{engine}.duckdb")
+            contest = ContestCQWW(path)
+            with contest.write_session():
+                contest.con.execute(f"CREATE SCHEMA {MODE}{YEAR}")
+                contest.con.execute(f"ATTACH '{os.path.join(directory, 'ContestCQWW.duckdb')}' AS logs (READ_ONLY)")
+                contest.con.execute(f"CREATE TABLE {MODE}{YEAR}.raw_logs AS SELECT * FROM logs.{MODE}{YEAR}.raw_logs")
+                contest.con.execute("DETACH logs")
+            contest.add_online_rbn(years=[YEAR], mode=MODE, engine=engine)
+            return count_rows(contest, f"{MODE}{YEAR}.raw_rbn")
+        return run
+
+    available = {
+        "store_log": store_log,
+        "rbn_load": rbn_load,
+        "ingest_cqww": ingest(ContestCQWW),
+        "ingest_iaru": ingest(ContestIARU),
+        "ingest_rbn_duckdb": ingest_rbn("duckdb"),
+        "ingest_rbn_pandas": ingest_rbn("pandas"),
+    }
+    results = {}
+    with local_urls(site.url):
+        for name in cases:
+            results[name] = run_case(available[name])
+            print(f"{name:<18} {results[name]['seconds']:8.2f} s  {results[name]['rows']:>12,} rows", flush=True)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(results: Dict[str, Dict[str, object]], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"\nagainst {baseline_path}")
+    for name, result in results.items():
+        if name in baseline:
+            before = baseline[name]["seconds"]
+            print(f"{name:<18} {before:8.2f} s -> {result['seconds']:8.2f} s  ({before / result['seconds']:5.2f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=200, help="stations with a log")
+    parser.add_argument("--contacts", type=int, default=100_000, help="contacts between them")
+    parser.add_argument("--spots", type=int, default=500_000, help="RBN spots per day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--case", dest="cases", action="append", help="run only these cases (repeatable)")
+    parser.add_argument("--output", help="result file [default: results/{timestamp}.json]")
+    parser.add_argument("--compare", help="earlier result file to compare with")
+    args = parser.parse_args()
+    cases = args.cases or [
+        "store_log", "rbn_load", "ingest_cqww", "ingest_iaru", "ingest_rbn_duckdb", "ingest_rbn_pandas"
+    ]
+    if any(case.startswith("ingest_rbn") for case in cases) and "ingest_cqww" not in cases:
+        parser.error("the ingest_rbn cases need the ingest_cqww case")
+    for name in ("HAMCONTESTLOG_CACHE_DIR", "HAMCONTESTLOG_RBN_ARCHIVE"):
+        os.environ.pop(name, None)
+
+    from hamcontestlog.contest.cqww import ContestCQWW
+
+    start = time.perf_counter()
+    logs = make_cabrillo_logs(args.logs, args.contacts, seed=args.seed)
+    # Spots use the calls of the logs, and all their continents are known so
+    # that no countryfile is needed offline
+    rbn_days = {
+        f"{day:%Y%m%d}": make_rbn_zip(
+            args.spots, day=str(day), seed=args.seed, n_calls=int(args.logs * 1.25), missing_continents=0.0
+        )
+        for day in ContestCQWW.contest_dates(year=YEAR, mode=MODE)
+    }
+    print(f"{args.logs:,} logs, {args.contacts:,} contacts, {args.spots:,} spots/day"
+          f" generated in {time.perf_counter() - start:.1f} s")
+
+    with tempfile.TemporaryDirectory() as directory, ContestSite(logs, rbn_days, year=YEAR, mode=MODE) as site:
+        results = run_cases(logs, site, directory, cases)
+
+    output = args.output or os.path.join(RESULTS_DIRECTORY, f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "parameters": {"logs": args.logs, "contacts": args.contacts, "spots": args.spots, "seed": args.seed},
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
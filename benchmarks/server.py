@@ -0,0 +1,116 @@
+"""Local HTTP stand-in for the sites the ingestion downloads from.
+
+`ContestSite` serves synthetic content on the paths of the real endpoints:
+
+* cqww.com: ``/publiclogs/{year}{mode}/`` (index of logs) and
+  ``/publiclogs/{year}{mode}/{call_hash}`` (Cabrillo log),
+* contests.arrl.org: ``/publiclogs.php`` and ``/showpubliclog.php?q={call_hash}``,
+* data.reversebeacon.net: ``/rbn_history/{YYYYMMDD}.zip``.
+
+All bodies are built before the server starts, so that generating them is not
+timed, and `local_urls` points the contest and RBN classes to the server.
+
+Usage::
+
+    with ContestSite(logs, rbn_days) as site, local_urls(site.url):
+        ContestCQWW(path).add_online_logs(year=2024, mode="cw")
+"""
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import threading
+from typing import Dict, Iterator, Tuple
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+
+class ContestSite:
+    """
+    Threaded HTTP server with the logs of one contest and daily RBN archives.
+
+    Args:
+        logs (Dict[str, str]): Cabrillo text of each call.
+        rbn_days (Dict[str, bytes]): ZIP archive of each day, as ``YYYYMMDD``.
+        year (int): Contest year of the cqww.com index.
+        mode (str): Contest mode of the cqww.com index.
+    """
+
+    def __init__(self, logs: Dict[str, str], rbn_days: Dict[str, bytes], year: int = 2024, mode: str = "cw"):
+        hashes = {call: f"{call.lower().replace('/', '-')}.log" for call in logs}
+        index = "".join(f"<a href='{hashes[call]}'>{call}</a>\n" for call in logs).encode()
+        self.pages: Dict[str, Tuple[str, bytes]] = {
+            f"/publiclogs/{year}{mode}/": ("text/html", index),
+            "/publiclogs.php": ("text/html", index),
+            **{f"/publiclogs/{year}{mode}/{hashes[call]}": ("text/plain", text.encode()) for call, text in logs.items()},
+            **{f"/showpubliclog.php?q={hashes[call]}": ("text/plain", text.encode()) for call, text in logs.items()},
+            **{f"/rbn_history/{day}.zip": ("application/zip", body) for day, body in rbn_days.items()},
+        }
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handler(self) -> type:
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                key = url.path
+                if url.path == "/showpubliclog.php":
+                    key = f"{url.path}?q={parse_qs(url.query).get('q', [''])[0]}"
+                site.requests += 1
+                if key not in site.pages:
+                    self.send_error(404)
+                    return
+                content_type, body = site.pages[key]
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "ContestSite":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+@contextmanager
+def local_urls(base: str) -> Iterator[None]:
+    """Point the URL templates of the CQWW, IARU and RBN classes to ``base``."""
+    from hamcontestlog.contest.cqww import ContestCQWW
+    from hamcontestlog.contest.iaru import ContestIARU
+    from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+    urls = {
+        (ContestCQWW, "url_contest_participants"): f"{base}/publiclogs/{{year}}{{mode}}/",
+        (ContestCQWW, "url_contest_log"): f"{base}/publiclogs/{{year}}{{mode}}/{{call_hash}}",
+        (ContestIARU, "url_contest_participants"): f"{base}/publiclogs.php?eid=4&iid=1053",
+        (ContestIARU, "url_contest_log"): f"{base}/showpubliclog.php?q={{call_hash}}",
+        (ReverseBeaconReader, "url_history"): f"{base}/rbn_history/{{date:%Y%m%d}}.zip",
+    }
+    previous = {key: getattr(*key) for key in urls}
+    for (cls, name), url in urls.items():
+        setattr(cls, name, url)
+    try:
+        yield
+    finally:
+        for (cls, name), url in previous.items():
+            setattr(cls, name, url)
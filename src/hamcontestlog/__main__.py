@@ -1,12 +1,221 @@
-"""Command-line interface."""
+"""Command-line interface.
+
+Contest, pandas and DuckDB modules are imported inside the commands, so that
+``hamcontestlog --help`` and argument errors don't pay for them.
+"""
+
+from contextlib import contextmanager
+from importlib import import_module
+import logging
+import os
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
 
 import click
 
+if TYPE_CHECKING:
+    from hamcontestlog.contest.base import ContestBase
+
+
+# Contest classes by command line name, as "module:class"
+CONTESTS = {
+    "cqww": "hamcontestlog.contest.cqww:ContestCQWW",
+    "iaru": "hamcontestlog.contest.iaru:ContestIARU",
+}
+
+
+class EchoHandler(logging.Handler):
+    """Print log records on stderr, where the CLI reports progress."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        click.echo(self.format(record), err=True)
 
-@click.command()
+
+@contextmanager
+def echo_logs(level: int) -> Iterator[None]:
+    """Print the progress and warnings that the library logs, for the enclosed block."""
+    logger = logging.getLogger("hamcontestlog")
+    handler = EchoHandler()
+    previous = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    try:
+        yield
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(previous)
+
+
+def open_contest(ctx: click.Context) -> "ContestBase":
+    """Build the contest selected on the command line, once per invocation."""
+    options = ctx.find_root().obj
+    if options.get("contest") is None:
+        if options["storage_path"] is None:
+            raise click.UsageError("Missing option '--db' (or HAMCONTESTLOG_DB).", ctx=ctx)
+        module, name = CONTESTS[options["contest_name"]].split(":")
+        contest_class = getattr(import_module(module), name)
+        contest = options["contest"] = contest_class(options["storage_path"], threads=options["threads"])
+        # Write sessions replace the connection, so close the current one
+        ctx.find_root().call_on_close(lambda: contest.con.close())
+    return options["contest"]
+
+
+@click.group()
 @click.version_option()
-def main() -> None:
+@click.option(
+    "--db",
+    "storage_path",
+    envvar="HAMCONTESTLOG_DB",
+    type=click.Path(dir_okay=False),
+    help="DuckDB database of the contest (or HAMCONTESTLOG_DB).",
+)
+@click.option("--contest", "contest_name", type=click.Choice(sorted(CONTESTS)), default="cqww", show_default=True)
+@click.option("--threads", type=click.IntRange(min=1), help="DuckDB threads for writes and queries [default: all cores].")
+@click.option("--profile", is_flag=True, help="Print wall time, rows/s and bytes/s of each stage at the end.")
+@click.option("-v", "--verbose", is_flag=True, help="Also print every log ingested.")
+@click.pass_context
+def main(
+    ctx: click.Context,
+    storage_path: Optional[str],
+    contest_name: str,
+    threads: Optional[int],
+    profile: bool,
+    verbose: bool,
+) -> None:
     """HamContestLog."""
+    ctx.obj = {"storage_path": storage_path, "contest_name": contest_name, "threads": threads}
+    ctx.with_resource(echo_logs(logging.DEBUG if verbose else logging.INFO))
+    if profile:
+        from hamcontestlog.utils.profiling import profiling
+
+        profiler = ctx.with_resource(profiling())
+        ctx.call_on_close(lambda: click.echo(profiler.report(), err=True))
+
+
+@main.group()
+def ingest() -> None:
+    """Ingest contest logs or RBN spots."""
+
+
+@ingest.command("logs")
+@click.option("--year", type=int, help="Contest year, to download the public logs.")
+@click.option("--mode", default="cw", show_default=True, help="Contest mode.")
+@click.option("--call", "calls", multiple=True, help="Only download the logs of these calls (repeatable).")
+@click.option("--path", "path_or_glob", help="Parse local Cabrillo files (file, directory or glob) instead.")
+@click.option("--schema", help="Schema of local logs [default: MODE + YEAR].")
+@click.option("--download-workers", type=click.IntRange(min=1), default=8, show_default=True, help="Concurrent downloads, parsed on the same threads.")
+@click.option("--parse-workers", type=click.IntRange(min=1), help="Processes parsing local files [default: all cores].")
+@click.option("--batch-size", type=click.IntRange(min=1), help="Parse downloaded logs in batches of this many QSOs (each log is still held in memory whole).")
+@click.option("--batch-logs", type=click.IntRange(min=1), default=200, show_default=True, help="Logs per write transaction.")
+@click.option("--batch-rows", type=click.IntRange(min=1), default=1_000_000, show_default=True, help="QSOs per write transaction of local logs.")
+@click.pass_context
+def ingest_logs(
+    ctx: click.Context,
+    year: Optional[int],
+    mode: str,
+    calls: Tuple[str, ...],
+    path_or_glob: Optional[str],
+    schema: Optional[str],
+    download_workers: int,
+    parse_workers: Optional[int],
+    batch_size: Optional[int],
+    batch_logs: int,
+    batch_rows: int,
+) -> None:
+    """Download the public logs of a contest year, or parse local ones."""
+    if path_or_glob is None and year is None:
+        raise click.UsageError("Give --year to download logs or --path to parse local ones.", ctx=ctx)
+    if path_or_glob is not None and schema is None and year is None:
+        raise click.UsageError("Give --schema or --year for local logs.", ctx=ctx)
+    contest = open_contest(ctx)
+    if path_or_glob is not None:
+        contest.add_local_logs(
+            path_or_glob=path_or_glob,
+            schema=schema or f"{mode.lower()}{year}",
+            workers=parse_workers,
+            batch_rows=batch_rows,
+        )
+    else:
+        contest.add_online_logs(
+            year=year,
+            mode=mode,
+            calls=list(calls) or None,
+            batch_size=batch_size,
+            workers=download_workers,
+            batch_logs=batch_logs,
+        )
+
+
+@ingest.command("rbn")
+@click.option("--year", "years", type=int, multiple=True, help="Contest years (repeatable) [default: years with logs].")
+@click.option("--mode", default="cw", show_default=True, help="Contest mode.")
+@click.option("--engine", type=click.Choice(["duckdb", "pandas"]), default="duckdb", show_default=True)
+@click.option("--download-workers", type=click.IntRange(min=1), default=4, show_default=True, help="Days downloaded and cleaned at once.")
+@click.pass_context
+def ingest_rbn(ctx: click.Context, years: Tuple[int, ...], mode: str, engine: str, download_workers: int) -> None:
+    """Add the RBN spots of the calls with a log, for the days of each contest."""
+    open_contest(ctx).add_online_rbn(years=list(years) or None, mode=mode, engine=engine, workers=download_workers)
+
+
+@main.command()
+@click.argument("sql")
+@click.option("--format", "output_format", type=click.Choice(["table", "csv", "json"]), default="table", show_default=True)
+@click.pass_context
+def query(ctx: click.Context, sql: str, output_format: str) -> None:
+    """Run a SQL query and print its result."""
+    from hamcontestlog.utils.profiling import stage
+
+    contest = open_contest(ctx)
+    with stage("query") as task:
+        result = contest.query(sql)
+        task.add(rows=len(result))
+    if output_format == "csv":
+        click.echo(result.to_csv(index=False), nl=False)
+    elif output_format == "json":
+        click.echo(result.to_json(orient="records", date_format="iso"))
+    else:
+        click.echo(result.to_string(index=False))
+
+
+@main.command()
+@click.argument("source")
+@click.argument("output", type=click.Path(dir_okay=False, writable=True))
+@click.pass_context
+def export(ctx: click.Context, source: str, output: str) -> None:
+    """Write a table or the result of a SQL query to OUTPUT (.parquet, .csv or .json)."""
+    try:
+        n_rows = open_contest(ctx).export(query=source, path=os.path.abspath(output))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="OUTPUT") from e
+    click.echo(f"{n_rows} rows written to {output}")
+
+
+@main.command("export-schema")
+@click.argument("schema")
+@click.argument("directory", type=click.Path(file_okay=False, writable=True))
+@click.pass_context
+def export_schema(ctx: click.Context, schema: str, directory: str) -> None:
+    """Write every table of SCHEMA to a Parquet dataset in DIRECTORY."""
+    try:
+        counts = open_contest(ctx).export_schema(schema=schema, directory=os.path.abspath(directory))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="SCHEMA") from e
+    for table, n_rows in counts.items():
+        click.echo(f"{schema}.{table}: {n_rows} rows")
+
+
+@main.command("import-schema")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--schema", help="Schema to load into [default: the exported one].")
+@click.option("--replace", is_flag=True, help="Overwrite tables that already exist.")
+@click.pass_context
+def import_schema(ctx: click.Context, directory: str, schema: Optional[str], replace: bool) -> None:
+    """Load a schema written by export-schema from DIRECTORY."""
+    try:
+        counts = open_contest(ctx).import_schema(directory=os.path.abspath(directory), schema=schema, replace=replace)
+    except ValueError as e:
+        raise click.UsageError(f"{e} (use --replace to overwrite them)", ctx=ctx) from e
+    for table, n_rows in counts.items():
+        click.echo(f"{table}: {n_rows} rows")
 
 
 if __name__ == "__main__":
@@ -1,40 +1,151 @@
 """Base class for contests"""
 from abc import ABC
 from abc import abstractmethod
-from typing import Dict, List, Optional
-import os
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+import calendar
+from contextlib import contextmanager
 import functools
+import glob
+import inspect
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import uuid
+import zipfile
 from datetime import date
+from datetime import datetime
+from datetime import timedelta
 
 import duckdb
 from duckdb import DuckDBPyConnection
 from duckdb import IOException
 import pandas as pd
+from requests import RequestException
 
+from hamcontestlog.contest.manifest import MANIFEST_TABLE
+from hamcontestlog.contest.manifest import ManifestEntry
+from hamcontestlog.contest.manifest import hash_content
+from hamcontestlog.contest.manifest import source_key
+from hamcontestlog.contest.manifest import with_source_ids
+from hamcontestlog.contest.matching import MATCHES_TABLE
+from hamcontestlog.contest.matching import PENDING_TABLE
+from hamcontestlog.contest.matching import QsoMatcher
+from hamcontestlog.contest.rates import RATE_TABLES
+from hamcontestlog.contest.rates import rates_sql
+from hamcontestlog.contest.spots import SPOTS_TABLE
+from hamcontestlog.contest.spots import qso_spots_sql
+from hamcontestlog.contest.writer import IngestWriter
+from hamcontestlog.log.base import LOG_PARSE_ERRORS
+from hamcontestlog.log.base import QSO_SQL_TYPES
 from hamcontestlog.log.base import LogBase
+from hamcontestlog.log.local import LogLocal
 from hamcontestlog.log.online import LogOnline
+from hamcontestlog.rbn.archive import RbnArchive
+from hamcontestlog.rbn.archive import get_rbn_archive
+from hamcontestlog.rbn.rbn import RBN_CLEAN_SQL
+from hamcontestlog.rbn.rbn import RBN_SPOT_TYPES
+from hamcontestlog.rbn.rbn import SPOT_ID_SQL
 from hamcontestlog.rbn.rbn import ReverseBeaconReader
+from hamcontestlog.rbn.rbn import create_continents_table
+from hamcontestlog.rbn.rbn import read_csv_sql
+from hamcontestlog.utils.concurrency import bounded_map
+from hamcontestlog.utils.frames import concat_frames
+from hamcontestlog.utils.frames import sql_casts
+from hamcontestlog.utils.http import fetch
+from hamcontestlog.utils.http import get_session
+from hamcontestlog.utils.prefixes import CALLS_INFO_TABLE
+from hamcontestlog.utils.prefixes import PREFIXES_TABLE
+from hamcontestlog.utils.prefixes import calls_info_sql
+from hamcontestlog.utils.prefixes import create_prefix_table
+from hamcontestlog.utils.profiling import Profiler
+from hamcontestlog.utils.profiling import hooked
+from hamcontestlog.utils.profiling import stage
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+logger = logging.getLogger(__name__)
+
+CABRILLO_EXTENSIONS = (".log", ".cbr")
+
+
+def find_cabrillo_files(path_or_glob: str) -> List[str]:
+    """List Cabrillo files in a directory (recursively), a glob pattern or a single file"""
+    if os.path.isdir(path_or_glob):
+        paths = glob.glob(os.path.join(path_or_glob, "**", "*"), recursive=True)
+        return sorted(p for p in paths if p.lower().endswith(CABRILLO_EXTENSIONS) and os.path.isfile(p))
+    return sorted(p for p in glob.glob(path_or_glob, recursive=True) if os.path.isfile(p))
+
+
+def parse_local_logs(
+    tasks: List[Tuple[str, Optional[str]]]
+) -> Tuple[List[ManifestEntry], pd.DataFrame, List[Tuple[str, str]]]:
+    """
+    Parse a chunk of local logs into one frame, skipping files whose content hash is unchanged (runs in worker processes).
+
+    Files that can't be parsed are returned with their error, to be reported by the parent process.
+    """
+    entries = []
+    frames = []
+    skipped = []
+    for path, known_hash in tasks:
+        with open(path, "rb") as f:
+            content_hash = hash_content(f.read())
+        if content_hash == known_hash:
+            continue
+        try:
+            frame = LogLocal(path=path).log
+        except LOG_PARSE_ERRORS as e:
+            skipped.append((path, str(e)))
+            continue
+        if frame.empty:
+            continue
+        entries.append(ManifestEntry(path, content_hash, frame["mycall"].iloc[0], len(frame), datetime.now()))
+        frames.append(with_source_ids(frame, path))
+    return entries, concat_frames(frames) if frames else pd.DataFrame(), skipped
+
+
+# Per-stage timings and counts of every ingestion run, in the main schema
+INGEST_STATS_TABLE = "ingest_stats"
+
+# Table list of a schema exported with `ContestBase.export_schema`
+SCHEMA_METADATA_FILE = "schema.json"
 
 
+def full_weekend(year: int, month: int, n: int) -> date:
+    """Saturday of the n-th full weekend of a month (counting from the end if n is negative)"""
+    # A Saturday on the last day of the month has its Sunday in the next one
+    last_day = calendar.monthrange(year, month)[1]
+    saturdays = [date(year, month, day) for day in range(1, last_day) if date(year, month, day).weekday() == 5]
+    return saturdays[n - 1 if n > 0 else n]
+
 
 def with_write_access(method):
-    """Decorator to temporarily switch to write mode for a method"""
+    """Decorator to run a method inside a write session"""
     @functools.wraps(method)
     def wrapper(self, *args, **kwargs):
-        # Close the current read-only connection
-        if self.con:
-            self.con.close()
-        # Open a new connection in write mode
-        self.con = duckdb.connect(self.storage_path, read_only=False)
-        try:
-            # Execute the method
-            result = method(self, *args, **kwargs)
-        finally:
-            # Close write connection
-            self.con.close()
-            # Reopen in read-only mode
-            self.con = duckdb.connect(self.storage_path, read_only=True)
-        return result
+        with self.write_session():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def with_ingest_stats(method):
+    """Decorator recording the stages of an ingestion method in ingest_stats (inside a write session)"""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        arguments.pop("self")
+        with self.record_ingest(command=method.__name__, arguments=arguments):
+            return method(self, *args, **kwargs)
     return wrapper
 
 
@@ -42,47 +153,457 @@ class ContestBase(ABC):
     url_contest_participants: str
     url_contest_log: str
 
-    def __init__(self, storage_path: str):
+    def __init__(self, storage_path: str, threads: Optional[int] = None):
         self.storage_path = storage_path
+        # DuckDB worker threads of every connection, all cores by default
+        self.threads = threads
+        self._keyed_tables: Set[str] = set()
+        self._migrated_tables: Set[str] = set()
+        self._in_transaction = False
+        self._write_depth = 0
         try:
-            self.con: DuckDBPyConnection = duckdb.connect(self.storage_path, read_only=True)
+            self.con: DuckDBPyConnection = self.connect(read_only=True)
         except IOException:
-            self.con: DuckDBPyConnection = duckdb.connect(self.storage_path, read_only=False)
+            self.con: DuckDBPyConnection = self.connect(read_only=False)
+
+    def connect(self, read_only: bool) -> DuckDBPyConnection:
+        config = {} if self.threads is None else {"threads": self.threads}
+        return duckdb.connect(self.storage_path, read_only=read_only, config=config)
 
     def __del__(self):
         self.con.close()
 
+    @contextmanager
+    def write_session(self):
+        """
+        Hold one read-write connection for the enclosed block.
+
+        The read-only connection is closed on entry and reopened only when the
+        outermost session ends, so nested sessions and decorated methods called
+        within one share the same connection instead of reconnecting.
+        """
+        if self._write_depth:
+            self._write_depth += 1
+            try:
+                yield self
+            finally:
+                self._write_depth -= 1
+            return
+        # Close the current read-only connection and open one in write mode
+        if self.con:
+            self.con.close()
+        self.con = self.connect(read_only=False)
+        self._write_depth = 1
+        try:
+            yield self
+        finally:
+            self._write_depth = 0
+            # Close write connection and reopen in read-only mode
+            self.con.close()
+            self.con = self.connect(read_only=True)
+
     def add_log(self, schema: str, log: LogBase):
-        self.con.register("log", log.log)
-        # Create the target table if it doesn’t exist
-        self.con.execute(f"""
-            -- Create the table if it doesn't exist
-            CREATE TABLE IF NOT EXISTS {schema}.raw_logs AS 
-            SELECT * FROM log WHERE FALSE;
-
-            -- Insert only new rows by avoiding duplicates
-            INSERT INTO {schema}.raw_logs
-            SELECT * FROM log
-            WHERE id NOT IN (SELECT id FROM {schema}.raw_logs);
-        """)
+        # Streaming logs are inserted batch by batch to keep memory bounded
+        frames = log.iter_log() if log.streaming else [log.log]
+        mycalls: Set[str] = set()
+        for frame in frames:
+            self.insert_log_frame(schema=schema, frame=frame)
+            mycalls.update(frame["mycall"].unique())
+        self.update_rates(schema=schema, mycalls=sorted(mycalls))
+        self.mark_unmatched(schema=schema, mycalls=sorted(mycalls))
+
+    def insert_log_frame(self, schema: str, frame: pd.DataFrame):
+        self.insert_frame(table=f"{schema}.raw_logs", frame=frame, types=QSO_SQL_TYPES)
+
+    def add_rbn(self, schema: str, rbn: ReverseBeaconReader, calls: Optional[List[str]] = None) -> int:
+        data = rbn.data if not calls else rbn.data[rbn.data["dx"].isin(calls)]
+        self.migrate_rbn_ids(schema=schema)
+        return self.insert_frame(table=f"{schema}.raw_rbn", frame=data, types=RBN_SPOT_TYPES)
+
+    def migrate_rbn_ids(self, schema: str):
+        """Convert a raw_rbn table with SHA-256 string ids to 64-bit spot ids"""
+        table = f"{schema}.raw_rbn"
+        if table in self._migrated_tables:
+            return
+        id_type = self.con.execute(
+            """
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = ? AND table_name = 'raw_rbn' AND column_name = 'id'
+            """,
+            [schema],
+        ).fetchone()
+        if id_type is None:
+            # The table will be created with the new ids
+            return
+        if id_type[0] == "VARCHAR":
+            with self.transaction():
+                self.con.execute(f"""
+                    CREATE TABLE {table}__ids AS
+                    SELECT * FROM (SELECT * REPLACE ({SPOT_ID_SQL} AS id) FROM {table})
+                    QUALIFY row_number() OVER (PARTITION BY id) = 1;
+                    DROP TABLE {table};
+                    ALTER TABLE {table}__ids RENAME TO raw_rbn;
+                    ALTER TABLE {table} ADD PRIMARY KEY (id);
+                """)
+            self._keyed_tables.add(table)
+        self._migrated_tables.add(table)
+
+    def add_rbn_csv(self, schema: str, paths: List[str], calls: Optional[List[str]] = None) -> int:
+        """
+        Insert RBN spots read by DuckDB straight from extracted CSV files.
+
+        Cleaning, band parsing, continent filling and spot ids run as SQL, as
+        in `ReverseBeaconReader.load`. Spots are kept only for the given calls,
+        or else for the calls with a log in the schema, through a semi-join
+        applied while reading the files, so other spots are never materialized.
+        """
+        call_filter, params = self.rbn_call_filter(schema=schema, calls=calls)
+        self.migrate_rbn_ids(schema=schema)
+        try:
+            self.con.execute(
+                f"CREATE OR REPLACE TEMP TABLE rbn_spots AS SELECT * FROM ({read_csv_sql(paths)}) {call_filter}",
+                params,
+            )
+            create_continents_table(self.con, spots="rbn_spots", name="rbn_continents")
+            with self.transaction():
+                return self.insert_query(
+                    table=f"{schema}.raw_rbn",
+                    query=RBN_CLEAN_SQL.format(spots="rbn_spots", continents="rbn_continents"),
+                )
+        finally:
+            self.con.execute("DROP TABLE IF EXISTS rbn_spots; DROP TABLE IF EXISTS rbn_continents")
 
-    def add_rbn(self, schema: str, rbn: ReverseBeaconReader, calls: Optional[List[str]] = None):
-        data = rbn.data if not calls else rbn.data.query(f"dx.isin({calls})")
-        self.con.register("rbn", data)
+    def add_rbn_archive(
+        self, schema: str, archive: RbnArchive, dates: List[date], calls: Optional[List[str]] = None
+    ) -> int:
+        """
+        Insert cleaned RBN spots of the given days from the local archive.
+
+        Only the Parquet files of those days are scanned, and spots are kept for
+        the same calls as in `add_rbn_csv`.
+        """
+        scan = archive.scan_sql(dates=dates)
+        if scan is None:
+            return 0
+        call_filter, params = self.rbn_call_filter(schema=schema, calls=calls)
+        self.migrate_rbn_ids(schema=schema)
+        with self.transaction():
+            return self.insert_query(table=f"{schema}.raw_rbn", query=f"SELECT * FROM ({scan}) {call_filter}", params=params)
+
+    def rbn_call_filter(self, schema: str, calls: Optional[List[str]] = None) -> Tuple[str, List[object]]:
+        """
+        WHERE clause (and its parameters) keeping the spots of the given calls, or of the calls with a log.
+
+        An empty list of calls keeps every spot, as in `add_rbn`.
+        """
+        if calls:
+            return "WHERE dx IN (SELECT unnest(?::VARCHAR[]))", [calls]
+        if calls is None and self.has_table(schema=schema, table="raw_logs"):
+            return f"WHERE dx IN (SELECT mycall FROM {schema}.raw_logs)", []
+        return "", []
+
+    def insert_frame(self, table: str, frame: pd.DataFrame, types: Optional[Dict[str, str]] = None) -> int:
+        """
+        Insert the rows of a frame whose id is not in the table yet, returning how many were inserted.
+
+        The frame is scanned in place; with `types`, its columns are cast to
+        those DuckDB types so that compact dtypes (categoricals read as ENUMs,
+        narrow integers) don't define the columns of new tables.
+        """
+        query = f"SELECT {', '.join(sql_casts(types))} FROM frame" if types else "SELECT * FROM frame"
+        self.con.register("frame", frame)
+        try:
+            return self.insert_query(table=table, query=query)
+        finally:
+            self.con.unregister("frame")
+
+    def insert_query(self, table: str, query: str, params: Optional[List[object]] = None) -> int:
+        """Insert the rows of a query whose id is not in the table yet, returning how many were inserted"""
         # Create the target table if it doesn’t exist
+        self.con.execute(f"CREATE TABLE IF NOT EXISTS {table} AS SELECT * FROM ({query}) WHERE FALSE", params)
+        self.ensure_primary_key(table=table)
+        # Duplicates are skipped through the primary key index instead of
+        # scanning the whole table on every insert
+        with stage(f"write {table.split('.')[-1]}") as task:
+            n_inserted = self.con.execute(f"INSERT OR IGNORE INTO {table} BY NAME {query}", params).fetchone()[0]
+            task.add(rows=n_inserted)
+        return n_inserted
+
+    def ensure_primary_key(self, table: str):
+        """Make sure the table has a primary key on id, migrating tables created without one"""
+        if table in self._keyed_tables:
+            return
+        schema, name = table.split(".")
+        has_key = self.con.execute(
+            """
+            SELECT count(*) FROM duckdb_constraints()
+            WHERE schema_name = ? AND table_name = ? AND constraint_type = 'PRIMARY KEY'
+            """,
+            [schema, name],
+        ).fetchone()[0]
+        if not has_key:
+            # Older tables were deduplicated with NOT IN, which let duplicates
+            # within one insert through, so drop those before adding the key
+            with self.transaction():
+                self.con.execute(f"""
+                    CREATE TABLE {table}__keyed AS
+                    SELECT * FROM {table} QUALIFY row_number() OVER (PARTITION BY id) = 1;
+                    DROP TABLE {table};
+                    ALTER TABLE {table}__keyed RENAME TO {name};
+                    ALTER TABLE {table} ADD PRIMARY KEY (id);
+                """)
+        self._keyed_tables.add(table)
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements in one transaction, joining an already open one"""
+        if self._in_transaction:
+            yield
+            return
+        self.con.execute("BEGIN TRANSACTION")
+        self._in_transaction = True
+        try:
+            yield
+            self.con.execute("COMMIT")
+        except BaseException:
+            self.con.execute("ROLLBACK")
+            # Tables keyed or migrated in the transaction may be gone
+            self._keyed_tables.clear()
+            self._migrated_tables.clear()
+            raise
+        finally:
+            self._in_transaction = False
+
+    def manifest(self, schema: str) -> Dict[str, str]:
+        """Content hash of every source ingested into the schema"""
         self.con.execute(f"""
-            -- Create the table if it doesn't exist
-            CREATE TABLE IF NOT EXISTS {schema}.raw_rbn AS 
-            SELECT * FROM rbn WHERE FALSE;
-
-            -- Insert only new rows by avoiding duplicates
-            INSERT INTO {schema}.raw_rbn
-            SELECT * FROM rbn
-            WHERE id NOT IN (SELECT id FROM {schema}.raw_rbn);
+            CREATE TABLE IF NOT EXISTS {schema}.{MANIFEST_TABLE} (
+                source VARCHAR PRIMARY KEY,
+                content_hash VARCHAR,
+                mycall VARCHAR,
+                n_rows BIGINT,
+                ingested_at TIMESTAMP
+            )
         """)
+        return dict(self.con.execute(f"SELECT source, content_hash FROM {schema}.{MANIFEST_TABLE}").fetchall())
+
+    def replace_logs(self, schema: str, entries: List[ManifestEntry], frames: Iterable[pd.DataFrame]):
+        """
+        Atomically replace the QSOs of the given sources and record them in the manifest.
+
+        QSOs of earlier versions of each source are deleted by the source key of
+        their ids (see `with_source_ids`) before the new frames are inserted,
+        so other logs of the same station are kept. QSOs inserted before ids
+        were keyed are deleted by the station callsign of the source.
+        """
+        with self.transaction():
+            sources = [e.source for e in entries]
+            previous = [
+                c[0]
+                for c in self.con.execute(
+                    f"SELECT DISTINCT mycall FROM {schema}.{MANIFEST_TABLE} WHERE source IN (SELECT unnest(?))",
+                    [sources],
+                ).fetchall()
+            ]
+            mycalls = sorted(set(previous) | {e.mycall for e in entries})
+            if self.has_table(schema=schema, table="raw_logs"):
+                self.con.execute(
+                    f"""
+                    DELETE FROM {schema}.raw_logs
+                    WHERE split_part(id, ':', 1) IN (SELECT unnest(?))
+                        OR (NOT contains(id, ':') AND mycall IN (SELECT unnest(?)))
+                    """,
+                    [[source_key(source) for source in sources], previous],
+                )
+            for frame in frames:
+                self.insert_log_frame(schema=schema, frame=frame)
+            self.con.executemany(
+                f"INSERT OR REPLACE INTO {schema}.{MANIFEST_TABLE} VALUES (?, ?, ?, ?, ?)",
+                [list(e) for e in entries],
+            )
+            self.update_rates(schema=schema, mycalls=mycalls)
+            self.mark_unmatched(schema=schema, mycalls=mycalls)
+
+    def update_rates(self, schema: str, mycalls: Optional[List[str]] = None):
+        """
+        Recompute the rate tables of the given stations from raw_logs.
+
+        Only the rows of those stations are replaced, so adding logs does not
+        regroup the whole table. The tables are rebuilt in full when all
+        stations are requested or when they don't exist yet.
+        """
+        if not self.has_table(schema=schema, table="raw_logs"):
+            return
+        rebuild = mycalls is None or not all(
+            self.has_table(schema=schema, table=table) for table, _ in RATE_TABLES.values()
+        )
+        with self.transaction(), stage("update rates"):
+            for resolution, (table, _) in RATE_TABLES.items():
+                if rebuild:
+                    # Sorted by station so that lookups by call skip most row groups
+                    self.con.execute(
+                        f"CREATE OR REPLACE TABLE {schema}.{table} AS {rates_sql(schema, resolution)} ORDER BY mycall, period"
+                    )
+                    continue
+                self.con.execute(f"DELETE FROM {schema}.{table} WHERE mycall IN (SELECT unnest(?))", [mycalls])
+                self.con.execute(
+                    f"INSERT INTO {schema}.{table} {rates_sql(schema, resolution, where='WHERE mycall IN (SELECT unnest(?))')}",
+                    [mycalls],
+                )
+
+    def mark_unmatched(self, schema: str, mycalls: List[str]):
+        """Record stations whose logs changed since the last run of `match_qsos`"""
+        self.con.execute(f"CREATE TABLE IF NOT EXISTS {schema}.{PENDING_TABLE} (mycall VARCHAR PRIMARY KEY)")
+        self.con.execute(f"INSERT OR IGNORE INTO {schema}.{PENDING_TABLE} SELECT unnest(?::VARCHAR[])", [mycalls])
 
     @with_write_access
-    def add_online_logs(self, year: int, mode: str, calls: Optional[List[str]] = None):
+    def match_qsos(
+        self,
+        schema: str,
+        full: bool = False,
+        tolerance: timedelta = timedelta(minutes=3),
+        max_distance: int = 2,
+    ) -> int:
+        """
+        Cross-check QSOs against the logs of the stations worked into qso_matches.
+
+        Only QSOs affected by logs added or replaced since the last run are
+        matched again, unless `full` is set or there are no matches yet. See
+        `QsoMatcher` for the statuses and the matching rules.
+
+        Returns the number of QSOs matched.
+        """
+        matcher = QsoMatcher(contest=self, schema=schema, tolerance=tolerance, max_distance=max_distance)
+        with self.transaction():
+            if full or not self.has_table(schema=schema, table=MATCHES_TABLE):
+                n_matched = matcher.run()
+            elif self.has_table(schema=schema, table=PENDING_TABLE):
+                pending = [c[0] for c in self.con.execute(f"SELECT mycall FROM {schema}.{PENDING_TABLE}").fetchall()]
+                n_matched = matcher.run(mycalls=pending) if pending else 0
+            else:
+                n_matched = 0
+            if self.has_table(schema=schema, table=PENDING_TABLE):
+                self.con.execute(f"DELETE FROM {schema}.{PENDING_TABLE}")
+        return n_matched
+
+    @with_write_access
+    def correlate_rbn(
+        self,
+        schema: str,
+        window: timedelta = timedelta(minutes=10),
+        mycalls: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Store in qso_spots the last RBN spot of the station before each QSO.
+
+        Only the rows of the given stations are replaced; the table is rebuilt
+        when no stations are given or when it doesn't exist yet. See
+        `qso_spots_sql` for the columns.
+
+        Returns the number of QSOs correlated.
+        """
+        if not self.has_table(schema=schema, table="raw_logs") or not self.has_table(schema=schema, table="raw_rbn"):
+            return 0
+        table = f"{schema}.{SPOTS_TABLE}"
+        with self.transaction():
+            if mycalls is None or not self.has_table(schema=schema, table=SPOTS_TABLE):
+                self.con.execute(
+                    f"CREATE OR REPLACE TABLE {table} AS {qso_spots_sql(schema, window)} ORDER BY mycall, datetime"
+                )
+                return self.con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            self.con.execute(f"DELETE FROM {table} WHERE mycall IN (SELECT unnest(?))", [mycalls])
+            return self.con.execute(
+                f"INSERT INTO {table} {qso_spots_sql(schema, window, by_call=True)}", {"mycalls": mycalls}
+            ).fetchone()[0]
+
+    @with_write_access
+    def update_calls_info(self, schema: str, refresh: bool = False) -> int:
+        """
+        Resolve country, continent and zones of every call of a schema into calls_info.
+
+        Calls are taken from raw_logs (mycall and call) and raw_rbn (spotted
+        calls and skimmers), and resolved in DuckDB against the countryfile
+        prefix table, exported once into the database. Only calls missing from
+        calls_info are resolved, unless `refresh` is set, which also exports
+        the countryfile again.
+
+        Returns the number of calls added.
+        """
+        sources = [
+            f"SELECT {column} AS call FROM {schema}.{table}"
+            for table, columns in (("raw_logs", ("mycall", "call")), ("raw_rbn", ("dx", "callsign")))
+            if self.has_table(schema=schema, table=table)
+            for column in columns
+        ]
+        if not sources:
+            return 0
+        if refresh or not self.has_table(schema="main", table=PREFIXES_TABLE):
+            create_prefix_table(self.con, name=f"main.{PREFIXES_TABLE}")
+        table = f"{schema}.{CALLS_INFO_TABLE}"
+        calls = f"({' UNION '.join(sources)})"
+        with self.transaction():
+            if refresh or not self.has_table(schema=schema, table=CALLS_INFO_TABLE):
+                self.con.execute(
+                    f"CREATE OR REPLACE TABLE {table} AS {calls_info_sql(calls, prefixes=f'main.{PREFIXES_TABLE}')} ORDER BY call"
+                )
+                return self.con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            missing = f"(SELECT * FROM {calls} ANTI JOIN {table} USING (call))"
+            return self.con.execute(
+                f"INSERT INTO {table} {calls_info_sql(missing, prefixes=f'main.{PREFIXES_TABLE}')}"
+            ).fetchone()[0]
+
+    def rates(
+        self,
+        schema: str,
+        resolution: str = "1h",
+        calls: Optional[List[str]] = None,
+        bands: Optional[List[int]] = None,
+    ) -> pd.DataFrame:
+        """
+        QSOs per station, band, radio and period, at a resolution of ``1m``, ``10m`` or ``1h``.
+
+        Rates are read from the rate tables kept up to date on insert, or
+        computed from raw_logs for databases created before they existed.
+        """
+        if resolution not in RATE_TABLES:
+            raise ValueError(f"Unknown rate resolution: {resolution}")
+        table, _ = RATE_TABLES[resolution]
+        source = f"{schema}.{table}" if self.has_table(schema=schema, table=table) else f"({rates_sql(schema, resolution)})"
+        filters, params = [], []
+        if calls is not None:
+            filters.append("mycall IN (SELECT unnest(?::VARCHAR[]))")
+            params.append(calls)
+        if bands is not None:
+            filters.append("band IN (SELECT unnest(?::BIGINT[]))")
+            params.append(bands)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        return self.con.execute(f"SELECT * FROM {source} {where} ORDER BY mycall, period, band, radio", params).fetchdf()
+
+    def has_table(self, schema: str, table: str) -> bool:
+        return self.con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+            [schema, table],
+        ).fetchone()[0] > 0
+
+    @with_write_access
+    @with_ingest_stats
+    def add_online_logs(
+        self,
+        year: int,
+        mode: str,
+        calls: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
+        workers: int = 8,
+        batch_logs: int = 200,
+    ):
+        """
+        Download and parse the public logs of a contest year, and insert them in batched transactions.
+
+        Logs are downloaded and parsed by `workers` threads, and logs whose
+        content is unchanged since the last run are skipped. The whole body of
+        each log is downloaded before parsing, so `batch_size` (QSOs per parsed
+        batch) does not bound memory here.
+        """
         # Create schema for mode and year
         schema = f"{mode.lower()}{year}"
         self.con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
@@ -90,29 +611,243 @@ class ContestBase(ABC):
         log_files_online = self.list_cabrillo_files(year=year, mode=mode)
         if calls:
             log_files_online = {call: log_files_online[call.upper()] for call in calls}
+        log_urls = [
+            self.url_contest_log.format(year=year, mode=mode.lower(), call_hash=log_file_url)
+            for log_file_url in log_files_online.values()
+        ]
+
+        known = self.manifest(schema)
+
+        # Download and parse logs in a bounded thread pool sharing one pooled
+        # session, while a single writer thread drains the parsed logs into
+        # DuckDB in batched transactions. Logs whose content hash matches the
+        # manifest are skipped before parsing.
+        def download(log_url: str) -> bool:
+            response = fetch(log_url, session=get_session())
+            if response.status_code != 200:
+                raise ValueError("Link does not exist")
+            content_hash = hash_content(response.content)
+            if known.get(log_url) == content_hash:
+                return False
+            with stage("parse", nbytes=len(response.content)) as task:
+                log = LogOnline(path=log_url, batch_size=batch_size, text=response.text)
+                if log.streaming:
+                    batches = list(log.iter_log())
+                    frame = concat_frames(batches) if batches else pd.DataFrame()
+                else:
+                    frame = log.log
+                task.add(rows=len(frame))
+            if not frame.empty:
+                entry = ManifestEntry(log_url, content_hash, frame["mycall"].iloc[0], len(frame), datetime.now())
+                writer.put(schema=schema, entries=[entry], frame=with_source_ids(frame, log_url))
+            return True
+
+        n_unchanged = 0
+        with IngestWriter(self, batch_logs=batch_logs) as writer:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for log_url, future in bounded_map(executor, download, log_urls, max_pending=2 * workers):
+                    try:
+                        changed = future.result()
+                    except (*LOG_PARSE_ERRORS, RequestException) as e:
+                        logger.warning("Skipping %s: %s", log_url, e)
+                        continue
+                    if not changed:
+                        n_unchanged += 1
+                        continue
+                    logger.debug("Parsed %s", log_url)
+        logger.info("%d logs ingested, %d unchanged", writer.n_logs, n_unchanged)
+
+    @contextmanager
+    def record_ingest(self, command: str, arguments: Optional[Dict[str, object]] = None) -> Iterator[Profiler]:
+        """
+        Aggregate the stages of the enclosed ingestion and append them to ingest_stats.
+
+        One row per stage is written at the end, also when the ingestion fails,
+        sharing a run id, so throughput can be charted across runs. Writing the
+        stats never masks an error of the ingestion.
+        """
+        profiler = Profiler()
+        started_at = datetime.now()
+        try:
+            with hooked(profiler):
+                yield profiler
+        finally:
+            try:
+                self.save_ingest_stats(profiler, command=command, arguments=arguments, started_at=started_at)
+            except duckdb.Error as e:
+                logger.warning("Could not save ingest stats: %s", e)
+
+    def save_ingest_stats(
+        self, profiler: Profiler, command: str, arguments: Optional[Dict[str, object]], started_at: datetime
+    ):
+        self.con.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS main.{INGEST_STATS_TABLE} (
+                run_id VARCHAR,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                command VARCHAR,
+                arguments VARCHAR,
+                stage VARCHAR,
+                wall DOUBLE,
+                busy DOUBLE,
+                tasks BIGINT,
+                rows BIGINT,
+                bytes BIGINT,
+                retries BIGINT,
+                cache_hits BIGINT,
+                failures BIGINT
+            )
+            """
+        )
+        run = [str(uuid.uuid4()), started_at, datetime.now(), command, json.dumps(arguments or {}, default=str)]
+        rows = [
+            run + [s.name, s.wall, s.busy, s.tasks, s.rows, s.bytes, s.retries, s.cache_hits, s.failures]
+            for s in profiler.stages.values()
+        ]
+        if rows:
+            self.con.executemany(f"INSERT INTO main.{INGEST_STATS_TABLE} VALUES ({', '.join(['?'] * 14)})", rows)
 
-        # Loop over logs
-        for i, log_file_url in enumerate(log_files_online.values()):
-            log_url = os.path.join(self.url_contest_log.format(year=year, mode=mode.lower(), call_hash=log_file_url))
-            print(log_url)
-            log = LogOnline(path=log_url)
-            self.add_log(schema=schema, log=log)
-            if i > 10:
-                break
+    def replace_log(self, schema: str, source: str, content_hash: str, log: LogBase):
+        """Atomically replace the QSOs of one source, streaming logs batch by batch"""
+        frames = log.iter_log() if log.streaming else iter([log.log])
+        first = next(frames, None)
+        if first is None or first.empty:
+            return
+        n_rows = 0
 
+        def counted() -> Iterator[pd.DataFrame]:
+            nonlocal n_rows
+            for frame in itertools.chain([first], frames):
+                n_rows += len(frame)
+                yield with_source_ids(frame, source)
+
+        with self.transaction():
+            entry = ManifestEntry(source, content_hash, first["mycall"].iloc[0], 0, datetime.now())
+            self.replace_logs(schema=schema, entries=[entry], frames=counted())
+            self.con.execute(
+                f"UPDATE {schema}.{MANIFEST_TABLE} SET n_rows = ? WHERE source = ?", [n_rows, source]
+            )
+
+    @with_write_access
+    @with_ingest_stats
+    def add_local_logs(
+        self,
+        path_or_glob: str,
+        schema: str,
+        workers: Optional[int] = None,
+        files_per_task: int = 32,
+        batch_rows: int = 1_000_000,
+    ):
+        """Parse local Cabrillo files in a process pool and insert them in a few bulk inserts"""
+        self.con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        known = self.manifest(schema)
+        tasks = [(path, known.get(path)) for path in find_cabrillo_files(path_or_glob)]
+        chunks = [tasks[i:i + files_per_task] for i in range(0, len(tasks), files_per_task)]
+        workers = workers or os.cpu_count() or 1
+
+        # Worker processes parse chunks of files while a single writer thread
+        # groups their frames into transactions of about batch_rows QSOs. The
+        # writer thread is already running, so workers are not forked from here
+        mp_context = multiprocessing.get_context("forkserver" if os.name == "posix" else "spawn")
+        with IngestWriter(self, batch_rows=batch_rows) as writer:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor, stage("parse") as parsed:
+                for chunk, future in bounded_map(executor, parse_local_logs, chunks, max_pending=2 * workers):
+                    entries, frame, skipped = future.result()
+                    for path, error in skipped:
+                        logger.warning("Skipping %s: %s", path, error)
+                    parsed.add(rows=len(frame), nbytes=sum(os.path.getsize(path) for path, _ in chunk))
+                    if entries:
+                        writer.put(schema=schema, entries=entries, frame=frame)
+        logger.info("%d logs ingested, %d unchanged or skipped", writer.n_logs, len(tasks) - writer.n_logs)
 
     @with_write_access
-    def add_online_rbn(self):
-        years = [int(schema[0].replace("cw", "")) for schema in self.con.execute("SELECT schema_name FROM information_schema.schemata").fetchall() if schema[0].startswith("cw")]
-        for year in years:
-            dates = [d[0] for d in self.con.execute(f"select distinct cast (datetime as date) as dates from cw{year}.raw_logs").fetchall()]
-            calls = [c[0] for c in self.con.execute(f"select distinct mycall from cw{year}.raw_logs").fetchall()]
-            for d in dates:
-                schema = f"cw{d.year}"
-                self.con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
-                rbn = ReverseBeaconReader(date=d)
-                self.add_rbn(schema=schema, rbn=rbn, calls=calls)
+    @with_ingest_stats
+    def add_online_rbn(
+        self,
+        years: Optional[List[int]] = None,
+        mode: str = "cw",
+        engine: str = "duckdb",
+        workers: int = 4,
+    ):
+        """
+        Add the RBN spots of the calls with a log, for the days of the contest window.
+
+        Days are downloaded (and cleaned, where possible) by a pool of `workers`
+        threads while the inserts run one at a time on the calling thread, which
+        owns the DuckDB connection. With the ``duckdb`` engine each day is
+        cleaned into the local RBN archive if there is one (`get_rbn_archive`)
+        and inserted with `add_rbn_archive`; without an archive the daily CSV
+        files are extracted to a temporary directory and inserted with
+        `add_rbn_csv`. The ``pandas`` engine loads each day with
+        `ReverseBeaconReader` and inserts it with `add_rbn`.
+
+        Years default to the ones with logs in a ``{mode}{year}`` schema.
+        """
+        if engine not in ("duckdb", "pandas"):
+            raise ValueError(f"Unknown RBN ingestion engine: {engine}")
+        mode = mode.lower()
+        if years is None:
+            schemas = self.con.execute(
+                "SELECT DISTINCT table_schema FROM information_schema.tables WHERE table_name = 'raw_logs'"
+            ).fetchall()
+            years = [int(s[0][len(mode):]) for s in schemas if re.fullmatch(rf"{mode}\d{{4}}", s[0])]
+        # Days come from the contest window, so mis-dated QSOs don't pull in extra days
+        tasks = [(f"{mode}{year}", d) for year in sorted(years) for d in self.contest_dates(year=year, mode=mode)]
+        archive = get_rbn_archive()
+
+        with tempfile.TemporaryDirectory() as directory:
 
+            def prepare(task: Tuple[str, date]) -> Union[ReverseBeaconReader, List[str], None]:
+                _, day = task
+                if engine == "pandas":
+                    return ReverseBeaconReader(date=day)
+                if archive is not None:
+                    archive.ensure_days([day])
+                    return None
+                url = ReverseBeaconReader.url_history.format(date=day)
+                return ReverseBeaconReader.extract_csv(url=url, directory=os.path.join(directory, f"{day:%Y%m%d}"))
+
+            n_spots = 0
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                done = bounded_map(executor, prepare, tasks, max_pending=workers)
+                for i, ((schema, day), future) in enumerate(done, start=1):
+                    try:
+                        prepared = future.result()
+                    except (ValueError, RequestException, zipfile.BadZipFile) as e:
+                        logger.warning("[%d/%d] Skipping RBN %s: %s", i, len(tasks), day, e)
+                        continue
+                    self.con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+                    if isinstance(prepared, ReverseBeaconReader):
+                        # As in add_rbn_csv, all spots are kept if the schema has no logs
+                        calls = None
+                        if self.has_table(schema=schema, table="raw_logs"):
+                            calls = [
+                                c[0] for c in self.con.execute(f"SELECT DISTINCT mycall FROM {schema}.raw_logs").fetchall()
+                            ]
+                        added = self.add_rbn(schema=schema, rbn=prepared, calls=calls)
+                    elif prepared is None:
+                        added = self.add_rbn_archive(schema=schema, archive=archive, dates=[day])
+                    else:
+                        added = self.add_rbn_csv(schema=schema, paths=prepared)
+                        for path in prepared:
+                            os.remove(path)
+                    n_spots += added
+                    logger.info("[%d/%d] RBN %s: %d spots added to %s", i, len(tasks), day, added, schema)
+        logger.info("%d RBN spots added for %d days", n_spots, len(tasks))
+
+    @classmethod
+    @abstractmethod
+    def contest_window(cls, year: int, mode: str) -> Tuple[datetime, datetime]:
+        """Start (inclusive) and end (exclusive) of the contest in UTC"""
+        ...
+
+    @classmethod
+    def contest_dates(cls, year: int, mode: str) -> List[date]:
+        """UTC days overlapping the contest window"""
+        start, end = cls.contest_window(year=year, mode=mode)
+        last = (end - timedelta(microseconds=1)).date()
+        return [start.date() + timedelta(days=i) for i in range((last - start.date()).days + 1)]
 
     @classmethod
     @abstractmethod
@@ -122,6 +857,185 @@ class ContestBase(ABC):
     def query(self, query: str) -> pd.DataFrame:
         return self.con.query(query).fetchdf()
 
+    def query_arrow(self, query: str, params: Optional[List[object]] = None) -> "pa.Table":
+        """
+        Run a query and return its result as an Arrow table (requires pyarrow).
+
+        DuckDB hands over its result as Arrow record batches, with no pandas
+        conversion, so other Arrow consumers can use it without copying it again.
+        """
+        result = self.con.execute(query, params)
+        # DuckDB 1.4 renamed fetch_arrow_table to to_arrow_table
+        return result.to_arrow_table() if hasattr(result, "to_arrow_table") else result.fetch_arrow_table()
+
+    def query_batches(
+        self,
+        query: str,
+        params: Optional[List[object]] = None,
+        batch_size: int = 100_000,
+        arrow: bool = False,
+    ) -> Iterator[Union[pd.DataFrame, "pa.RecordBatch"]]:
+        """
+        Run a query and yield its result in batches, as DataFrames or Arrow record batches.
+
+        DuckDB streams the result: each batch is only computed when the
+        previous one has been consumed, so memory stays bounded by the batch
+        size however large the result is, and a slow consumer slows the query
+        down instead of letting results pile up. Arrow batches (which require
+        pyarrow) have exactly `batch_size` rows; DataFrame batches, built like
+        `query` results, are rounded to DuckDB vectors of 2048 rows. The last
+        batch may be smaller.
+
+        The query runs on its own cursor, so other queries on the contest can
+        run while the iterator is open, but not across a write session, which
+        replaces the connection.
+        """
+        cursor = self.con.cursor()
+        try:
+            result = cursor.execute(query, params)
+            if arrow:
+                # DuckDB 1.4 renamed fetch_record_batch to to_arrow_reader
+                reader = (
+                    result.to_arrow_reader(batch_size)
+                    if hasattr(result, "to_arrow_reader")
+                    else result.fetch_record_batch(batch_size)
+                )
+                batches = iter(reader)
+            vectors = max(1, round(batch_size / 2048))
+            while True:
+                with stage("query") as task:
+                    if arrow:
+                        batch = next(batches, None)
+                    else:
+                        batch = result.fetch_df_chunk(vectors)
+                        batch = None if batch.empty else batch
+                    if batch is None:
+                        break
+                    task.add(rows=len(batch))
+                yield batch
+        finally:
+            cursor.close()
+
+    def export(self, query: str, path: str) -> int:
+        """
+        Write the result of a query, or a whole table, to a Parquet, CSV or JSON file.
+
+        DuckDB writes the file directly, without building a DataFrame. The
+        format is taken from the extension of `path`. Returns the number of
+        rows written.
+        """
+        formats = {".parquet": "parquet", ".csv": "csv", ".json": "json"}
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in formats:
+            raise ValueError(f"Unknown export format: {extension}")
+        if re.fullmatch(r"[\w.]+", query.strip()):
+            query = f"SELECT * FROM {query.strip()}"
+        escaped = path.replace("'", "''")
+        with stage("export") as task:
+            n_rows = self.con.execute(f"COPY ({query}) TO '{escaped}' (FORMAT {formats[extension]})").fetchone()[0]
+            task.add(rows=n_rows, nbytes=os.path.getsize(path))
+        return n_rows
+
+    def export_schema(self, schema: str, directory: str) -> Dict[str, int]:
+        """
+        Write every table of a schema to a Parquet dataset under `directory`.
+
+        Each table goes to its own subdirectory; tables with a ``datetime``
+        column are partitioned by day (``day=YYYY-MM-DD``), as in the RBN
+        archive. A ``schema.json`` file lists the tables, their partitioning and
+        row counts for `import_schema`. Returns the rows written per table.
+        """
+        tables = [
+            t[0]
+            for t in self.con.execute(
+                """
+                SELECT table_name FROM information_schema.tables
+                WHERE table_schema = ? AND table_type = 'BASE TABLE' ORDER BY table_name
+                """,
+                [schema],
+            ).fetchall()
+        ]
+        if not tables:
+            raise ValueError(f"Schema {schema} has no tables")
+        os.makedirs(directory, exist_ok=True)
+        metadata: Dict[str, object] = {"schema": schema, "tables": {}}
+        for table in tables:
+            columns = {c[0]: c[1] for c in self.con.execute(f"DESCRIBE {schema}.{table}").fetchall()}
+            primary_key = self.con.execute(
+                """
+                SELECT constraint_column_names FROM duckdb_constraints()
+                WHERE schema_name = ? AND table_name = ? AND constraint_type = 'PRIMARY KEY'
+                """,
+                [schema, table],
+            ).fetchone()
+            partitioned = "datetime" in columns and "day" not in columns
+            output = os.path.join(directory, table)
+            escaped = output.replace("'", "''")
+            with stage("export") as task:
+                if partitioned:
+                    n_rows = self.con.execute(
+                        f"""
+                        COPY (SELECT *, CAST(datetime AS DATE) AS day FROM {schema}.{table})
+                        TO '{escaped}' (FORMAT parquet, PARTITION_BY (day), OVERWRITE, COMPRESSION zstd)
+                        """
+                    ).fetchone()[0]
+                else:
+                    os.makedirs(output, exist_ok=True)
+                    n_rows = self.con.execute(
+                        f"COPY {schema}.{table} TO '{escaped}/data.parquet' (FORMAT parquet, COMPRESSION zstd)"
+                    ).fetchone()[0]
+                task.add(rows=n_rows)
+            metadata["tables"][table] = {
+                "columns": columns,
+                "primary_key": list(primary_key[0]) if primary_key else [],
+                "partition_by": ["day"] if partitioned else [],
+                "rows": n_rows,
+            }
+        with open(os.path.join(directory, SCHEMA_METADATA_FILE), "w") as f:
+            json.dump(metadata, f, indent=2)
+        return {table: info["rows"] for table, info in metadata["tables"].items()}
+
+    @with_write_access
+    def import_schema(self, directory: str, schema: Optional[str] = None, replace: bool = False) -> Dict[str, int]:
+        """
+        Load a schema written by `export_schema`, in one transaction.
+
+        The schema keeps its exported name unless `schema` is given. Existing
+        tables are only overwritten with `replace`. Returns the rows loaded per
+        table.
+        """
+        with open(os.path.join(directory, SCHEMA_METADATA_FILE)) as f:
+            metadata = json.load(f)
+        schema = schema or metadata["schema"]
+        existing = [table for table in metadata["tables"] if self.has_table(schema=schema, table=table)]
+        if existing and not replace:
+            raise ValueError(f"Tables already in {schema}: {', '.join(existing)}")
+        counts = {}
+        with self.transaction():
+            self.con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+            for table, info in metadata["tables"].items():
+                # Tables are created from the exported column types and keys,
+                # which Parquet files don't keep
+                definitions = [f'"{column}" {type_}' for column, type_ in info["columns"].items()]
+                if info["primary_key"]:
+                    definitions.append(f"PRIMARY KEY ({', '.join(info['primary_key'])})")
+                files = os.path.join(directory, table, "**", "*.parquet").replace("'", "''")
+                with stage("import") as task:
+                    self.con.execute(f"CREATE OR REPLACE TABLE {schema}.{table} ({', '.join(definitions)})")
+                    # Partitioned empty tables have no files; partition values
+                    # are not read back, as they are derived from datetime
+                    counts[table] = 0 if not info["rows"] else self.con.execute(
+                        f"""
+                        INSERT INTO {schema}.{table} BY NAME
+                        SELECT {', '.join(f'"{column}"' for column in info["columns"])}
+                        FROM read_parquet('{files}', hive_partitioning = false)
+                        """
+                    ).fetchone()[0]
+                    task.add(rows=counts[table])
+                self._keyed_tables.discard(f"{schema}.{table}")
+                self._migrated_tables.discard(f"{schema}.{table}")
+        return counts
+
     def list_tables(self) -> List[str]:
         return [t[0] for t in self.con.query("select table_schema || '.' || table_name from information_schema.tables").fetchall()]
 
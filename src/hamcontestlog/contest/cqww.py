@@ -1,21 +1,33 @@
 """Contest class for CQWW"""
-from typing import Dict
-import requests
+from datetime import datetime
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
 import re
 
 from hamcontestlog.contest.base import ContestBase
+from hamcontestlog.contest.base import full_weekend
+from hamcontestlog.utils.http import fetch
+from hamcontestlog.utils.http import get_session
 
 
 class ContestCQWW(ContestBase):
     url_contest_participants: str = "https://cqww.com/publiclogs/{year}{mode}/"
     url_contest_log: str = "https://cqww.com/publiclogs/{year}{mode}/{call_hash}"
+    # Last full weekend of the month, 0000Z Saturday to 2400Z Sunday
+    contest_months: Dict[str, int] = {"ssb": 10, "cw": 11}
+    contest_duration: timedelta = timedelta(hours=48)
 
-    def __init__(self, storage_path: str):
-        super().__init__(storage_path=storage_path)
+    def __init__(self, storage_path: str, threads: Optional[int] = None):
+        super().__init__(storage_path=storage_path, threads=threads)
+
+    @classmethod
+    def contest_window(cls, year: int, mode: str) -> Tuple[datetime, datetime]:
+        start = datetime.combine(full_weekend(year, cls.contest_months[mode.lower()], -1), datetime.min.time())
+        return start, start + cls.contest_duration
 
     @classmethod
     def list_cabrillo_files(cls, year: int, mode: str) -> Dict[str, str]:
-        response = requests.get(cls.url_contest_participants.format(year=year, mode=mode.lower()))
+        response = fetch(cls.url_contest_participants.format(year=year, mode=mode.lower()), session=get_session())
         if response.status_code == 200:
             page = response.text
         else:
@@ -1,22 +1,35 @@
 """Contest class for IARU HF"""
-from typing import Dict
-import requests
+from datetime import datetime
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
 import re
 
 from hamcontestlog.contest.base import ContestBase
+from hamcontestlog.contest.base import full_weekend
+from hamcontestlog.utils.http import fetch
+from hamcontestlog.utils.http import get_session
 
 
 class ContestIARU(ContestBase):
     url_contest_participants: str = "https://contests.arrl.org/publiclogs.php?eid=4&iid=1053"
     url_contest_log: str = "https://contests.arrl.org/showpubliclog.php?q={call_hash}"
     # I need a dictionary for eid<-->contest, iid<-->year, and call_hash<-->contest-year-call
+    # Second full weekend of July, 1200Z Saturday to 1200Z Sunday, all modes
+    contest_month: int = 7
+    contest_start: timedelta = timedelta(hours=12)
+    contest_duration: timedelta = timedelta(hours=24)
 
-    def __init__(self, storage_path: str):
-        super().__init__(storage_path=storage_path)
+    def __init__(self, storage_path: str, threads: Optional[int] = None):
+        super().__init__(storage_path=storage_path, threads=threads)
+
+    @classmethod
+    def contest_window(cls, year: int, mode: str) -> Tuple[datetime, datetime]:
+        start = datetime.combine(full_weekend(year, cls.contest_month, 2), datetime.min.time()) + cls.contest_start
+        return start, start + cls.contest_duration
 
     @classmethod
     def list_cabrillo_files(cls, year: int, mode: str) -> Dict[str, str]:
-        response = requests.get(cls.url_contest_participants.format(year=year, mode=mode.lower()))
+        response = fetch(cls.url_contest_participants.format(year=year, mode=mode.lower()), session=get_session())
         if response.status_code == 200:
             page = response.text
         else:
@@ -0,0 +1,49 @@
+"""Ingest manifest of the log files loaded into a contest schema"""
+from datetime import datetime
+from typing import NamedTuple
+import hashlib
+
+import pandas as pd
+
+
+MANIFEST_TABLE = "ingest_manifest"
+
+
+class ManifestEntry(NamedTuple):
+    """
+    Record of one ingested log file.
+
+    Attributes:
+        source (str): URL or path the log was read from.
+        content_hash (str): SHA-256 of the raw file content.
+        mycall (str): Station callsign of the log, used to update its rates.
+        n_rows (int): Number of QSOs ingested from the file.
+        ingested_at (datetime): Time of the ingest.
+    """
+
+    source: str
+    content_hash: str
+    mycall: str
+    n_rows: int
+    ingested_at: datetime
+
+
+def hash_content(content: bytes) -> str:
+    """SHA-256 hex digest of a raw log file"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def source_key(source: str) -> str:
+    """Short hash of a log source, prefixed to the ids of its QSOs"""
+    return hash_content(source.encode())[:16]
+
+
+def with_source_ids(frame: pd.DataFrame, source: str) -> pd.DataFrame:
+    """
+    QSOs of one source with ids ``{source_key}:{mycall}_{n}``.
+
+    Logs of the same station from different sources (multi-op, re-submissions,
+    local and online copies) then neither collide on the id nor replace each
+    other, as their QSOs are deleted by source key.
+    """
+    return frame.assign(id=source_key(source) + ":" + frame["id"])
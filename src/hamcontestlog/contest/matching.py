@@ -0,0 +1,227 @@
+"""Cross-check of QSOs against the logs of the stations worked"""
+from datetime import timedelta
+from typing import TYPE_CHECKING, List, Optional
+
+from hamcontestlog.contest.rates import BAND_EDGES
+from hamcontestlog.contest.rates import band_sql
+
+if TYPE_CHECKING:
+    from hamcontestlog.contest.base import ContestBase
+
+
+MATCHES_TABLE = "qso_matches"
+# Stations whose logs changed since the last matching run
+PENDING_TABLE = "match_pending"
+
+# Match status of a QSO:
+# - ok: the worked station logged it within the tolerance, with the same exchange
+# - busted_exchange: as ok, but the exchange copied differs from the one sent
+# - busted_call: no such QSO, but a station with a similar call logged it
+# - nil: the worked station has a log without the QSO (not in log)
+# - unverifiable: the worked station has no log
+STATUSES = ("ok", "busted_exchange", "busted_call", "nil", "unverifiable")
+
+
+class QsoMatcher:
+    """
+    Matches every QSO of a contest schema to its counterpart in the other log.
+
+    A QSO of station A with station B on a band is matched to a QSO of B with
+    A on the same band within `tolerance`. Times are split into buckets of
+    `tolerance`, and each candidate QSO is replicated into its neighbouring
+    buckets, so the range condition becomes an equi-join on (calls, band,
+    bucket) instead of a self-join of whole logs. QSOs left unmatched are then
+    compared with the QSOs logged with A by other stations in the same buckets,
+    to find calls copied with at most `max_distance` edits.
+
+    Work is partitioned by band, one statement per band, so the hash tables
+    stay small and DuckDB runs each partition on all threads.
+
+    Args:
+        contest (ContestBase): Contest whose connection is used.
+        schema (str): Schema with the raw logs.
+        tolerance (timedelta): Maximum time difference between both QSOs.
+        max_distance (int): Maximum edit distance of a busted call.
+    """
+
+    def __init__(
+        self,
+        contest: "ContestBase",
+        schema: str,
+        tolerance: timedelta = timedelta(minutes=3),
+        max_distance: int = 2,
+    ):
+        self.contest = contest
+        self.schema = schema
+        self.tolerance = int(tolerance.total_seconds())
+        self.max_distance = max_distance
+
+    @property
+    def table(self) -> str:
+        return f"{self.schema}.{MATCHES_TABLE}"
+
+    def run(self, mycalls: Optional[List[str]] = None) -> int:
+        """
+        Matches the QSOs affected by changes in the logs of the given stations.
+
+        Affected QSOs are the ones of those stations, the ones logged with them
+        or matched to them, and the QSOs without a counterpart near a QSO of
+        their station in those logs, which may turn out to be busted calls.
+        Without stations, or if the matches table doesn't exist yet, all QSOs
+        are matched.
+
+        Args:
+            mycalls (Optional[List[str]]): Stations whose logs changed.
+
+        Returns:
+            int: Number of QSOs matched.
+        """
+        con = self.contest.con
+        full = mycalls is None or not self.contest.has_table(schema=self.schema, table=MATCHES_TABLE)
+        try:
+            con.execute(
+                f"""
+                CREATE OR REPLACE TEMP TABLE match_qsos AS
+                SELECT
+                    id,
+                    mycall,
+                    call,
+                    {band_sql()} AS band,
+                    CAST(datetime AS TIMESTAMP) AS datetime,
+                    CAST(epoch(CAST(datetime AS TIMESTAMP)) AS BIGINT) // {self.tolerance} AS bucket,
+                    upper(trim(CAST(myexch AS VARCHAR))) AS myexch,
+                    upper(trim(CAST(exch AS VARCHAR))) AS exch
+                FROM {self.schema}.raw_logs
+                """
+            )
+            con.execute("CREATE OR REPLACE TEMP TABLE match_logged AS SELECT DISTINCT mycall FROM match_qsos")
+            if full:
+                con.execute(
+                    f"""
+                    CREATE OR REPLACE TABLE {self.table} (
+                        id VARCHAR,
+                        mycall VARCHAR,
+                        call VARCHAR,
+                        band BIGINT,
+                        datetime TIMESTAMP,
+                        status VARCHAR,
+                        matched_id VARCHAR,
+                        matched_call VARCHAR,
+                        time_diff BIGINT
+                    )
+                    """
+                )
+                qsos, candidates = "match_qsos", "match_qsos"
+            else:
+                con.execute(
+                    f"""
+                    CREATE OR REPLACE TEMP TABLE match_scope AS
+                    SELECT id FROM match_qsos
+                    WHERE mycall IN (SELECT unnest($calls)) OR call IN (SELECT unnest($calls))
+                    UNION
+                    SELECT id FROM {self.table} WHERE matched_call IN (SELECT unnest($calls))
+                    UNION
+                    -- QSOs without a counterpart and with one logged with them nearby in a new log
+                    -- may be busted calls of that log, or closer ones
+                    SELECT m.id
+                    FROM {self.table} AS m JOIN (
+                        SELECT call, band, unnest([bucket - 1, bucket, bucket + 1]) AS near_bucket
+                        FROM match_qsos WHERE mycall IN (SELECT unnest($calls))
+                    ) AS n
+                        ON m.mycall = n.call
+                        AND m.band IS NOT DISTINCT FROM n.band
+                        AND CAST(epoch(m.datetime) AS BIGINT) // {self.tolerance} = n.near_bucket
+                    WHERE m.status IN ('busted_call', 'nil', 'unverifiable')
+                    """,
+                    {"calls": mycalls},
+                )
+                # Also drops matches of QSOs deleted with a replaced log
+                con.execute(
+                    f"""
+                    DELETE FROM {self.table}
+                    WHERE id IN (SELECT id FROM match_scope) OR mycall IN (SELECT unnest(?))
+                    """,
+                    [mycalls],
+                )
+                # Only QSOs that can pair with the ones in scope are candidates
+                con.execute(
+                    """
+                    CREATE OR REPLACE TEMP TABLE match_scoped AS
+                    SELECT * FROM match_qsos SEMI JOIN match_scope USING (id);
+                    CREATE OR REPLACE TEMP TABLE match_candidates AS
+                    SELECT q.* FROM match_qsos AS q SEMI JOIN (
+                        SELECT DISTINCT mycall, band, unnest([bucket - 1, bucket, bucket + 1]) AS near_bucket
+                        FROM match_scoped
+                    ) AS s
+                        ON q.call = s.mycall AND q.band IS NOT DISTINCT FROM s.band AND q.bucket = s.near_bucket
+                    """
+                )
+                qsos, candidates = "match_scoped", "match_candidates"
+
+            n_matched = 0
+            for band in [b for b, _, _ in BAND_EDGES] + [None]:
+                n_matched += con.execute(
+                    f"INSERT INTO {self.table} {self.match_sql(band, qsos=qsos, candidates=candidates)}"
+                ).fetchone()[0]
+            return n_matched
+        finally:
+            for table in ("match_qsos", "match_logged", "match_scope", "match_scoped", "match_candidates"):
+                con.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def match_sql(self, band: Optional[int], qsos: str = "match_qsos", candidates: str = "match_qsos") -> str:
+        """SQL matching the QSOs of one band (outside the bands if None) against the candidate QSOs"""
+        band_filter = "band IS NULL" if band is None else f"band = {band}"
+        return f"""
+            WITH
+            a AS (SELECT * FROM {qsos} WHERE {band_filter}),
+            b AS (
+                SELECT *, unnest([bucket - 1, bucket, bucket + 1]) AS near_bucket
+                FROM {candidates} WHERE {band_filter}
+            ),
+            exact AS (
+                SELECT
+                    a.id,
+                    b.id AS matched_id,
+                    b.mycall AS matched_call,
+                    a.exch IS NOT DISTINCT FROM b.myexch AS exch_ok,
+                    abs(epoch(b.datetime) - epoch(a.datetime)) AS time_diff
+                FROM a JOIN b
+                    ON b.mycall = a.call AND b.call = a.mycall AND b.near_bucket = a.bucket
+                WHERE abs(epoch(b.datetime) - epoch(a.datetime)) <= {self.tolerance}
+                QUALIFY row_number() OVER (PARTITION BY a.id ORDER BY time_diff, b.id) = 1
+            ),
+            busted AS (
+                SELECT
+                    a.id,
+                    b.id AS matched_id,
+                    b.mycall AS matched_call,
+                    abs(epoch(b.datetime) - epoch(a.datetime)) AS time_diff
+                FROM (SELECT * FROM a ANTI JOIN exact USING (id)) AS a JOIN b
+                    ON b.call = a.mycall AND b.near_bucket = a.bucket
+                WHERE b.mycall <> a.call
+                    AND abs(epoch(b.datetime) - epoch(a.datetime)) <= {self.tolerance}
+                    AND abs(length(b.mycall) - length(a.call)) <= {self.max_distance}
+                    AND levenshtein(b.mycall, a.call) <= {self.max_distance}
+                QUALIFY row_number() OVER (
+                    PARTITION BY a.id ORDER BY levenshtein(b.mycall, a.call), time_diff, b.id
+                ) = 1
+            )
+            SELECT
+                a.id,
+                a.mycall,
+                a.call,
+                a.band,
+                a.datetime,
+                CASE
+                    WHEN e.id IS NOT NULL THEN CASE WHEN e.exch_ok THEN 'ok' ELSE 'busted_exchange' END
+                    WHEN x.id IS NOT NULL THEN 'busted_call'
+                    WHEN a.call IN (SELECT mycall FROM match_logged) THEN 'nil'
+                    ELSE 'unverifiable'
+                END AS status,
+                coalesce(e.matched_id, x.matched_id) AS matched_id,
+                coalesce(e.matched_call, x.matched_call) AS matched_call,
+                CAST(coalesce(e.time_diff, x.time_diff) AS BIGINT) AS time_diff
+            FROM a
+            LEFT JOIN exact AS e USING (id)
+            LEFT JOIN busted AS x USING (id)
+        """
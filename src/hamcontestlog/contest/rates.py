@@ -0,0 +1,47 @@
+"""QSO rate tables, maintained per contest schema"""
+from typing import Dict, List, Tuple
+
+
+# Amateur HF (and 6 m) bands in meters, with their edges in kHz, as in raw_rbn.band
+BAND_EDGES: List[Tuple[int, int, int]] = [
+    (160, 1800, 2000),
+    (80, 3500, 4000),
+    (60, 5250, 5450),
+    (40, 7000, 7300),
+    (30, 10100, 10150),
+    (20, 14000, 14350),
+    (17, 18068, 18168),
+    (15, 21000, 21450),
+    (12, 24890, 24990),
+    (10, 28000, 29700),
+    (6, 50000, 54000),
+]
+
+# Rate tables by resolution, with their table name and time bucket
+RATE_TABLES: Dict[str, Tuple[str, str]] = {
+    "1m": ("rates_1m", "1 minute"),
+    "10m": ("rates_10m", "10 minutes"),
+    "1h": ("rates_1h", "1 hour"),
+}
+
+
+def band_sql(frequency: str = "frequency") -> str:
+    """SQL expression with the band in meters of a frequency in kHz (NULL outside the bands)"""
+    cases = " ".join(f"WHEN {frequency} BETWEEN {low} AND {high} THEN {band}" for band, low, high in BAND_EDGES)
+    return f"CASE {cases} END"
+
+
+def rates_sql(schema: str, resolution: str, where: str = "") -> str:
+    """SQL computing QSOs per station, band, radio and time bucket from the raw logs of a schema"""
+    _, interval = RATE_TABLES[resolution]
+    return f"""
+        SELECT
+            mycall,
+            {band_sql()} AS band,
+            CAST(radio AS VARCHAR) AS radio,
+            time_bucket(INTERVAL '{interval}', CAST(datetime AS TIMESTAMP)) AS period,
+            count(*) AS qsos
+        FROM {schema}.raw_logs
+        {where}
+        GROUP BY ALL
+    """
@@ -0,0 +1,73 @@
+"""Correlation of QSOs with the RBN spots of the station that logged them"""
+from datetime import timedelta
+
+from hamcontestlog.contest.rates import band_sql
+
+
+SPOTS_TABLE = "qso_spots"
+
+# Maximum difference in kHz between a QSO and a spot for the station to be
+# considered running on the spotted frequency
+RUN_FREQUENCY_TOLERANCE = 1.0
+
+
+def qso_spots_sql(schema: str, window: timedelta = timedelta(minutes=10), by_call: bool = False) -> str:
+    """
+    SQL pairing each QSO of raw_logs with the last spot of its station before it.
+
+    The spot is found with an as-of join on the spotted call and band, so both
+    tables are sorted once per (call, band) instead of joining every QSO to
+    every spot of its station. Spots older than `window` are discarded, leaving
+    the spot columns NULL.
+
+    Args:
+        schema (str): Schema with raw_logs and raw_rbn.
+        window (timedelta): Maximum age of the spot at the time of the QSO.
+        by_call (bool): Only correlate the QSOs of the stations given in the
+            ``$mycalls`` parameter.
+
+    Returns:
+        str: SELECT statement with the QSO id, station, band and time, and the
+            skimmer, frequency, SNR, speed and age in seconds of the spot.
+    """
+    seconds = int(window.total_seconds())
+    # Filtering spots on the calls of the qsos CTE would materialize it and
+    # take longer than the join itself, so both sides filter on the parameter
+    qsos_filter = "WHERE mycall IN (SELECT unnest($mycalls))" if by_call else ""
+    spots_filter = "WHERE dx IN (SELECT unnest($mycalls))" if by_call else ""
+    return f"""
+        WITH
+        qsos AS (
+            SELECT id, mycall, {band_sql()} AS band, frequency, CAST(datetime AS TIMESTAMP) AS datetime
+            FROM {schema}.raw_logs
+            {qsos_filter}
+        ),
+        spots AS (
+            SELECT dx, band, callsign, freq, db, speed, CAST(datetime AS TIMESTAMP) AS datetime
+            FROM {schema}.raw_rbn
+            {spots_filter}
+        ),
+        nearest AS (
+            SELECT
+                q.*,
+                s.callsign,
+                s.freq,
+                s.db,
+                s.speed,
+                epoch(q.datetime) - epoch(s.datetime) AS age
+            FROM qsos AS q ASOF LEFT JOIN spots AS s
+                ON q.mycall = s.dx AND q.band = s.band AND q.datetime >= s.datetime
+        )
+        SELECT
+            id,
+            mycall,
+            band,
+            datetime,
+            CASE WHEN age <= {seconds} THEN callsign END AS spot_skimmer,
+            CASE WHEN age <= {seconds} THEN freq END AS spot_freq,
+            CASE WHEN age <= {seconds} THEN db END AS spot_db,
+            CASE WHEN age <= {seconds} THEN speed END AS spot_speed,
+            CASE WHEN age <= {seconds} THEN CAST(age AS BIGINT) END AS spot_age,
+            coalesce(age <= {seconds} AND abs(freq - frequency) <= {RUN_FREQUENCY_TOLERANCE}, false) AS running
+        FROM nearest
+    """
@@ -0,0 +1,141 @@
+"""Single writer draining parsed logs into a contest database in batched transactions"""
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+import logging
+import queue
+import threading
+
+import pandas as pd
+
+from hamcontestlog.contest.manifest import ManifestEntry
+from hamcontestlog.log.base import LOG_PARSE_ERRORS
+from hamcontestlog.log.base import LogBase
+from hamcontestlog.utils.frames import concat_frames
+
+if TYPE_CHECKING:
+    from hamcontestlog.contest.base import ContestBase
+
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class IngestWriter:
+    """
+    Queue of parsed logs drained by one writer thread.
+
+    Producers (download or parse workers) push frames with `put` or whole logs
+    with `put_log`; the writer groups them into one transaction per batch of
+    `batch_logs` logs or `batch_rows` QSOs, so there is no commit per log. The
+    queue is bounded, so producers block when the writer falls behind.
+
+    Use it as a context manager inside `ContestBase.write_session`; leaving the
+    block flushes what is left and re-raises any error of the writer thread.
+    Streaming logs that turn out to be malformed while they are written are
+    skipped with a warning, and the rest of their batch is still written.
+
+    Args:
+        contest (ContestBase): Contest whose connection is used for writing.
+        batch_logs (int): Maximum number of logs per transaction.
+        batch_rows (int): Maximum number of QSOs per transaction.
+        max_queued (int): Maximum number of queued items before producers block.
+    """
+
+    def __init__(self, contest: "ContestBase", batch_logs: int = 200, batch_rows: int = 1_000_000, max_queued: int = 64):
+        self.contest = contest
+        self.batch_logs = batch_logs
+        self.batch_rows = batch_rows
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queued)
+        self.n_logs = 0
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+
+    def __enter__(self) -> "IngestWriter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.queue.put(_DONE)
+        self._thread.join()
+        if self.error is not None and exc_info[0] is None:
+            raise self.error
+
+    def put(self, schema: str, entries: List[ManifestEntry], frame: pd.DataFrame):
+        """Queue parsed QSOs replacing the given manifest sources"""
+        self.queue.put((schema, entries, frame, len(frame)))
+
+    def put_log(self, schema: str, source: str, content_hash: str, log: LogBase):
+        """Queue a log to be replaced as a whole, parsing streaming logs on the writer thread"""
+        n_rows = 0 if log.streaming else len(log.log)
+        self.queue.put((schema, (source, content_hash), log, n_rows))
+
+    def _run(self):
+        pending: List[Tuple[str, Any, Any, int]] = []
+        n_rows = 0
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                break
+            if self.error is not None:
+                # Keep draining so producers never block on a dead writer
+                continue
+            pending.append(item)
+            n_rows += item[3]
+            if len(pending) >= self.batch_logs or n_rows >= self.batch_rows:
+                self._flush(pending)
+                pending, n_rows = [], 0
+        if pending and self.error is None:
+            self._flush(pending)
+
+    def _flush(self, items: List[Tuple[str, Any, Any, int]]):
+        # A streaming log that fails to parse is only found while inserting
+        # it, so the transaction is rolled back and the batch written again
+        # without that log
+        skipped: Set[int] = set()
+        while True:
+            try:
+                with self.contest.transaction():
+                    n_logs = self._write(items, skipped=skipped)
+            except _MalformedLog as e:
+                source, _ = items[e.index][1]
+                logger.warning("Skipping %s: %s", source, e.__cause__)
+                skipped.add(e.index)
+                continue
+            except BaseException as e:
+                self.error = e
+                return
+            self.n_logs += n_logs
+            return
+
+    def _write(self, items: List[Tuple[str, Any, Any, int]], skipped: Set[int]) -> int:
+        """Replace the logs of a batch in the current transaction, returning how many were written"""
+        frames: Dict[str, List[pd.DataFrame]] = defaultdict(list)
+        entries: Dict[str, List[ManifestEntry]] = defaultdict(list)
+        logs = []
+        for index, (schema, entry, payload, _) in enumerate(items):
+            if isinstance(payload, LogBase):
+                if index not in skipped:
+                    logs.append((index, schema, entry, payload))
+            else:
+                frames[schema].append(payload)
+                entries[schema].extend(entry)
+        n_logs = 0
+        for schema, schema_frames in frames.items():
+            self.contest.replace_logs(schema=schema, entries=entries[schema], frames=[concat_frames(schema_frames)])
+            n_logs += len(entries[schema])
+        for index, schema, (source, content_hash), log in logs:
+            try:
+                self.contest.replace_log(schema=schema, source=source, content_hash=content_hash, log=log)
+            except LOG_PARSE_ERRORS as e:
+                raise _MalformedLog(index) from e
+            n_logs += 1
+        return n_logs
+
+
+class _MalformedLog(Exception):
+    """A queued streaming log failed to parse while it was written"""
+
+    def __init__(self, index: int):
+        super().__init__(index)
+        self.index = index
@@ -2,9 +2,32 @@
 
 from abc import ABC
 from abc import abstractmethod
-from datetime import datetime
+import numpy as np
 import pandas as pd
-from typing import IO, Tuple
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+from hamcontestlog.utils.frames import string_dtype
+
+
+# Columns of parsed QSOs with their DuckDB types, as stored in raw_logs tables.
+# Frames are cast to them on insert, so their compact dtypes (narrow integers,
+# categoricals) never leak into the tables.
+QSO_SQL_TYPES = {
+    "frequency": "BIGINT",
+    "mode": "VARCHAR",
+    "datetime": "TIMESTAMP_NS",
+    "mycall": "VARCHAR",
+    "myrst": "BIGINT",
+    "myexch": "VARCHAR",
+    "call": "VARCHAR",
+    "rst": "VARCHAR",
+    "exch": "VARCHAR",
+    "radio": "VARCHAR",
+    "id": "VARCHAR",
+}
+
+# Errors raised when parsing a malformed log, which is skipped
+LOG_PARSE_ERRORS = (ValueError, IndexError, UnicodeDecodeError)
 
 
 class LogBase(ABC):
@@ -15,14 +38,23 @@ class LogBase(ABC):
     ----------
     path : str
         The file path or URL to the log file.
+    batch_size : Optional[int]
+        If given, the log is not parsed eagerly and QSOs are read in batches
+        of this many records with `iter_log` (streaming mode).
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, batch_size: Optional[int] = None):
         self.path = path
+        self.batch_size = batch_size
         self.buffer: IO[str] | None = None
         self.log: pd.DataFrame
         self.metadata: pd.DataFrame
 
+    @property
+    def streaming(self) -> bool:
+        """Whether the log is read in batches instead of parsed eagerly."""
+        return self.batch_size is not None
+
     @abstractmethod
     def open_file(self, path: str) -> IO[str]:
         """
@@ -40,6 +72,24 @@ class LogBase(ABC):
         """
         ...
 
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """
+        Yields the lines of a log file one at a time.
+
+        Parameters
+        ----------
+        path : str
+            The file path or URL to read.
+
+        Returns
+        -------
+        Iterator[str]
+            Iterator over the lines of the log.
+        """
+        self.buffer = self.open_file(path=path)
+        with self.buffer as f:  # type: ignore
+            yield from f
+
     def store_log(self, path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Parses a log file and extracts metadata and QSO (contact) information.
@@ -57,35 +107,126 @@ class LogBase(ABC):
             - qsos_df: DataFrame with parsed QSO records.
         """
         self.buffer = self.open_file(path=path)
-        metadata = {}
-        qsos = []
+        metadata: Dict[str, str] = {}
+        qso_lines: List[str] = []
         with self.buffer as f:  # type: ignore
-            for line in f.readlines():
+            for line in f:
                 if line.startswith("QSO:"):
-                    qso = line.strip().split()
-                    qsos.append(
-                        {
-                            "frequency": int(qso[1]),
-                            "mode": qso[2],
-                            "datetime": datetime.strptime(
-                                f"{qso[3]} {qso[4]}", "%Y-%m-%d %H%M"
-                            ),
-                            "mycall": qso[5],
-                            "myrst": int(qso[6]),
-                            "myexch": qso[7],
-                            "call": qso[8],
-                            "rst": qso[9],
-                            "exch": qso[10],
-                            "radio": 0 if len(qso) < 12 else qso[11],
-                        }
-                    )
+                    qso_lines.append(line)
                 elif not line.startswith("X-QSO"):
-                    meta_line = line.strip().split(":")
-                    metadata[meta_line[0]] = meta_line[1].strip()
-                else:
-                    continue
+                    self.parse_metadata(line, metadata)
         metadata_df = pd.DataFrame([metadata])
-        qsos_df = pd.DataFrame(qsos).assign(
-                id=lambda x: x["mycall"] + "_" + x.index.astype(str)
-        )
+        qsos_df = self.parse_qsos(qso_lines)
         return metadata_df, qsos_df
+
+    def iter_log(self, batch_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Parses the log in batches of QSO records with bounded memory.
+
+        The file is read line by line and only one batch of lines is held at a
+        time. QSO ids are numbered across batches exactly as in `store_log`.
+        Once the iterator is exhausted, `metadata` holds the log metadata.
+
+        Parameters
+        ----------
+        batch_size : Optional[int]
+            Number of QSOs per batch. Defaults to the `batch_size` given at
+            construction, or 10000.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            Iterator over DataFrames with parsed QSO records.
+        """
+        batch_size = batch_size or self.batch_size or 10000
+        metadata: Dict[str, str] = {}
+        qso_lines: List[str] = []
+        start = 0
+        for line in self.iter_lines(path=self.path):
+            if line.startswith("QSO:"):
+                qso_lines.append(line)
+                if len(qso_lines) == batch_size:
+                    yield self.parse_qsos(qso_lines, start=start)
+                    start += len(qso_lines)
+                    qso_lines = []
+            elif not line.startswith("X-QSO"):
+                self.parse_metadata(line, metadata)
+        if qso_lines:
+            yield self.parse_qsos(qso_lines, start=start)
+        self.metadata = pd.DataFrame([metadata])
+
+    @staticmethod
+    def parse_metadata(line: str, metadata: Dict[str, str]) -> None:
+        """
+        Parses a ``TAG: value`` header line into the metadata dictionary.
+
+        Parameters
+        ----------
+        line : str
+            Raw header line of a Cabrillo log.
+        metadata : Dict[str, str]
+            Dictionary updated in place with the parsed tag.
+        """
+        meta_line = line.strip().split(":")
+        metadata[meta_line[0]] = meta_line[1].strip()
+
+    @staticmethod
+    def parse_qsos(lines: List[str], start: int = 0) -> pd.DataFrame:
+        """
+        Parses ``QSO:`` lines into a DataFrame, one column at a time.
+
+        All lines are split in bulk and transposed into column arrays, and
+        date and time are converted to datetimes in a single vectorized call,
+        instead of building one dictionary per QSO.
+
+        Columns are compact: 32 and 16-bit integers, categoricals for the
+        fields repeated across QSOs and Arrow-backed strings (see
+        `string_dtype`) for calls and ids. A missing radio is ``"0"``.
+
+        Parameters
+        ----------
+        lines : List[str]
+            Raw ``QSO:`` lines of a Cabrillo log.
+        start : int
+            Position of the first line within the log, used for the index and
+            the QSO ids when parsing in batches.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame with parsed QSO records.
+
+        Raises
+        ------
+        ValueError
+            If a QSO line has fewer fields than the Cabrillo QSO template.
+        """
+        rows = [line.split() for line in lines]
+        if rows and min(len(row) for row in rows) < 11:
+            raise ValueError("QSO line with missing fields")
+        columns = list(zip(*(row[1:11] for row in rows)))
+        if not columns:
+            columns = [()] * 10
+        frequency, mode, date, time, mycall, myrst, myexch, call, rst, exch = columns
+        datetimes = pd.to_datetime(
+            pd.Series(date, dtype=object) + " " + pd.Series(time, dtype=object),
+            format="%Y-%m-%d %H%M",
+        )
+        mycall = np.array(mycall, dtype=object)
+        index = pd.RangeIndex(start, start + len(rows))
+        return pd.DataFrame(
+            {
+                "frequency": np.array(frequency, dtype=np.int32),
+                "mode": pd.Categorical(mode),
+                "datetime": datetimes.to_numpy(),
+                "mycall": pd.Categorical(mycall),
+                "myrst": np.array(myrst, dtype=np.int16),
+                "myexch": pd.Categorical(myexch),
+                "call": pd.array(call, dtype=string_dtype()),
+                "rst": pd.Categorical(rst),
+                "exch": pd.Categorical(exch),
+                "radio": pd.Categorical(["0" if len(row) < 12 else row[11] for row in rows]),
+                "id": pd.array(mycall + "_" + index.astype(str), dtype=string_dtype()),
+            },
+            index=index,
+        )
@@ -1,5 +1,5 @@
 """Local cabrillo logs"""
-from typing import IO
+from typing import IO, Optional
 from hamcontestlog.log.base import LogBase
 
 
@@ -11,9 +11,12 @@ class LogLocal(LogBase):
     ----------
     path : str
         The file path to the log file.
+    batch_size : Optional[int]
+        If given, the log is read in batches with `iter_log` instead of being
+        parsed at construction.
     """
     
-    def __init__(self, path: str):
+    def __init__(self, path: str, batch_size: Optional[int] = None):
         """
         Initializes the LogLocal class and processes the log file.
 
@@ -21,9 +24,12 @@ class LogLocal(LogBase):
         ----------
         path : str
             The file path to the log file.
+        batch_size : Optional[int]
+            Number of QSOs per batch in streaming mode.
         """
-        super().__init__(path=path)
-        self.metadata, self.log = self.store_log(path=path)
+        super().__init__(path=path, batch_size=batch_size)
+        if not self.streaming:
+            self.metadata, self.log = self.store_log(path=path)
 
     def open_file(self, path: str) -> IO[str]:
         """
@@ -1,8 +1,11 @@
 """Online cabrillo logs"""
 
-import requests
 import io
+from typing import Iterator, Optional
 from hamcontestlog.log.base import LogBase
+from hamcontestlog.utils.http import fetch
+from hamcontestlog.utils.http import get_cache
+from hamcontestlog.utils.http import get_session
 
 
 
@@ -11,14 +14,22 @@ class LogOnline(LogBase):
     Class for processing log files stored online.
 
     This class fetches log files from a given URL and processes their contents.
+    Downloads go through the shared pooled session from `get_session` and the
+    on-disk HTTP cache, if one is configured with `configure_cache`.
 
     Parameters
     ----------
     path : str
         The URL of the log file.
+    batch_size : Optional[int]
+        If given, the log is streamed in batches with `iter_log` instead of
+        being downloaded and parsed at construction.
+    text : Optional[str]
+        Content of the log if it was already downloaded, to parse it without
+        fetching it again.
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, batch_size: Optional[int] = None, text: Optional[str] = None):
         """
         Initializes the LogOnline class and processes the online log file.
 
@@ -26,9 +37,15 @@ class LogOnline(LogBase):
         ----------
         path : str
             The URL of the log file.
+        batch_size : Optional[int]
+            Number of QSOs per batch in streaming mode.
+        text : Optional[str]
+            Content of the log if it was already downloaded.
         """
-        super().__init__(path=path)
-        self.metadata, self.log = self.store_log(path=path)
+        super().__init__(path=path, batch_size=batch_size)
+        self.text = text
+        if not self.streaming:
+            self.metadata, self.log = self.store_log(path=path)
 
     def open_file(self, path: str) -> io.StringIO:
         """
@@ -49,8 +66,46 @@ class LogOnline(LogBase):
         ValueError
             If the URL does not exist or returns a non-200 status code.
         """
-        response = requests.get(path)
+        if self.text is not None:
+            return io.StringIO(self.text)
+        response = fetch(path, session=get_session())
         if response.status_code == 200:
             return io.StringIO(response.text)  # Create an in-memory file-like object
         else:
             raise ValueError("Link does not exist")
+
+    def iter_lines(self, path: str) -> Iterator[str]:
+        """
+        Streams a log file from a URL line by line without holding the whole body.
+
+        Parameters
+        ----------
+        path : str
+            The URL of the log file.
+
+        Returns
+        -------
+        Iterator[str]
+            Iterator over the lines of the log.
+
+        Raises
+        ------
+        ValueError
+            If the URL does not exist or returns a non-200 status code.
+        """
+        if self.text is not None:
+            yield from io.StringIO(self.text)
+            return
+        cache = get_cache()
+        if cache is not None:
+            # Logs are small, and other threads may evict the body once returned
+            cached = cache.get(path, session=get_session(), in_memory=True)
+            if cached.status_code != 200:
+                raise ValueError("Link does not exist")
+            yield from cached.iter_lines()
+            return
+        with get_session().get(path, stream=True) as response:
+            if response.status_code != 200:
+                raise ValueError("Link does not exist")
+            response.encoding = response.encoding or "utf-8"
+            yield from response.iter_lines(decode_unicode=True)
@@ -0,0 +1,196 @@
+"""
+Local RBN archive
+
+Cleaned RBN spots are stored once per day as Parquet files partitioned by day
+and band (``day=YYYY-MM-DD/band=N/``), sorted by spotted call within each
+band so that row-group statistics on `dx` let scans filtered by call skip most
+of a file. Reading spots for another list of calls then scans local files
+instead of downloading and cleaning the daily ZIP archives again.
+"""
+
+import datetime
+from functools import lru_cache
+import glob
+import os
+import tempfile
+from typing import Iterable, List, Optional
+
+import duckdb
+import pandas as pd
+
+from hamcontestlog.rbn.rbn import RBN_CLEAN_SQL
+from hamcontestlog.rbn.rbn import RBN_SPOT_COLUMNS
+from hamcontestlog.rbn.rbn import ReverseBeaconReader
+from hamcontestlog.rbn.rbn import create_continents_table
+from hamcontestlog.rbn.rbn import read_csv_sql
+from hamcontestlog.utils.frames import string_dtype
+from hamcontestlog.utils.http import get_cache
+from hamcontestlog.utils.profiling import stage
+
+
+class RbnArchive:
+    """
+    Parquet archive of cleaned RBN spots, partitioned by day and band.
+
+    Attributes:
+        directory (str): Root directory of the archive.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def day_directory(self, date: datetime.date) -> str:
+        """Directory holding the partitions of one day."""
+        return os.path.join(self.directory, f"day={date:%Y-%m-%d}")
+
+    def has_day(self, date: datetime.date) -> bool:
+        """Whether the spots of a day are archived."""
+        return os.path.isdir(self.day_directory(date))
+
+    def add_day(self, date: datetime.date) -> None:
+        """
+        Downloads, cleans and archives the spots of one day.
+
+        The day is written to a temporary directory and moved into place at the
+        end, so readers never see a partially written day.
+
+        Args:
+            date (datetime.date): Day of the RBN ZIP archive to add.
+
+        Raises:
+            requests.HTTPError: If the download request fails.
+        """
+        with tempfile.TemporaryDirectory(dir=self.directory, prefix=".tmp-") as tmp:
+            url = ReverseBeaconReader.url_history.format(date=date)
+            paths = ReverseBeaconReader.extract_csv(url=url, directory=tmp)
+            output = os.path.join(tmp, "parquet")
+            escaped = output.replace("'", "''")
+            con = duckdb.connect()
+            try:
+                con.execute(f"CREATE TEMP VIEW rbn_spots AS {read_csv_sql(paths)}")
+                create_continents_table(con, spots="rbn_spots", name="rbn_continents")
+                clean = RBN_CLEAN_SQL.format(spots="rbn_spots", continents="rbn_continents")
+                with stage("rbn archive") as task:
+                    n_spots = con.execute(
+                        f"""
+                        COPY (SELECT *, DATE '{date:%Y-%m-%d}' AS day FROM ({clean}) ORDER BY band, dx)
+                        TO '{escaped}' (FORMAT parquet, PARTITION_BY (day, band), COMPRESSION zstd)
+                        """
+                    ).fetchone()[0]
+                    task.add(rows=n_spots, nbytes=sum(os.path.getsize(path) for path in paths))
+            finally:
+                con.close()
+
+            day_directory = os.path.join(output, os.path.basename(self.day_directory(date)))
+            # Days without valid spots are archived as an empty directory
+            os.makedirs(day_directory, exist_ok=True)
+            try:
+                os.rename(day_directory, self.day_directory(date))
+            except OSError:
+                # Archived meanwhile by another process
+                if not self.has_day(date):
+                    raise
+
+    def ensure_days(self, dates: Iterable[datetime.date]) -> None:
+        """Archives the given days that are not archived yet."""
+        for date in dates:
+            if not self.has_day(date):
+                self.add_day(date)
+
+    def files(self, dates: Iterable[datetime.date], bands: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Lists the Parquet files of the given days and bands.
+
+        Args:
+            dates (Iterable[datetime.date]): Days to read.
+            bands (Optional[Iterable[int]]): Bands to read, all by default.
+
+        Returns:
+            List[str]: Paths of the Parquet files.
+        """
+        band_patterns = ["*"] if bands is None else [str(band) for band in bands]
+        return sorted(
+            path
+            for date in dates
+            for band in band_patterns
+            for path in glob.glob(os.path.join(self.day_directory(date), f"band={band}", "*.parquet"))
+        )
+
+    def scan_sql(self, dates: Iterable[datetime.date], bands: Optional[Iterable[int]] = None) -> Optional[str]:
+        """
+        Builds a DuckDB scan of the archived spots of the given days and bands.
+
+        Only the files of those partitions are read. The columns are the ones of
+        `RBN_SPOT_COLUMNS`, `band` being restored from the partition path.
+
+        Args:
+            dates (Iterable[datetime.date]): Days to read.
+            bands (Optional[Iterable[int]]): Bands to read, all by default.
+
+        Returns:
+            Optional[str]: SELECT statement over the files, or None if there
+                are no archived spots.
+        """
+        paths = self.files(dates=dates, bands=bands)
+        if not paths:
+            return None
+        files = ", ".join("'" + path.replace("'", "''") + "'" for path in paths)
+        return (
+            f"SELECT {', '.join(RBN_SPOT_COLUMNS)} FROM read_parquet([{files}], "
+            "hive_partitioning = true, hive_types = {'day': DATE, 'band': BIGINT})"
+        )
+
+    def read(
+        self,
+        dates: Iterable[datetime.date],
+        calls: Optional[List[str]] = None,
+        bands: Optional[Iterable[int]] = None,
+    ) -> pd.DataFrame:
+        """
+        Reads archived spots as a DataFrame.
+
+        Args:
+            dates (Iterable[datetime.date]): Days to read.
+            calls (Optional[List[str]]): Spotted calls to keep, all by default.
+            bands (Optional[Iterable[int]]): Bands to read, all by default.
+
+        Returns:
+            pd.DataFrame: Cleaned spots, as built by `ReverseBeaconReader.load`,
+                with its compact `ReverseBeaconReader.dtypes`.
+        """
+        scan = self.scan_sql(dates=dates, bands=bands)
+        if scan is None:
+            return pd.DataFrame(columns=RBN_SPOT_COLUMNS).astype(ReverseBeaconReader.dtypes)
+        con = duckdb.connect()
+        try:
+            if calls is None:
+                data = con.execute(scan).fetchdf()
+            else:
+                data = con.execute(
+                    f"SELECT * FROM ({scan}) WHERE dx IN (SELECT unnest(?::VARCHAR[]))", [calls]
+                ).fetchdf()
+        finally:
+            con.close()
+        # Categories hold the same string dtype as the ones of the CSV reader
+        strings = {c: string_dtype() for c, dtype in ReverseBeaconReader.dtypes.items() if dtype == "category"}
+        return data.astype(strings).astype(ReverseBeaconReader.dtypes)
+
+
+@lru_cache()
+def get_rbn_archive() -> Optional[RbnArchive]:
+    """
+    Get the process-wide RBN archive.
+
+    It is stored in ``HAMCONTESTLOG_RBN_ARCHIVE``, or under ``rbn/`` in
+    ``HAMCONTESTLOG_CACHE_DIR`` or the configured HTTP cache directory. Without
+    any of them there is no archive and RBN data is downloaded every time.
+    """
+    directory = os.environ.get("HAMCONTESTLOG_RBN_ARCHIVE")
+    if directory is None:
+        cache_directory = os.environ.get("HAMCONTESTLOG_CACHE_DIR")
+        if cache_directory is None and get_cache() is not None:
+            cache_directory = get_cache().directory
+        if cache_directory is not None:
+            directory = os.path.join(cache_directory, "rbn")
+    return RbnArchive(directory) if directory else None
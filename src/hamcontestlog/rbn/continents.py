@@ -0,0 +1,99 @@
+"""
+Persistent prefix to continent cache
+
+Resolving a callsign prefix to its continent goes through pyhamtools, one
+Python call per prefix. RBN files of different days share almost all of their
+prefixes, so resolved prefixes are kept in memory and in an SQLite file shared
+across days and processes, and only unseen prefixes are looked up. Prefixes
+without a continent are only kept in memory, so that they are resolved again
+by later processes, e.g. after the countryfile is updated.
+"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from hamcontestlog.utils.http import get_cache
+
+
+class ContinentCache:
+    """
+    Cache of prefix to continent lookups.
+
+    Attributes:
+        path (Optional[str]): SQLite file persisting the lookups, or None to
+            keep them in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._continents: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        if self.path is not None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with self._connect() as con:
+                con.execute("CREATE TABLE IF NOT EXISTS continents (prefix TEXT PRIMARY KEY, continent TEXT)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.path, timeout=60)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def lookup(self, prefixes: Iterable[str], resolve: Callable[[str], str]) -> Dict[str, Optional[str]]:
+        """
+        Maps prefixes to continents, resolving only the ones not seen before.
+
+        Args:
+            prefixes (Iterable[str]): Prefixes to look up.
+            resolve (Callable[[str], str]): Resolver for unknown prefixes; a
+                `KeyError` marks the prefix as having no continent, which is
+                not persisted.
+
+        Returns:
+            Dict[str, Optional[str]]: Continent of each prefix (None if unknown).
+        """
+        wanted = set(prefixes)
+        with self._lock:
+            missing = wanted - self._continents.keys()
+            if missing and self.path is not None:
+                # Pick up prefixes resolved meanwhile by other processes
+                with self._connect() as con:
+                    self._continents.update(
+                        con.execute("SELECT prefix, continent FROM continents WHERE continent IS NOT NULL").fetchall()
+                    )
+                missing -= self._continents.keys()
+
+            resolved: Dict[str, Optional[str]] = {}
+            for prefix in missing:
+                try:
+                    resolved[prefix] = resolve(prefix)
+                except KeyError:
+                    resolved[prefix] = None
+            self._continents.update(resolved)
+
+            known = [(prefix, continent) for prefix, continent in resolved.items() if continent is not None]
+            if known and self.path is not None:
+                with self._connect() as con:
+                    con.executemany("INSERT OR REPLACE INTO continents VALUES (?, ?)", known)
+            return {prefix: self._continents[prefix] for prefix in wanted}
+
+
+@lru_cache()
+def get_continent_cache() -> ContinentCache:
+    """
+    Get the process-wide continent cache.
+
+    It is persisted in ``continents.sqlite`` under ``HAMCONTESTLOG_CACHE_DIR``
+    or the configured HTTP cache directory, and kept in memory otherwise.
+    """
+    directory = os.environ.get("HAMCONTESTLOG_CACHE_DIR")
+    if directory is None and get_cache() is not None:
+        directory = get_cache().directory
+    return ContinentCache(path=os.path.join(directory, "continents.sqlite") if directory else None)
@@ -13,16 +13,178 @@ a structured pandas DataFrame, with continent enrichment using external call inf
 
 from abc import ABC
 import datetime
-import hashlib
+from importlib.util import find_spec
+import io
+import os
+import duckdb
+import numpy as np
 import pandas as pd
 import zipfile
-import requests
-import tempfile
-from typing import Dict, ClassVar
+from typing import IO, TYPE_CHECKING, Dict, ClassVar, List, Optional
+from hamcontestlog.rbn.continents import get_continent_cache
 from hamcontestlog.utils import get_call_info
+from hamcontestlog.utils.cache import response_retries
+from hamcontestlog.utils.http import get_session
+from hamcontestlog.utils.profiling import stage
 
+if TYPE_CHECKING:
+    from hamcontestlog.rbn.archive import RbnArchive
 
-call_info = get_call_info()
+
+# Spot id: the lower 63 bits of the MD5 of spotted call, spotter, time and
+# frequency, as a BIGINT. It is computed by DuckDB so that the pandas path,
+# SQL ingestion and migrations of existing tables all produce the same ids.
+SPOT_ID_SQL = (
+    "CAST(md5_number(dx || callsign || strftime(datetime, '%Y-%m-%d %H:%M:%S') || CAST(freq AS VARCHAR))"
+    " & 9223372036854775807 AS BIGINT)"
+)
+
+
+# Columns of the raw RBN CSV files used by SQL ingestion, with their DuckDB types
+RBN_CSV_TYPES = {
+    "callsign": "VARCHAR",
+    "de_pfx": "VARCHAR",
+    "de_cont": "VARCHAR",
+    "freq": "DOUBLE",
+    "band": "VARCHAR",
+    "dx": "VARCHAR",
+    "dx_pfx": "VARCHAR",
+    "dx_cont": "VARCHAR",
+    "mode": "VARCHAR",
+    "db": "BIGINT",
+    "date": "VARCHAR",
+    "speed": "BIGINT",
+}
+
+# Columns of cleaned spots with their DuckDB types, as stored in raw_rbn tables
+# and the RBN archive
+RBN_SPOT_TYPES = {
+    "callsign": "VARCHAR",
+    "freq": "DOUBLE",
+    "band": "BIGINT",
+    "dx": "VARCHAR",
+    "mode": "VARCHAR",
+    "db": "BIGINT",
+    "speed": "BIGINT",
+    "de_cont": "VARCHAR",
+    "dx_cont": "VARCHAR",
+    "datetime": "TIMESTAMP_NS",
+    "id": "BIGINT",
+}
+RBN_SPOT_COLUMNS = list(RBN_SPOT_TYPES)
+
+# SQL counterpart of the cleanup in `ReverseBeaconReader.load`: selects clean
+# spots with their ids from the raw spots `{spots}`, filling missing continents
+# from the (prefix, continent) relation `{continents}` (see
+# `create_continents_table`). The columns and types match the DataFrame built
+# by `load`.
+RBN_CLEAN_SQL = f"""
+    SELECT {", ".join(RBN_SPOT_COLUMNS[:-1])}, {SPOT_ID_SQL} AS id
+    FROM (
+        SELECT
+            s.callsign,
+            s.freq,
+            CAST(replace(s.band, 'm', '') AS BIGINT) AS band,
+            s.dx,
+            s.mode,
+            s.db,
+            s.speed,
+            coalesce(s.de_cont, de.continent) AS de_cont,
+            coalesce(s.dx_cont, dx.continent) AS dx_cont,
+            CAST(s.date AS TIMESTAMP_NS) AS datetime
+        FROM {{spots}} AS s
+        LEFT JOIN {{continents}} AS de ON s.de_cont IS NULL AND de.prefix = s.de_pfx
+        LEFT JOIN {{continents}} AS dx ON s.dx_cont IS NULL AND dx.prefix = s.dx_pfx
+        WHERE s.dx IS NOT NULL AND contains(s.band, 'm') AND NOT contains(s.band, 'cm')
+    )
+"""
+
+
+def resolve_continent(prefix: str) -> str:
+    """
+    Resolves the continent of a callsign prefix with pyhamtools.
+
+    The countryfile is loaded on the first call, not when importing this module.
+
+    Args:
+        prefix (str): Callsign prefix, as in the `de_pfx` and `dx_pfx` columns.
+
+    Returns:
+        str: Continent code.
+
+    Raises:
+        KeyError: If the prefix is unknown.
+    """
+    return get_call_info().get_continent(f"{prefix}1AA")
+
+
+def create_continents_table(con: duckdb.DuckDBPyConnection, spots: str, name: str = "rbn_continents") -> None:
+    """
+    Creates a temporary (prefix, continent) table for `RBN_CLEAN_SQL`.
+
+    Only the distinct prefixes of spots lacking a continent are resolved, through
+    the persistent prefix cache of `get_continent_cache()`.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection where `spots` is defined.
+        spots (str): Table or view with raw spots (`RBN_CSV_TYPES` columns).
+        name (str): Name of the temporary table to create.
+    """
+    missing = [
+        p[0]
+        for p in con.execute(
+            f"""
+            SELECT DISTINCT prefix FROM (
+                SELECT de_pfx AS prefix FROM {spots} WHERE de_cont IS NULL
+                UNION ALL
+                SELECT dx_pfx AS prefix FROM {spots} WHERE dx_cont IS NULL
+            ) WHERE prefix IS NOT NULL
+            """
+        ).fetchall()
+    ]
+    continents = get_continent_cache().lookup(missing, resolve=resolve_continent)
+    con.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE {name} AS
+        SELECT unnest(?::VARCHAR[]) AS prefix, unnest(?::VARCHAR[]) AS continent
+        """,
+        [list(continents), list(continents.values())],
+    )
+
+
+def read_csv_sql(paths: List[str]) -> str:
+    """
+    Builds a DuckDB scan of raw RBN CSV files with the `RBN_CSV_TYPES` columns.
+
+    Only empty fields are missing values, as in `ReverseBeaconReader.read_csv`.
+
+    Args:
+        paths (List[str]): Paths of the CSV files.
+
+    Returns:
+        str: SELECT statement over the files.
+    """
+    files = ", ".join("'" + path.replace("'", "''") + "'" for path in paths)
+    types = ", ".join(f"'{column}': '{type_}'" for column, type_ in RBN_CSV_TYPES.items())
+    return f"SELECT {', '.join(RBN_CSV_TYPES)} FROM read_csv([{files}], header = true, nullstr = '', types = {{{types}}})"
+
+
+def spot_ids(data: pd.DataFrame) -> np.ndarray:
+    """
+    Computes the 64-bit ids of RBN spots in one vectorized pass.
+
+    Args:
+        data (pd.DataFrame): Spots with `dx`, `callsign`, `datetime` and `freq` columns.
+
+    Returns:
+        np.ndarray: int64 id of each spot, in the order of `data`.
+    """
+    con = duckdb.connect()
+    try:
+        con.register("spots", data[["dx", "callsign", "datetime", "freq"]])
+        return con.sql(f"SELECT {SPOT_ID_SQL} AS id FROM spots").fetchnumpy()["id"]
+    finally:
+        con.close()
 
 
 class ReverseBeaconReader(ABC):
@@ -30,114 +192,241 @@ class ReverseBeaconReader(ABC):
     Abstract base class for reading and processing Reverse Beacon Network (RBN) data.
 
     Attributes:
-        dtypes (ClassVar[Dict[str, str]]): Expected dtypes of the cleaned DataFrame.
+        url_history (ClassVar[str]): URL template of the daily ZIP archives.
+        dtypes (ClassVar[Dict[str, str]]): Compact dtypes of the cleaned DataFrame:
+            categoricals for calls, modes and continents (a day repeats each of
+            them many times) and 16-bit integers. They are cast to
+            `RBN_SPOT_TYPES` when inserted into DuckDB.
+        raw_dtypes (ClassVar[Dict[str, str]]): Columns read from the raw CSV files
+            and their dtypes.
         date (datetime.date): The date of the RBN data to load.
         url (str): URL pointing to the ZIP archive for the specified date.
+        archive (Optional[RbnArchive]): Local archive of cleaned spots, if any.
         data (pd.DataFrame): Parsed and cleaned DataFrame after `load()` is called.
     """
 
+    url_history: ClassVar[str] = "https://data.reversebeacon.net/rbn_history/{date:%Y%m%d}.zip"
+
     dtypes: ClassVar[Dict[str, str]] = {
+        "callsign": "category",
+        "freq": "float64",
+        "band": "int16",
+        "dx": "category",
+        "mode": "category",
+        "db": "int16",
+        "speed": "int16",
+        "de_cont": "category",
+        "dx_cont": "category",
+    }
+
+    raw_dtypes: ClassVar[Dict[str, str]] = {
         "callsign": "str",
-        "freq": "float",
-        "band": "int",
+        "de_pfx": "str",
+        "de_cont": "str",
+        "freq": "float64",
+        "band": "str",
         "dx": "str",
+        "dx_pfx": "str",
+        "dx_cont": "str",
         "mode": "str",
-        "db": "int",
+        "db": "float64",
         "date": "str",
-        "speed": "int",
-        "de_cont": "str",
-        "dx_cont": "str",
+        "speed": "float64",
     }
 
-    def __init__(self, date: datetime.date):
+    def __init__(self, date: datetime.date, archive: Optional["RbnArchive"] = None):
         """
         Initializes the RBN reader for a specific date.
 
         Args:
             date (datetime.date): Date corresponding to the daily RBN ZIP archive.
+            archive (Optional[RbnArchive]): Local archive the spots are read from
+                (and added to if missing). Defaults to `get_rbn_archive()`.
         """
         self.date = date
-        self.url = f"https://data.reversebeacon.net/rbn_history/{datetime.datetime.strftime(self.date, '%Y%m%d')}.zip"
+        self.url = self.url_history.format(date=self.date)
+        if archive is None:
+            from hamcontestlog.rbn.archive import get_rbn_archive
+
+            archive = get_rbn_archive()
+        self.archive = archive
         self.data = self.load()
 
     @staticmethod
-    def get_raw_data(url: str) -> pd.DataFrame:
+    def download_archive(url: str) -> io.BytesIO:
+        """
+        Downloads a daily RBN ZIP archive in memory over the shared pooled session.
+
+        Args:
+            url (str): Direct URL to the .zip archive containing the RBN data.
+
+        Returns:
+            io.BytesIO: The archive content.
+
+        Raises:
+            requests.HTTPError: If the download request fails.
+        """
+        archive = io.BytesIO()
+        with stage("rbn download") as task, get_session().get(url, stream=True) as r:
+            r.raise_for_status()
+            for chunk in r.iter_content(chunk_size=1 << 20):
+                archive.write(chunk)
+            task.add(nbytes=archive.tell(), retries=response_retries(r))
+        return archive
+
+    @staticmethod
+    def csv_members(z: zipfile.ZipFile) -> List[str]:
+        """
+        Lists the CSV files of an RBN ZIP archive.
+
+        Raises:
+            ValueError: If the archive contains no CSV file.
+        """
+        csv_files = [f for f in z.namelist() if f.lower().endswith(".csv")]
+        if not csv_files:
+            raise ValueError("No .csv file found in ZIP archive")
+        return csv_files
+
+    @classmethod
+    def get_raw_data(cls, url: str) -> pd.DataFrame:
         """
         Downloads and extracts raw CSV data from a Reverse Beacon Network ZIP file.
 
+        The archive is downloaded in memory over the shared pooled session and
+        each CSV is decompressed straight into the CSV reader, which only parses
+        the columns in `raw_dtypes` with explicit types (see `read_csv`).
+
         Args:
             url (str): Direct URL to the .zip archive containing the RBN data.
 
         Returns:
-            pd.DataFrame: Combined DataFrame of all CSVs found in the archive.
+            pd.DataFrame: Combined DataFrame of all CSV files in the archive.
 
         Raises:
             ValueError: If no CSV file is found in the archive.
             requests.HTTPError: If the download request fails.
             zipfile.BadZipFile: If the downloaded file is not a valid ZIP.
         """
-        data = None
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            with tempfile.NamedTemporaryFile(suffix=".zip") as tmp_file:
-                for chunk in r.iter_content(chunk_size=8192):
-                    tmp_file.write(chunk)
-                tmp_file.flush()
-
-                with zipfile.ZipFile(tmp_file.name, 'r') as z:
-                    csv_files = [f for f in z.namelist() if f.lower().endswith(".csv")]
-                    if not csv_files:
-                        raise ValueError("No .csv file found in ZIP archive")
-
-                    dfs = []
-                    for csv_file in csv_files:
-                        with z.open(csv_file) as f:
-                            dfs.append(pd.read_csv(f))
-                    data = pd.concat(dfs, ignore_index=True)
-        return data
+        with zipfile.ZipFile(cls.download_archive(url), "r") as z, stage("rbn parse") as task:
+            dfs = []
+            for csv_file in cls.csv_members(z):
+                with z.open(csv_file) as f:
+                    dfs.append(cls.read_csv(f))
+                task.add(rows=len(dfs[-1]), nbytes=z.getinfo(csv_file).file_size)
+        return pd.concat(dfs, ignore_index=True) if len(dfs) > 1 else dfs[0]
+
+    @classmethod
+    def extract_csv(cls, url: str, directory: str) -> List[str]:
+        """
+        Downloads a daily RBN ZIP archive and extracts its CSV files to disk.
+
+        Used by SQL ingestion (`ContestBase.add_rbn_csv`), where DuckDB reads
+        the files directly and no DataFrame is built.
+
+        Args:
+            url (str): Direct URL to the .zip archive containing the RBN data.
+            directory (str): Directory the CSV files are extracted to.
+
+        Returns:
+            List[str]: Paths of the extracted CSV files.
+
+        Raises:
+            ValueError: If no CSV file is found in the archive.
+            requests.HTTPError: If the download request fails.
+            zipfile.BadZipFile: If the downloaded file is not a valid ZIP.
+        """
+        with zipfile.ZipFile(cls.download_archive(url), "r") as z, stage("rbn extract") as task:
+            paths = [z.extract(csv_file, path=directory) for csv_file in cls.csv_members(z)]
+            task.add(nbytes=sum(os.path.getsize(path) for path in paths))
+            return paths
+
+    @classmethod
+    def read_csv(cls, f: IO[bytes]) -> pd.DataFrame:
+        """
+        Reads the columns in `raw_dtypes` of one RBN CSV file.
+
+        With pyarrow installed the file is parsed by the multithreaded Arrow CSV
+        reader straight into the requested types and the strings stay
+        Arrow-backed; otherwise pandas' C parser is used. Only empty fields are
+        missing values, so the "NA" continent is kept as North America.
+
+        Args:
+            f (IO[bytes]): Binary file object with the CSV content.
+
+        Returns:
+            pd.DataFrame: Raw spots with the columns in `raw_dtypes`.
+        """
+        if find_spec("pyarrow") is None:
+            return pd.read_csv(
+                f, usecols=list(cls.raw_dtypes), dtype=cls.raw_dtypes, keep_default_na=False, na_values=[""]
+            )
+
+        import pyarrow as pa
+        from pyarrow import csv
+
+        arrow_types = {"str": pa.string(), "float64": pa.float64()}
+        table = csv.read_csv(
+            f,
+            read_options=csv.ReadOptions(use_threads=True, block_size=1 << 24),
+            convert_options=csv.ConvertOptions(
+                include_columns=list(cls.raw_dtypes),
+                column_types={c: arrow_types[t] for c, t in cls.raw_dtypes.items()},
+                null_values=[""],
+                strings_can_be_null=True,
+            ),
+        )
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
 
     def load(self) -> pd.DataFrame:
         """
         Loads and processes the RBN data for the given date.
 
-        This includes:
+        With a local archive, the day is archived if needed and read back from
+        its Parquet files. Otherwise this includes:
         - Downloading and parsing raw data
-        - Filling in missing continent fields using `get_call_info()`
+        - Filling in missing continent fields using `get_call_info()`, through
+          the persistent prefix cache of `get_continent_cache()`
         - Filtering out invalid rows
         - Converting band and date formats
         - Final type enforcement and cleanup
 
         The result is returned as pandas dataframe.
         """
-        raw_data = self.get_raw_data(url=self.url)
+        if self.archive is not None:
+            self.archive.ensure_days([self.date])
+            return self.archive.read(dates=[self.date])
 
-        # Fill missing continent info for spotter prefix (de_pfx)
-        for p in raw_data.query("de_cont.isnull()")["de_pfx"].unique():
-            try:
-                raw_data.loc[(raw_data["de_pfx"] == p), "de_cont"] = call_info.get_continent(f"{p}1AA")
-            except KeyError:
-                continue
+        raw_data = self.get_raw_data(url=self.url)
+        with stage("rbn clean", rows=len(raw_data)):
+            return self.clean(raw_data)
 
-        # Fill missing continent info for spotted prefix (dx_pfx)
-        for p in raw_data.query("dx_cont.isnull()")["dx_pfx"].unique():
-            try:
-                raw_data.loc[(raw_data["dx_pfx"] == p), "dx_cont"] = call_info.get_continent(f"{p}1AA")
-            except KeyError:
-                continue
+    def clean(self, raw_data: pd.DataFrame) -> pd.DataFrame:
+        """Fills missing continents and cleans up the raw spots, as described in `load`."""
+        # Fill missing continent info for spotter (de_pfx) and spotted (dx_pfx)
+        # prefixes: resolve each unique prefix once through the persistent
+        # cache and apply the mapping in one vectorized pass per column
+        missing = pd.concat(
+            [
+                raw_data.loc[raw_data["de_cont"].isnull(), "de_pfx"],
+                raw_data.loc[raw_data["dx_cont"].isnull(), "dx_pfx"],
+            ]
+        ).dropna().unique()
+        continents = get_continent_cache().lookup(missing, resolve=resolve_continent)
+        raw_data["de_cont"] = raw_data["de_cont"].fillna(raw_data["de_pfx"].map(continents))
+        raw_data["dx_cont"] = raw_data["dx_cont"].fillna(raw_data["dx_pfx"].map(continents))
 
         # Final cleanup and transformation
         data = (
-            raw_data.loc[:, self.dtypes.keys()]
+            raw_data.loc[:, [*self.dtypes, "date"]]
             .dropna(subset=["dx"])
             .query("(band.str.contains('m') & ~(band.str.contains('cm')))")
             .assign(
                 band=lambda x: x["band"].str.replace("m", "").astype(int),
                 datetime=lambda x: pd.to_datetime(x["date"]),
-                dummy=lambda x: x["dx"] + x["callsign"] + x["date"] + x["freq"].astype(str),
-                id=lambda x: x["dummy"].apply(lambda val: hashlib.sha256(val.encode()).hexdigest())
             )
+            .drop(columns=["date"])
             .astype(self.dtypes)
-            .drop(columns=["date", "dummy"])
         )
+        data["id"] = spot_ids(data)
         return data
 
@@ -1,18 +1,64 @@
-"""Common package entrypoint."""
+"""Common package entrypoint.
+
+Helpers are imported on first access, so that importing the package (and the
+command line interface) does not load pyhamtools, requests or their
+dependencies.
+"""
 
 from functools import lru_cache
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pyhamtools import Callinfo
+    from pyhamtools import LookupLib
+
+    from hamcontestlog.utils.concurrency import bounded_map
+    from hamcontestlog.utils.http import configure_cache
+    from hamcontestlog.utils.http import fetch
+    from hamcontestlog.utils.http import get_cache
+    from hamcontestlog.utils.http import get_session
+
+
+# Module defining each lazily imported helper
+_LAZY_ATTRIBUTES = {
+    "bounded_map": "hamcontestlog.utils.concurrency",
+    "configure_cache": "hamcontestlog.utils.http",
+    "fetch": "hamcontestlog.utils.http",
+    "get_cache": "hamcontestlog.utils.http",
+    "get_session": "hamcontestlog.utils.http",
+}
+
 
-from pyhamtools import Callinfo
-from pyhamtools import LookupLib
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @lru_cache()
-def get_call_info() -> Callinfo:
+def get_lookuplib() -> "LookupLib":
+    """Get the countryfile lookup library, downloaded once per process."""
+    from pyhamtools import LookupLib
+
+    return LookupLib(lookuptype="countryfile")
+
+
+@lru_cache()
+def get_call_info() -> "Callinfo":
     """Get initialized call_info object."""
-    call_info = Callinfo(LookupLib(lookuptype="countryfile"))
+    from pyhamtools import Callinfo
+
+    call_info = Callinfo(get_lookuplib())
     return call_info
 
 
 __all__ = [
+    "bounded_map",
+    "configure_cache",
+    "fetch",
+    "get_cache",
     "get_call_info",
+    "get_lookuplib",
+    "get_session",
 ]
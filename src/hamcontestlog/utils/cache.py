@@ -0,0 +1,255 @@
+"""Persistent on-disk HTTP cache.
+
+Response bodies are stored once per content hash under ``objects/`` and an
+SQLite index maps each URL to its body, validators (ETag/Last-Modified) and
+last access time. Cached URLs are revalidated with conditional requests, the
+total size is capped with least-recently-used eviction, and in offline mode
+only cached responses are served.
+
+Index updates, eviction and in-memory reads of a body happen under one lock,
+and eviction never removes the body being returned, so threads sharing the
+cache don't lose each other's bodies.
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import replace
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+
+class CacheMissError(requests.RequestException):
+    """Raised in offline mode when a URL is not in the cache."""
+
+
+def response_retries(response: requests.Response) -> int:
+    """Number of retries urllib3 made for a response of a session with a `Retry` policy."""
+    retry = getattr(response.raw, "retries", None)
+    return len(retry.history) if retry is not None else 0
+
+
+@dataclass
+class CachedResponse:
+    """Minimal response served from the cache.
+
+    Attributes:
+        url: Requested URL.
+        status_code: HTTP status code (200 for cached bodies).
+        path: Path of the cached body, if any.
+        encoding: Text encoding of the body.
+        from_cache: Whether the body was served without downloading it again.
+        retries: Number of retries of the request.
+        body: Body read in memory, if it was requested with ``in_memory``.
+    """
+
+    url: str
+    status_code: int
+    path: Optional[str] = None
+    encoding: str = "utf-8"
+    from_cache: bool = False
+    retries: int = 0
+    body: Optional[bytes] = None
+
+    @property
+    def content(self) -> bytes:
+        """Raw body."""
+        if self.body is not None:
+            return self.body
+        if self.path is None:
+            return b""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    @property
+    def text(self) -> str:
+        """Decoded body."""
+        return self.content.decode(self.encoding, errors="replace")
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the decoded body line by line without loading it whole."""
+        if self.body is not None:
+            f = io.StringIO(self.text, newline=None)
+        elif self.path is not None:
+            f = io.open(self.path, "r", encoding=self.encoding, errors="replace")
+        else:
+            return
+        with f:
+            for line in f:
+                yield line.rstrip("\r\n")
+
+
+class HttpCache:
+    """Content-addressed HTTP cache with revalidation and LRU eviction.
+
+    Args:
+        directory: Directory holding the cache index and bodies.
+        max_size: Maximum total size of cached bodies, in bytes.
+        offline: Serve only from the cache and never touch the network.
+    """
+
+    def __init__(self, directory: str, max_size: int = 2 * 1024**3, offline: bool = False):
+        self.directory = directory
+        self.max_size = max_size
+        self.offline = offline
+        self._lock = threading.RLock()
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        with self._connect() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    encoding TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=60)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _lookup(self, url: str) -> Optional[sqlite3.Row]:
+        with self._connect() as con:
+            con.row_factory = sqlite3.Row
+            entry = con.execute("SELECT * FROM entries WHERE url = ?", (url,)).fetchone()
+        if entry is not None and not os.path.exists(self._object_path(entry["digest"])):
+            return None
+        return entry
+
+    def _hit(self, url: str, in_memory: bool) -> Optional[CachedResponse]:
+        """Serve a cached URL, or None if it is not (or no longer) cached."""
+        with self._lock:
+            entry = self._lookup(url)
+            if entry is None:
+                return None
+            with self._connect() as con:
+                con.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            path = self._object_path(entry["digest"])
+            body = None
+            if in_memory:
+                with open(path, "rb") as f:
+                    body = f.read()
+        return CachedResponse(
+            url=url, status_code=200, path=path, encoding=entry["encoding"], from_cache=True, body=body
+        )
+
+    def get(self, url: str, session: requests.Session, in_memory: bool = False) -> CachedResponse:
+        """Get a URL through the cache.
+
+        Args:
+            url: URL to fetch.
+            session: Session used for (conditional) requests.
+            in_memory: Read the body in memory before returning, so that it
+                stays available even if the cache evicts it afterwards.
+
+        Returns:
+            The cached or freshly downloaded response. Non-200 responses are
+            returned without a body and are not cached.
+
+        Raises:
+            CacheMissError: If the URL is not cached in offline mode.
+        """
+        if self.offline:
+            cached = self._hit(url, in_memory=in_memory)
+            if cached is None:
+                raise CacheMissError(f"{url} is not in the cache (offline mode)")
+            return cached
+
+        entry = self._lookup(url)
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with session.get(url, headers=headers, stream=True) as response:
+            retries = response_retries(response)
+            if response.status_code == 304 and entry is not None:
+                cached = self._hit(url, in_memory=in_memory)
+                if cached is not None:
+                    return replace(cached, retries=retries)
+                # Evicted since the lookup: download it again without validators
+                return self.get(url, session=session, in_memory=in_memory)
+            if response.status_code != 200:
+                return CachedResponse(url=url, status_code=response.status_code, retries=retries)
+            tmp_path, digest, size, body = self._download_body(response, in_memory=in_memory)
+            encoding = response.encoding or "utf-8"
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        path = self._object_path(digest)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            with self._connect() as con:
+                con.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, digest, size, encoding, etag, last_modified, time.time()),
+                )
+            self.evict(keep=digest)
+        return CachedResponse(url=url, status_code=200, path=path, encoding=encoding, retries=retries, body=body)
+
+    def _download_body(self, response: requests.Response, in_memory: bool) -> Tuple[str, str, int, Optional[bytes]]:
+        """Write a body to a temporary file, returning its path, digest, size and (optionally) content."""
+        sha = hashlib.sha256()
+        size = 0
+        chunks = []
+        objects = os.path.join(self.directory, "objects")
+        with tempfile.NamedTemporaryFile(dir=objects, delete=False) as tmp:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                sha.update(chunk)
+                size += len(chunk)
+                tmp.write(chunk)
+                if in_memory:
+                    chunks.append(chunk)
+        return tmp.name, sha.hexdigest(), size, b"".join(chunks) if in_memory else None
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently used entries until the cache fits in `max_size`.
+
+        Args:
+            keep: Digest of a body that must not be evicted, such as the one
+                being returned, even if it alone exceeds `max_size`.
+        """
+        with self._lock, self._connect() as con:
+            total = con.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+            ).fetchone()[0]
+            if total <= self.max_size:
+                return
+            entries = con.execute("SELECT url, digest, size FROM entries ORDER BY last_access").fetchall()
+            for url, digest, size in entries:
+                if total <= self.max_size:
+                    break
+                if digest == keep:
+                    continue
+                con.execute("DELETE FROM entries WHERE url = ?", (url,))
+                shared = con.execute("SELECT 1 FROM entries WHERE digest = ?", (digest,)).fetchone()
+                if shared is None:
+                    total -= size
+                    try:
+                        os.remove(self._object_path(digest))
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,45 @@
+"""Helpers for bounded concurrent execution."""
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import wait
+from typing import Callable, Iterable, Iterator, Set, Tuple, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    executor: Executor, func: Callable[[T], R], items: Iterable[T], max_pending: int
+) -> Iterator[Tuple[T, "Future[R]"]]:
+    """Submit `func` over `items` keeping at most `max_pending` tasks in flight.
+
+    Futures are yielded as they complete, so the caller can consume results
+    (e.g. write them to the database) while the remaining tasks keep running,
+    and finished-but-unconsumed results never pile up beyond `max_pending`.
+
+    Args:
+        executor: Thread or process pool running the tasks.
+        func: Function applied to each item.
+        items: Inputs to submit.
+        max_pending: Maximum number of submitted, not yet consumed tasks.
+
+    Yields:
+        Tuples of the input item and its completed future.
+    """
+    pending: Set["Future[R]"] = set()
+    inputs = {}
+    for item in items:
+        future = executor.submit(func, item)
+        inputs[future] = item
+        pending.add(future)
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for completed in done:
+                yield inputs.pop(completed), completed
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for completed in done:
+            yield inputs.pop(completed), completed
@@ -0,0 +1,56 @@
+"""Compact pandas representations of QSOs and spots.
+
+Low-cardinality text columns (modes, exchanges, continents, ...) are kept as
+categoricals and high-cardinality ones (calls, ids) as Arrow-backed strings
+when pyarrow is installed, so that frames hold no Python string per value. Both
+are scanned by DuckDB without converting them to Python objects first.
+"""
+
+from importlib.util import find_spec
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def string_dtype() -> Any:
+    """Arrow-backed string dtype, or object without pyarrow."""
+    if find_spec("pyarrow") is None:
+        return np.dtype(object)
+
+    import pyarrow as pa
+
+    return pd.ArrowDtype(pa.string())
+
+
+def concat_frames(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate frames keeping their categorical columns categorical.
+
+    `pd.concat` turns categoricals whose categories differ into object
+    columns, so the categories are unified first.
+
+    Args:
+        frames (Sequence[pd.DataFrame]): Frames with the same columns.
+
+    Returns:
+        pd.DataFrame: Concatenated frame with a new range index.
+    """
+    frames = list(frames)
+    if len(frames) > 1:
+        categorical = [c for c, dtype in frames[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+        categories: Dict[str, pd.Index] = {
+            column: pd.Index(sorted(set().union(*(frame[column].cat.categories for frame in frames))))
+            for column in categorical
+        }
+        if categories:
+            frames = [
+                frame.assign(**{c: frame[c].cat.set_categories(index) for c, index in categories.items()})
+                for frame in frames
+            ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def sql_casts(types: Dict[str, str]) -> List[str]:
+    """SELECT expressions casting each column to its DuckDB type, in order."""
+    return [f"CAST({column} AS {type_}) AS {column}" for column, type_ in types.items()]
@@ -0,0 +1,99 @@
+"""Shared HTTP session and cache for downloads."""
+
+from functools import lru_cache
+from typing import Optional, Union
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from hamcontestlog.utils.cache import CachedResponse
+from hamcontestlog.utils.cache import HttpCache
+from hamcontestlog.utils.cache import response_retries
+from hamcontestlog.utils.profiling import stage
+
+
+@lru_cache()
+def get_session(
+    pool_size: int = 16, retries: int = 5, backoff_factor: float = 0.5
+) -> requests.Session:
+    """Get a keep-alive session with a connection pool and retry with backoff.
+
+    Sessions are cached, so every caller asking for the same settings shares
+    one pool of connections.
+
+    Args:
+        pool_size: Maximum number of connections kept open per host.
+        retries: Number of retries on connection errors and 429/5xx responses.
+        backoff_factor: Base of the exponential backoff between retries, in seconds.
+
+    Returns:
+        The shared session.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_cache: Optional[HttpCache] = None
+
+
+def configure_cache(
+    directory: Optional[str] = None, max_size: int = 2 * 1024**3, offline: bool = False
+) -> Optional[HttpCache]:
+    """Set up the on-disk HTTP cache shared by the log fetchers and listing scrapers.
+
+    Args:
+        directory: Cache directory. Defaults to the ``HAMCONTESTLOG_CACHE_DIR``
+            environment variable; if neither is set, caching is disabled.
+        max_size: Maximum total size of cached bodies, in bytes.
+        offline: Serve only from the cache and never touch the network.
+
+    Returns:
+        The configured cache, or None if caching is disabled.
+    """
+    global _cache
+    directory = directory or os.environ.get("HAMCONTESTLOG_CACHE_DIR")
+    _cache = HttpCache(directory=directory, max_size=max_size, offline=offline) if directory else None
+    return _cache
+
+
+def get_cache() -> Optional[HttpCache]:
+    """Get the configured HTTP cache, if any."""
+    return _cache
+
+
+def fetch(url: str, session: requests.Session) -> Union[requests.Response, CachedResponse]:
+    """GET a URL through the HTTP cache when one is configured.
+
+    Args:
+        url: URL to fetch.
+        session: Session used for network requests.
+
+    Returns:
+        A response exposing ``status_code`` and ``text``.
+    """
+    with stage("download") as task:
+        if _cache is None:
+            response = session.get(url)
+            if task.active:
+                task.add(nbytes=len(response.content), retries=response_retries(response))
+            return response
+        # The body is read in memory, as other threads may evict it afterwards
+        cached = _cache.get(url, session=session, in_memory=True)
+        if task.active:
+            task.add(nbytes=len(cached.content), retries=cached.retries, cache_hits=int(cached.from_cache))
+        return cached
+
+
+configure_cache(offline=os.environ.get("HAMCONTESTLOG_OFFLINE", "") not in ("", "0"))
@@ -0,0 +1,182 @@
+"""
+Callsign prefix table
+
+The country-files.com database loaded by pyhamtools resolves one callsign per
+Python call. It is exported here as a table of prefixes and exact callsigns,
+so that whole columns of calls are resolved in DuckDB with a longest-prefix
+match: every leading substring of a call is joined to the table and the
+longest match wins, which is what `Callinfo` does one call at a time.
+"""
+
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version
+from typing import TYPE_CHECKING, Optional
+
+from duckdb import DuckDBPyConnection
+import pandas as pd
+
+if TYPE_CHECKING:
+    from pyhamtools import LookupLib
+
+
+PREFIXES_TABLE = "call_prefixes"
+CALLS_INFO_TABLE = "calls_info"
+
+PREFIX_COLUMNS = ["prefix", "exact", "country", "adif", "continent", "cqz", "ituz", "latitude", "longitude"]
+INFO_COLUMNS = PREFIX_COLUMNS[2:]
+
+# Private attributes of a countryfile LookupLib holding its entries, as
+# pyhamtools has no public API listing them
+COUNTRYFILE_ATTRIBUTES = ("_prefixes_index", "_prefixes", "_callsign_exceptions_index", "_callsign_exceptions")
+
+
+def prefix_frame(lookuplib: Optional["LookupLib"] = None) -> pd.DataFrame:
+    """
+    Exports the prefixes and exact callsigns of a countryfile lookup library.
+
+    Args:
+        lookuplib (Optional[LookupLib]): Library loaded with
+            ``lookuptype="countryfile"``; the process-wide one by default.
+
+    Returns:
+        pd.DataFrame: One row per prefix, with the columns of `PREFIX_COLUMNS`.
+            `exact` marks entries matching a whole callsign only.
+
+    Raises:
+        RuntimeError: If the installed pyhamtools no longer keeps the
+            countryfile entries in `COUNTRYFILE_ATTRIBUTES`.
+    """
+    if lookuplib is None:
+        from hamcontestlog.utils import get_lookuplib
+
+        lookuplib = get_lookuplib()
+    missing = [attribute for attribute in COUNTRYFILE_ATTRIBUTES if not hasattr(lookuplib, attribute)]
+    if missing:
+        try:
+            pyhamtools_version = version("pyhamtools")
+        except PackageNotFoundError:
+            pyhamtools_version = "unknown"
+        raise RuntimeError(
+            f"Cannot export the countryfile prefixes: LookupLib of pyhamtools {pyhamtools_version} "
+            f"has no {', '.join(missing)}"
+        )
+    # pyhamtools keeps the countryfile entries in index dictionaries, with
+    # several entries per key only for time-dependent databases
+    rows = [
+        {"prefix": key, "exact": exact, **{column: entries[indices[0]].get(column) for column in INFO_COLUMNS}}
+        for exact, index, entries in (
+            (False, lookuplib._prefixes_index, lookuplib._prefixes),
+            (True, lookuplib._callsign_exceptions_index, lookuplib._callsign_exceptions),
+        )
+        for key, indices in index.items()
+    ]
+    return pd.DataFrame(rows, columns=PREFIX_COLUMNS)
+
+
+def create_prefix_table(con: DuckDBPyConnection, name: str = PREFIXES_TABLE, frame: Optional[pd.DataFrame] = None):
+    """
+    Creates or replaces the prefix table in DuckDB.
+
+    Args:
+        con (DuckDBPyConnection): Connection to create the table with.
+        name (str): Qualified name of the table.
+        frame (Optional[pd.DataFrame]): Prefixes as built by `prefix_frame`,
+            exported from the process-wide library by default.
+    """
+    prefixes = prefix_frame() if frame is None else frame
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {name} AS
+        SELECT
+            CAST(prefix AS VARCHAR) AS prefix,
+            CAST(exact AS BOOLEAN) AS exact,
+            CAST(country AS VARCHAR) AS country,
+            CAST(adif AS INTEGER) AS adif,
+            CAST(continent AS VARCHAR) AS continent,
+            CAST(cqz AS INTEGER) AS cqz,
+            CAST(ituz AS INTEGER) AS ituz,
+            CAST(latitude AS DOUBLE) AS latitude,
+            CAST(longitude AS DOUBLE) AS longitude
+        FROM prefixes
+        """
+    )
+
+
+def calls_info_sql(calls: str, prefixes: str = PREFIXES_TABLE) -> str:
+    """
+    SQL resolving the country, continent and zones of calls.
+
+    Calls are normalized as `Callinfo` does: skimmer suffixes (``-1``) and
+    second appendixes are cut, ``/P``, ``/M``, ``/QRP`` and similar
+    appendixes are ignored, ``/5`` replaces the call area digit, and a
+    country prefix before (``EA8/DL1ABC``) or after (``DL1ABC/EA8``) the call
+    is looked up instead of it. Exact callsign entries take precedence.
+    Maritime and aeronautical mobile calls are left unresolved.
+
+    Args:
+        calls (str): Relation with the calls in a ``call`` column.
+        prefixes (str): Prefix table, as created by `create_prefix_table`.
+
+    Returns:
+        str: SELECT statement with one row per distinct call and the columns
+            ``call`` and `INFO_COLUMNS` (NULL for unresolved calls).
+    """
+    info = ", ".join(INFO_COLUMNS)
+    return rf"""
+        WITH
+        distinct_calls AS (
+            SELECT DISTINCT call FROM {calls} WHERE call IS NOT NULL
+        ),
+        normalized AS (
+            SELECT
+                call,
+                regexp_replace(
+                    regexp_replace(upper(trim(call)), '-\d{{1,3}}$', ''),
+                    '^([A-Z0-9]+/[A-Z0-9]+)/[A-Z0-9]{{1,4}}$', '\1'
+                ) AS clean
+            FROM distinct_calls
+        ),
+        parts AS (
+            SELECT
+                call,
+                clean,
+                split_part(clean, '/', 1) AS head,
+                CASE WHEN contains(clean, '/') THEN split_part(clean, '/', 2) END AS tail
+            FROM normalized
+        ),
+        bases AS (
+            SELECT
+                call,
+                clean,
+                CASE
+                    WHEN tail IS NULL THEN clean
+                    WHEN tail IN ('MM', 'AM') THEN NULL
+                    WHEN length(head) BETWEEN 4 AND 10 AND length(tail) BETWEEN 2 AND 4 THEN
+                        CASE
+                            WHEN tail IN ('QRP', 'QRPP', 'BCN', 'LH') OR regexp_matches(tail, '^[A-Z]{{3}}$') THEN head
+                            ELSE tail
+                        END
+                    WHEN regexp_matches(tail, '^\d$') AND len(regexp_extract_all(head, '\d+')) = 1 THEN
+                        regexp_replace(head, '\d+', tail)
+                    WHEN length(tail) = 1 THEN head
+                    WHEN length(head) <= 4 THEN head
+                    ELSE clean
+                END AS base
+            FROM parts
+        ),
+        exact AS (
+            SELECT b.call, {", ".join(f"p.{column}" for column in INFO_COLUMNS)}
+            FROM bases AS b JOIN {prefixes} AS p ON p.exact AND p.prefix = b.clean
+        ),
+        candidates AS (
+            SELECT call, substr(base, 1, n) AS prefix, n
+            FROM (SELECT call, base, unnest(range(1, length(base) + 1)) AS n FROM bases ANTI JOIN exact USING (call))
+        ),
+        longest AS (
+            SELECT c.call, {", ".join(f"p.{column}" for column in INFO_COLUMNS)}
+            FROM candidates AS c JOIN {prefixes} AS p ON NOT p.exact AND p.prefix = c.prefix
+            QUALIFY row_number() OVER (PARTITION BY c.call ORDER BY c.n DESC) = 1
+        )
+        SELECT distinct_calls.call, {info}
+        FROM distinct_calls LEFT JOIN (SELECT * FROM exact UNION ALL SELECT * FROM longest) AS resolved USING (call)
+    """
@@ -0,0 +1,220 @@
+"""
+Per-stage instrumentation of ingestion jobs
+
+Library code wraps the tasks of its stages (download, parse, write, ...) in
+`stage`. When a task ends, a `StageEvent` with its timing, rows, bytes, HTTP
+retries and cache hits is passed to every registered hook; without hooks,
+`stage` costs next to nothing. `Profiler` is a hook aggregating events per
+stage, used by ``hamcontestlog --profile`` and by `ContestBase` to persist the
+``ingest_stats`` table.
+
+Stages may run on several threads at once: the wall time of a stage is the time
+during which at least one of its tasks was running, so rates are not inflated
+by concurrency, while the busy time adds up the time of every task.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class StageEvent:
+    """
+    One finished task of a stage.
+
+    Attributes:
+        name (str): Stage name.
+        start (float): `time.perf_counter` at the start of the task.
+        end (float): `time.perf_counter` at the end of the task.
+        rows (int): Rows processed.
+        bytes (int): Bytes processed.
+        retries (int): HTTP retries.
+        cache_hits (int): Responses served from the HTTP cache.
+        failed (bool): Whether the task raised an exception.
+    """
+
+    name: str
+    start: float
+    end: float
+    rows: int = 0
+    bytes: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    failed: bool = False
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+StageHook = Callable[[StageEvent], None]
+
+
+class StageTask:
+    """
+    Counts handed to the body of a `stage` block.
+
+    Attributes:
+        active (bool): Whether hooks will receive the counts; counts that are
+            costly to compute can be skipped when it is False.
+    """
+
+    def __init__(self, active: bool = True):
+        self.active = active
+        self.rows = 0
+        self.bytes = 0
+        self.retries = 0
+        self.cache_hits = 0
+
+    def add(self, rows: int = 0, nbytes: int = 0, retries: int = 0, cache_hits: int = 0):
+        self.rows += rows
+        self.bytes += nbytes
+        self.retries += retries
+        self.cache_hits += cache_hits
+
+
+# Registered hooks. The list is replaced, never modified, so `stage` can read
+# it without locking.
+_hooks: Tuple[StageHook, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: StageHook) -> None:
+    """Register a callable receiving a `StageEvent` for every finished task."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: StageHook) -> None:
+    """Unregister a hook added with `add_hook`."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+@contextmanager
+def hooked(hook: StageHook) -> Iterator[StageHook]:
+    """Register a hook for the enclosed block."""
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+
+@contextmanager
+def stage(name: str, rows: int = 0, nbytes: int = 0) -> Iterator[StageTask]:
+    """Time one task of a stage, reporting it to the registered hooks."""
+    hooks = _hooks
+    task = StageTask(active=bool(hooks))
+    task.add(rows=rows, nbytes=nbytes)
+    if not hooks:
+        yield task
+        return
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield task
+        failed = False
+    finally:
+        event = StageEvent(
+            name, start, time.perf_counter(), task.rows, task.bytes, task.retries, task.cache_hits, failed
+        )
+        for hook in hooks:
+            hook(event)
+
+
+@dataclass
+class StageStats:
+    """
+    Counters of one stage, aggregated from its events.
+
+    Attributes:
+        name (str): Stage name.
+        busy (float): Seconds of all tasks of the stage, added up.
+        tasks (int): Number of tasks.
+        rows (int): Rows processed.
+        bytes (int): Bytes processed.
+        retries (int): HTTP retries.
+        cache_hits (int): Responses served from the HTTP cache.
+        failures (int): Tasks that raised an exception.
+    """
+
+    name: str
+    busy: float = 0.0
+    tasks: int = 0
+    rows: int = 0
+    bytes: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    failures: int = 0
+    intervals: List[Tuple[float, float]] = field(default_factory=list, repr=False)
+
+    @property
+    def wall(self) -> float:
+        """Seconds during which at least one task of the stage ran."""
+        wall, covered = 0.0, float("-inf")
+        for start, end in sorted(self.intervals):
+            if end > covered:
+                wall += end - max(start, covered)
+                covered = end
+        return wall
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        wall = self.wall
+        return self.rows / wall if self.rows and wall else None
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        wall = self.wall
+        return self.bytes / wall if self.bytes and wall else None
+
+
+class Profiler:
+    """Hook aggregating events into `StageStats`, in order of first use."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: StageEvent) -> None:
+        with self._lock:
+            stats = self.stages.setdefault(event.name, StageStats(event.name))
+            stats.intervals.append((event.start, event.end))
+            stats.busy += event.seconds
+            stats.tasks += 1
+            stats.rows += event.rows
+            stats.bytes += event.bytes
+            stats.retries += event.retries
+            stats.cache_hits += event.cache_hits
+            stats.failures += event.failed
+
+    def report(self) -> str:
+        """Table of the stages with their wall time, rows/s and bytes/s."""
+        lines: List[str] = [
+            f"{'stage':<16} {'wall s':>8} {'busy s':>8} {'tasks':>7} {'rows':>12} {'rows/s':>10}"
+            f" {'MiB':>9} {'MiB/s':>8} {'retries':>7} {'cached':>7}"
+        ]
+        for stats in self.stages.values():
+            rows_per_second = stats.rows_per_second
+            bytes_per_second = stats.bytes_per_second
+            lines.append(
+                f"{stats.name:<16} {stats.wall:>8.2f} {stats.busy:>8.2f} {stats.tasks:>7}"
+                f" {stats.rows:>12,} {'-' if rows_per_second is None else f'{rows_per_second:,.0f}':>10}"
+                f" {stats.bytes / 2**20:>9.1f} {'-' if bytes_per_second is None else f'{bytes_per_second / 2**20:.1f}':>8}"
+                f" {stats.retries:>7} {stats.cache_hits:>7}"
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def profiling() -> Iterator[Profiler]:
+    """Aggregate the stages of the enclosed block in a new profiler."""
+    with hooked(Profiler()) as profiler:
+        yield profiler
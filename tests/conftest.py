@@ -0,0 +1,93 @@
+import datetime
+import io
+import plistlib
+import zipfile
+
+import pytest
+from pyhamtools import LookupLib
+
+from hamcontestlog.rbn.continents import ContinentCache
+from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+
+# One day of raw RBN spots: a missing spotter continent (resolved from its
+# prefix), an unknown prefix, a 3 cm spot and a spot without dx (both dropped)
+RBN_CSV = """\
+callsign,de_pfx,de_cont,freq,band,dx,dx_pfx,dx_cont,mode,db,date,speed,tx_mode
+DK8NE,DL,EU,7025.1,40m,EF6T,EA,EU,CW,20,2024-11-23 00:01:00,30,CQ
+OH6BG,OH,,7025.2,40m,EF6T,EA,EU,CW,12,2024-11-23 00:04:00,31,CQ
+W3LPL,K,NA,14025.0,20m,EF6T,EA,,CW,8,2024-11-23 00:02:00,28,CQ
+DK8NE,DL,EU,7025.0,40m,EA3M,EA,EU,CW,15,2024-11-23 00:06:00,26,CQ
+W3LPL,K,NA,10368100.0,3cm,EF6T,EA,EU,CW,5,2024-11-23 00:07:00,20,CQ
+DK8NE,DL,EU,7030.0,40m,,,,CW,10,2024-11-23 00:08:00,20,CQ
+VE3EJ,VE,NA,14030.0,20m,K1AR,XX,,CW,9,2024-11-23 00:09:00,25,CQ
+"""
+RBN_DAY = datetime.date(2024, 11, 23)
+CONTINENTS = {"EA": "EU", "OH": "EU", "DL": "EU", "K": "NA", "VE": "NA"}
+
+
+def resolve_continent(prefix):
+    return CONTINENTS[prefix]
+
+
+@pytest.fixture
+def rbn_day(monkeypatch):
+    """Serve `RBN_CSV` as the ZIP archive of `RBN_DAY`, without network or archive."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr(f"{RBN_DAY:%Y%m%d}.csv", RBN_CSV)
+    body = buffer.getvalue()
+    monkeypatch.setattr(ReverseBeaconReader, "download_archive", staticmethod(lambda url: io.BytesIO(body)))
+    monkeypatch.setattr("hamcontestlog.rbn.rbn.resolve_continent", resolve_continent)
+    cache = ContinentCache()
+    monkeypatch.setattr("hamcontestlog.rbn.rbn.get_continent_cache", lambda: cache)
+    monkeypatch.setattr("hamcontestlog.rbn.archive.get_rbn_archive", lambda: None)
+    monkeypatch.setattr("hamcontestlog.contest.base.get_rbn_archive", lambda: None)
+    return RBN_DAY
+
+
+@pytest.fixture
+def rbn_csv(rbn_day, tmp_path):
+    """`RBN_CSV` extracted to a file, as read by SQL ingestion."""
+    path = tmp_path / f"{rbn_day:%Y%m%d}.csv"
+    path.write_text(RBN_CSV)
+    return str(path)
+
+
+# Countryfile entities as (country, cqz, ituz, continent), EA8URE being an
+# exact callsign
+ENTITIES = {
+    "EA": ("Spain", 14, 37, "EU"),
+    "EA6": ("Balearic Islands", 14, 37, "EU"),
+    "EA8": ("Canary Islands", 33, 36, "AF"),
+    "DL": ("Fed. Rep. of Germany", 14, 28, "EU"),
+    "K": ("United States", 5, 8, "NA"),
+    "KH6": ("Hawaii", 31, 61, "OC"),
+    "W6": ("United States", 3, 6, "NA"),
+    "EA8URE": ("Spain", 14, 37, "EU"),
+}
+
+
+@pytest.fixture(scope="session")
+def lookuplib(tmp_path_factory):
+    """Countryfile LookupLib of the prefixes of `ENTITIES`."""
+    path = tmp_path_factory.mktemp("cty") / "cty.plist"
+    with open(path, "wb") as f:
+        plistlib.dump(
+            {
+                prefix: {
+                    "Country": country,
+                    "Prefix": prefix,
+                    "CQZone": cqz,
+                    "ITUZone": ituz,
+                    "Continent": continent,
+                    "Latitude": 40.0,
+                    "Longitude": 3.0,
+                    "GMTOffset": 1.0,
+                    "ExactCallsign": prefix == "EA8URE",
+                }
+                for prefix, (country, cqz, ituz, continent) in ENTITIES.items()
+            },
+            f,
+        )
+    return LookupLib(lookuptype="countryfile", filename=str(path))
@@ -0,0 +1,37 @@
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.utils.prefixes import CALLS_INFO_TABLE
+
+
+@pytest.fixture
+def contest(tmp_path, monkeypatch, lookuplib):
+    monkeypatch.setattr("hamcontestlog.utils.get_lookuplib", lambda: lookuplib)
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.con.execute("CREATE TABLE cw2024.raw_logs (mycall VARCHAR, call VARCHAR)")
+        contest.con.execute("INSERT INTO cw2024.raw_logs VALUES ('EA3M', 'K1AR'), ('EA3M', 'EA8URE')")
+        contest.con.execute("CREATE TABLE cw2024.raw_rbn (callsign VARCHAR, dx VARCHAR)")
+        contest.con.execute("INSERT INTO cw2024.raw_rbn VALUES ('DL1ABC-1', 'EA3M'), ('K1AR', 'ZS1ABC')")
+    return contest
+
+
+def test_update_calls_info_resolves_calls_of_logs_and_spots(contest):
+    """Test that calls of raw_logs and raw_rbn are resolved once, and only new calls are added later."""
+    assert contest.update_calls_info(schema="cw2024") == 5
+    info = contest.con.execute(f"SELECT call, country, continent FROM cw2024.{CALLS_INFO_TABLE}").fetchall()
+    assert sorted(info, key=lambda row: row[0]) == [
+        ("DL1ABC-1", "Fed. Rep. of Germany", "EU"),
+        ("EA3M", "Spain", "EU"),
+        ("EA8URE", "Spain", "EU"),
+        ("K1AR", "United States", "NA"),
+        ("ZS1ABC", None, None),
+    ]
+
+    with contest.write_session():
+        contest.con.execute("INSERT INTO cw2024.raw_logs VALUES ('EA3M', 'KH6XX'), ('EA3M', 'K1AR')")
+    assert contest.update_calls_info(schema="cw2024") == 1
+    assert contest.update_calls_info(schema="cw2024") == 0
+    assert contest.update_calls_info(schema="cw2024", refresh=True) == 6
+    continent = contest.con.execute(f"SELECT continent FROM cw2024.{CALLS_INFO_TABLE} WHERE call = 'KH6XX'").fetchone()
+    assert continent == ("OC",)
@@ -0,0 +1,52 @@
+from datetime import date, datetime, timedelta
+import pytest
+from hamcontestlog.contest.base import full_weekend
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.iaru import ContestIARU
+
+
+@pytest.mark.parametrize(
+    "year, month, n, saturday",
+    [
+        (2023, 11, -1, date(2023, 11, 25)),
+        # November 30 is a Saturday, but its Sunday is in December
+        (2024, 11, -1, date(2024, 11, 23)),
+        (2025, 11, -1, date(2025, 11, 29)),
+        (2024, 7, 2, date(2024, 7, 13)),
+        (2025, 7, 2, date(2025, 7, 12)),
+    ],
+)
+def test_full_weekend(year, month, n, saturday):
+    """Test that the n-th full weekend starts on the expected Saturday."""
+    assert full_weekend(year, month, n) == saturday
+
+
+@pytest.mark.parametrize(
+    "year, mode, start",
+    [
+        (2023, "ssb", datetime(2023, 10, 28)),
+        (2023, "cw", datetime(2023, 11, 25)),
+        (2024, "ssb", datetime(2024, 10, 26)),
+        (2024, "cw", datetime(2024, 11, 23)),
+        (2025, "ssb", datetime(2025, 10, 25)),
+        (2025, "cw", datetime(2025, 11, 29)),
+    ],
+)
+def test_cqww_contest_window(year, mode, start):
+    """Test that CQWW runs 48 hours from 00:00 UTC of the last full weekend of its month."""
+    assert ContestCQWW.contest_window(year=year, mode=mode) == (start, start + timedelta(hours=48))
+    assert ContestCQWW.contest_dates(year=year, mode=mode) == [start.date(), start.date() + timedelta(days=1)]
+
+
+@pytest.mark.parametrize(
+    "year, start",
+    [
+        (2023, datetime(2023, 7, 8, 12)),
+        (2024, datetime(2024, 7, 13, 12)),
+        (2025, datetime(2025, 7, 12, 12)),
+    ],
+)
+def test_iaru_contest_window(year, start):
+    """Test that IARU HF runs 24 hours from 12:00 UTC of the second full weekend of July."""
+    assert ContestIARU.contest_window(year=year, mode="mixed") == (start, start + timedelta(hours=24))
+    assert ContestIARU.contest_dates(year=year, mode="mixed") == [start.date(), start.date() + timedelta(days=1)]
@@ -0,0 +1,77 @@
+import json
+import pytest
+from hamcontestlog.contest.base import INGEST_STATS_TABLE
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.manifest import MANIFEST_TABLE
+from hamcontestlog.utils.profiling import stage
+
+
+@pytest.fixture
+def contest(tmp_path):
+    return ContestCQWW(str(tmp_path / "contest.duckdb"))
+
+
+def stats(contest):
+    return contest.con.execute(
+        f"SELECT command, arguments, stage, tasks, rows, failures FROM main.{INGEST_STATS_TABLE} ORDER BY stage"
+    ).fetchall()
+
+
+def parsed_rows(contest):
+    query = f"SELECT rows FROM main.{INGEST_STATS_TABLE} WHERE stage = 'parse' ORDER BY started_at"
+    return [row[0] for row in contest.con.execute(query).fetchall()]
+
+
+def test_ingestion_appends_stage_stats(contest, tmp_path):
+    """Test that an ingestion method writes one row per stage with its bound arguments."""
+    contest.add_local_logs(path_or_glob=str(tmp_path / "*.log"), schema="cw2024", workers=1)
+    ((command, arguments, name, tasks, rows, failures),) = stats(contest)
+    assert (command, name, tasks, rows, failures) == ("add_local_logs", "parse", 1, 0, 0)
+    assert json.loads(arguments)["schema"] == "cw2024"
+
+
+CABRILLO = """\
+START-OF-LOG: 3.0
+CONTEST: CQ-WW-CW
+CALLSIGN: {call}
+QSO:  7044 CW 2024-11-23 0000 {call}  599 14  YR8D   599 20  0
+QSO: 14041 CW 2024-11-23 0002 {call}  599 14  W0EAR  599 04  1
+END-OF-LOG:
+"""
+
+
+def test_local_logs_are_parsed_in_parallel_and_skipped_when_unchanged(contest, tmp_path):
+    """Test that local logs are parsed by several workers, malformed ones skipped and unchanged ones not parsed again."""
+    calls = ["EF6T", "EA3M", "DL1ABC", "K1AR", "W1AW"]
+    for call in calls:
+        (tmp_path / f"{call.lower()}.log").write_text(CABRILLO.format(call=call))
+    (tmp_path / "broken.log").write_text(CABRILLO.format(call="EA1XX").replace("YR8D   599 20  0", ""))
+
+    contest.add_local_logs(path_or_glob=str(tmp_path), schema="cw2024", workers=2, files_per_task=2)
+    mycalls = contest.con.execute("SELECT DISTINCT mycall FROM cw2024.raw_logs ORDER BY mycall").fetchall()
+    assert [c[0] for c in mycalls] == sorted(calls)
+    sources = contest.con.execute(f"SELECT source FROM cw2024.{MANIFEST_TABLE}").fetchall()
+    assert not any(source[0].endswith("broken.log") for source in sources)
+    assert contest.con.execute("SELECT count(*) FROM cw2024.raw_logs").fetchone()[0] == 10
+    assert parsed_rows(contest) == [10]
+
+    sequential = ContestCQWW(str(tmp_path / "sequential.duckdb"))
+    sequential.add_local_logs(path_or_glob=str(tmp_path), schema="cw2024", workers=1)
+    query = "SELECT * FROM cw2024.raw_logs ORDER BY id"
+    assert contest.query(query).equals(sequential.query(query))
+
+    contest.add_local_logs(path_or_glob=str(tmp_path), schema="cw2024", workers=2, files_per_task=2)
+    assert contest.con.execute("SELECT count(*) FROM cw2024.raw_logs").fetchone()[0] == 10
+    # Only the malformed file is parsed again
+    assert parsed_rows(contest) == [10, 0]
+
+
+def test_failed_ingestion_is_recorded(contest):
+    """Test that stats are written when the ingestion raises, without masking the error."""
+    with pytest.raises(ValueError):
+        with contest.write_session(), contest.record_ingest(command="test"):
+            with stage("download") as task:
+                task.add(rows=5)
+            with stage("parse"):
+                raise ValueError("bad log")
+    assert [row[2:] for row in stats(contest)] == [("download", 1, 5, 0), ("parse", 1, 0, 1)]
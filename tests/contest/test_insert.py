@@ -0,0 +1,46 @@
+import pandas as pd
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.log.base import LogBase
+
+
+LINES = [
+    "QSO:    7044 CW 2024-11-23 0000 EF6T             599 14    YR8D             599  20\n",
+    "QSO:    7044 CW 2024-11-23 0001 EF6T             599 14    N1IX             599  05\n",
+    "QSO:   14041 CW 2024-11-24 2359 EF6T             599 14    W0EAR            599  04      1\n",
+]
+
+
+def primary_keys(contest):
+    return contest.con.execute(
+        """
+        SELECT constraint_column_names FROM duckdb_constraints()
+        WHERE schema_name = 'cw2024' AND table_name = 'raw_logs' AND constraint_type = 'PRIMARY KEY'
+        """
+    ).fetchall()
+
+
+def test_legacy_table_is_migrated_and_inserts_are_idempotent(tmp_path):
+    """Test that a table without a primary key is deduplicated and keyed, and re-inserting adds nothing."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    qsos = LogBase.parse_qsos(LINES)
+    with contest.write_session():
+        # Baseline tables were created from the frame, without a key, and
+        # duplicates within one insert got through
+        legacy = pd.concat([qsos.iloc[:2], qsos.iloc[:2]]).astype({"call": object, "id": object})
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.con.execute("CREATE TABLE cw2024.raw_logs AS SELECT * FROM legacy")
+        assert primary_keys(contest) == []
+
+        assert contest.insert_frame(table="cw2024.raw_logs", frame=qsos) == 1
+        assert primary_keys(contest) == [(["id"],)]
+        ids = contest.con.execute("SELECT id FROM cw2024.raw_logs ORDER BY id").fetchall()
+        assert [i[0] for i in ids] == ["EF6T_0", "EF6T_1", "EF6T_2"]
+
+        assert contest.insert_frame(table="cw2024.raw_logs", frame=qsos) == 0
+        assert contest.con.execute("SELECT count(*) FROM cw2024.raw_logs").fetchone()[0] == 3
+
+    # A new connection sees the key of the migrated table
+    contest.con.close()
+    reopened = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with reopened.write_session():
+        assert reopened.insert_frame(table="cw2024.raw_logs", frame=qsos) == 0
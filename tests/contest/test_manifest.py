@@ -0,0 +1,80 @@
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.manifest import MANIFEST_TABLE
+from hamcontestlog.contest.manifest import source_key
+
+
+HEADER = """\
+START-OF-LOG: 3.0
+CONTEST: CQ-WW-CW
+CALLSIGN: {call}
+"""
+QSOS = [
+    "QSO:  7044 CW 2024-11-23 0000 {call}  599 14  YR8D   599 20  0\n",
+    "QSO:  7044 CW 2024-11-23 0001 {call}  599 14  N1IX   599 05  0\n",
+    "QSO: 14041 CW 2024-11-23 0002 {call}  599 14  W0EAR  599 04  1\n",
+]
+
+
+def write_log(path, call="EF6T", n_qsos=2):
+    path.write_text(HEADER.format(call=call) + "".join(q.format(call=call) for q in QSOS[:n_qsos]) + "END-OF-LOG:\n")
+    return str(path)
+
+
+@pytest.fixture
+def contest(tmp_path):
+    return ContestCQWW(str(tmp_path / "contest.duckdb"))
+
+
+def raw_logs(contest):
+    return contest.con.execute("SELECT id, mycall FROM cw2024.raw_logs ORDER BY id").fetchall()
+
+
+def total_rate(contest):
+    return int(contest.rates(schema="cw2024", resolution="1h")["qsos"].sum())
+
+
+def test_unchanged_log_is_skipped_and_changed_log_replaced(contest, tmp_path):
+    """Test that re-adding an unchanged log is a no-op and a changed one replaces its QSOs and rates."""
+    path = write_log(tmp_path / "ef6t.log")
+    contest.add_local_logs(path_or_glob=path, schema="cw2024", workers=1)
+    key = source_key(path)
+    assert raw_logs(contest) == [(f"{key}:EF6T_0", "EF6T"), (f"{key}:EF6T_1", "EF6T")]
+    ((ingested_at,),) = contest.con.execute(f"SELECT ingested_at FROM cw2024.{MANIFEST_TABLE}").fetchall()
+
+    contest.add_local_logs(path_or_glob=path, schema="cw2024", workers=1)
+    assert len(raw_logs(contest)) == 2
+    assert contest.con.execute(f"SELECT ingested_at FROM cw2024.{MANIFEST_TABLE}").fetchall() == [(ingested_at,)]
+    assert total_rate(contest) == 2
+
+    write_log(tmp_path / "ef6t.log", n_qsos=3)
+    contest.add_local_logs(path_or_glob=path, schema="cw2024", workers=1)
+    assert [row[0] for row in raw_logs(contest)] == [f"{key}:EF6T_{i}" for i in range(3)]
+    assert contest.con.execute(f"SELECT n_rows FROM cw2024.{MANIFEST_TABLE}").fetchall() == [(3,)]
+    assert total_rate(contest) == 3
+
+
+def test_logs_of_the_same_station_from_other_sources_are_kept(contest, tmp_path):
+    """Test that two sources with the same station callsign don't replace each other."""
+    first = write_log(tmp_path / "ef6t.log")
+    second = write_log(tmp_path / "ef6t-checklog.log", n_qsos=3)
+    contest.add_local_logs(path_or_glob=str(tmp_path / "*.log"), schema="cw2024", workers=1)
+    assert len(raw_logs(contest)) == 5
+
+    write_log(tmp_path / "ef6t.log", n_qsos=1)
+    contest.add_local_logs(path_or_glob=str(tmp_path / "*.log"), schema="cw2024", workers=1)
+    ids = [row[0] for row in raw_logs(contest)]
+    assert sorted(ids) == sorted([f"{source_key(first)}:EF6T_0"] + [f"{source_key(second)}:EF6T_{i}" for i in range(3)])
+    assert total_rate(contest) == 4
+
+
+def test_legacy_qsos_of_a_replaced_source_are_deleted(contest, tmp_path):
+    """Test that QSOs stored before ids were keyed by source are replaced by station callsign."""
+    path = write_log(tmp_path / "ef6t.log")
+    contest.add_local_logs(path_or_glob=path, schema="cw2024", workers=1)
+    with contest.write_session():
+        contest.con.execute("UPDATE cw2024.raw_logs SET id = split_part(id, ':', 2)")
+        contest.con.execute(f"UPDATE cw2024.{MANIFEST_TABLE} SET content_hash = 'old'")
+
+    contest.add_local_logs(path_or_glob=path, schema="cw2024", workers=1)
+    assert [row[0] for row in raw_logs(contest)] == [f"{source_key(path)}:EF6T_{i}" for i in range(2)]
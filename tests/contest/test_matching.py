@@ -0,0 +1,143 @@
+from datetime import datetime
+import duckdb
+import pandas as pd
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.manifest import ManifestEntry
+from hamcontestlog.contest.manifest import with_source_ids
+from hamcontestlog.contest.matching import MATCHES_TABLE, PENDING_TABLE, QsoMatcher
+from hamcontestlog.log.base import LogBase
+
+
+class Contest:
+    """Minimal stand-in for ContestBase exposing the connection used by the matcher."""
+
+    def __init__(self):
+        self.con = duckdb.connect()
+        self.con.execute("CREATE SCHEMA cw2024")
+
+    def has_table(self, schema, table):
+        return self.con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+            [schema, table],
+        ).fetchone()[0] > 0
+
+    def add_qsos(self, rows):
+        frame = pd.DataFrame(rows, columns=["mycall", "call", "frequency", "datetime", "myexch", "exch"])
+        frame["datetime"] = pd.to_datetime(frame["datetime"])
+        frame["id"] = frame["mycall"] + "_" + frame.index.astype(str) + "_" + frame["call"]
+        self.con.register("frame", frame)
+        if self.has_table("cw2024", "raw_logs"):
+            self.con.execute("INSERT INTO cw2024.raw_logs SELECT * FROM frame")
+        else:
+            self.con.execute("CREATE TABLE cw2024.raw_logs AS SELECT * FROM frame")
+        self.con.unregister("frame")
+
+    def statuses(self):
+        rows = self.con.execute(f"SELECT id, status, matched_call FROM cw2024.{MATCHES_TABLE}").fetchall()
+        return {id_: (status, matched_call) for id_, status, matched_call in rows}
+
+
+@pytest.fixture
+def contest():
+    contest = Contest()
+    contest.add_qsos(
+        [
+            ("EF6T", "K1AR", 14041, "2024-11-23 00:01", "14", "05"),
+            ("EF6T", "W0EAR", 7044, "2024-11-23 00:02", "14", "04"),
+            ("EF6T", "N1IX", 7044, "2024-11-23 00:03", "14", "05"),
+            ("EF6T", "JA1ZZ", 21010, "2024-11-23 00:04", "14", "25"),
+            ("EF6T", "DL1AA", 14041, "2024-11-23 00:05", "14", "14"),
+        ]
+    )
+    contest.add_qsos(
+        [
+            ("K1AR", "EF6T", 14039, "2024-11-23 00:02", "05", "14"),
+            ("W0EAR", "EF6T", 7044, "2024-11-23 00:02", "05", "14"),
+            ("W0EAR", "DL1AA", 7040, "2024-11-23 00:10", "05", "14"),
+            ("N1IX", "EF6T", 7044, "2024-11-23 00:40", "05", "14"),
+            ("DL1AB", "EF6T", 14041, "2024-11-23 00:06", "14", "14"),
+        ]
+    )
+    return contest
+
+
+def test_match_statuses(contest):
+    """Test that QSOs are flagged as ok, busted exchange, busted call, NIL or unverifiable."""
+    QsoMatcher(contest, "cw2024").run()
+    statuses = contest.statuses()
+    assert statuses["EF6T_0_K1AR"] == ("ok", "K1AR")
+    assert statuses["EF6T_1_W0EAR"] == ("busted_exchange", "W0EAR")
+    assert statuses["EF6T_2_N1IX"] == ("nil", None)
+    assert statuses["EF6T_3_JA1ZZ"] == ("unverifiable", None)
+    assert statuses["EF6T_4_DL1AA"] == ("busted_call", "DL1AB")
+    assert statuses["W0EAR_2_DL1AA"] == ("unverifiable", None)
+
+
+def test_incremental_match_equals_full(contest):
+    """Test that matching only the QSOs affected by a new log gives the same result as a full run."""
+    matcher = QsoMatcher(contest, "cw2024")
+    matcher.run()
+    contest.add_qsos(
+        [
+            ("JA1ZZ", "EF6T", 21010, "2024-11-23 00:05", "25", "14"),
+            ("DL1AA", "W0EAR", 7040, "2024-11-23 00:11", "14", "05"),
+        ]
+    )
+    matcher.run(mycalls=["JA1ZZ", "DL1AA"])
+    incremental = contest.statuses()
+    matcher.run()
+    assert incremental == contest.statuses()
+    assert incremental["EF6T_3_JA1ZZ"] == ("ok", "JA1ZZ")
+    assert incremental["W0EAR_2_DL1AA"] == ("ok", "DL1AA")
+    assert incremental["EF6T_4_DL1AA"] == ("busted_call", "DL1AB")
+
+
+def cabrillo_qsos(mycall, myexch, qsos):
+    """QSO lines of a log of `mycall`, from (frequency, time, call, exch) tuples."""
+    return [
+        f"QSO: {freq} CW 2024-11-23 {time} {mycall} 599 {myexch} {call} 599 {exch}\n" for freq, time, call, exch in qsos
+    ]
+
+
+def replace_log(contest, mycall, myexch, qsos):
+    source = f"{mycall.lower()}.log"
+    frame = with_source_ids(LogBase.parse_qsos(cabrillo_qsos(mycall, myexch, qsos)), source)
+    entry = ManifestEntry(source, str(len(frame)), mycall, len(frame), datetime.now())
+    contest.replace_logs(schema="cw2024", entries=[entry], frames=[frame])
+
+
+def test_contest_match_qsos_picks_up_replaced_logs(tmp_path):
+    """Test that match_qsos after replacing a log matches again its stations, as a full run would."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.manifest(schema="cw2024")
+        replace_log(contest, "EF6T", "14", [(14041, "0001", "K1AR", "05"), (7044, "0003", "N1IX", "05")])
+        replace_log(contest, "K1AR", "05", [(14039, "0002", "EF6T", "14")])
+        replace_log(contest, "N1IX", "05", [(7040, "0010", "W0EAR", "04")])
+        assert contest.match_qsos(schema="cw2024") == 4
+
+        def statuses():
+            rows = contest.con.execute(
+                f"SELECT r.mycall, r.call, m.status FROM cw2024.{MATCHES_TABLE} m JOIN cw2024.raw_logs r USING (id)"
+            ).fetchall()
+            return {(mycall, call): status for mycall, call, status in rows}
+
+        def pending():
+            return [c[0] for c in contest.con.execute(f"SELECT mycall FROM cw2024.{PENDING_TABLE}").fetchall()]
+
+        assert statuses()[("EF6T", "N1IX")] == "nil"
+        assert pending() == []
+
+        # N1IX submits a log with the QSO with EF6T
+        replace_log(contest, "N1IX", "05", [(7044, "0003", "EF6T", "14"), (7040, "0010", "W0EAR", "04")])
+        assert pending() == ["N1IX"]
+        contest.match_qsos(schema="cw2024")
+        incremental = statuses()
+        assert pending() == []
+        assert incremental[("EF6T", "N1IX")] == "ok"
+        assert incremental[("N1IX", "EF6T")] == "ok"
+
+        contest.match_qsos(schema="cw2024", full=True)
+        assert statuses() == incremental
@@ -0,0 +1,58 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+
+
+CABRILLO = "START-OF-LOG: 3.0\nCALLSIGN: {call}\nQSO: 7044 CW 2024-11-23 0000 {call} 599 14 YR8D 599 20\nEND-OF-LOG:\n"
+BASE_URL = "https://cqww.com/publiclogs/2024cw/"
+LOGS = {
+    "EF6T": CABRILLO.format(call="EF6T"),
+    "EA3M": CABRILLO.format(call="EA3M"),
+    "EA1XX": CABRILLO.format(call="EA1XX").replace(" YR8D 599 20", ""),
+}
+
+
+@pytest.fixture
+def public_logs(monkeypatch):
+    """Serve `LOGS` (and a listed log answering 404) instead of the public logs site."""
+    listing = {call: f"{call.lower()}.log" for call in [*LOGS, "K1AR"]}
+    monkeypatch.setattr(ContestCQWW, "list_cabrillo_files", classmethod(lambda cls, year, mode: listing))
+    bodies = {f"{BASE_URL}{call.lower()}.log": text for call, text in LOGS.items()}
+
+    def fetch(url, session):
+        if url not in bodies:
+            return SimpleNamespace(status_code=404, content=b"", text="")
+        return SimpleNamespace(status_code=200, content=bodies[url].encode(), text=bodies[url])
+
+    monkeypatch.setattr("hamcontestlog.contest.base.fetch", fetch)
+    return bodies
+
+
+@pytest.mark.parametrize("batch_size", [None, 1])
+def test_add_online_logs(tmp_path, public_logs, caplog, batch_size):
+    """Test that downloaded logs are inserted, broken ones skipped with a warning, and unchanged ones not re-parsed."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with caplog.at_level(logging.INFO, logger="hamcontestlog"):
+        contest.add_online_logs(year=2024, mode="CW", batch_size=batch_size, workers=2)
+    rows = contest.con.execute("SELECT mycall, call FROM cw2024.raw_logs ORDER BY mycall").fetchall()
+    assert rows == [("EA3M", "YR8D"), ("EF6T", "YR8D")]
+    assert f"Skipping {BASE_URL}k1ar.log: Link does not exist" in caplog.text
+    assert f"Skipping {BASE_URL}ea1xx.log: QSO line with missing fields" in caplog.text
+    assert "2 logs ingested, 0 unchanged" in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="hamcontestlog"):
+        contest.add_online_logs(year=2024, mode="CW", batch_size=batch_size, workers=2)
+    assert "0 logs ingested, 2 unchanged" in caplog.text
+    assert contest.con.execute("SELECT count(*) FROM cw2024.raw_logs").fetchone()[0] == 2
+
+
+def test_add_online_logs_replaces_changed_log(tmp_path, public_logs):
+    """Test that a log whose content changed since the last run replaces its previous QSOs."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    contest.add_online_logs(year=2024, mode="CW", calls=["EF6T"], workers=1)
+    public_logs[f"{BASE_URL}ef6t.log"] = CABRILLO.format(call="EF6T").replace("YR8D", "N1IX")
+    contest.add_online_logs(year=2024, mode="CW", calls=["EF6T"], workers=1)
+    assert contest.con.execute("SELECT call FROM cw2024.raw_logs").fetchall() == [("N1IX",)]
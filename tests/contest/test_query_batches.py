@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+
+
+QUERY = "SELECT i, 'K' || i AS call FROM range(10000) t(i) ORDER BY i"
+
+
+@pytest.fixture
+def contest(tmp_path):
+    return ContestCQWW(str(tmp_path / "contest.duckdb"))
+
+
+def test_dataframe_batches(contest):
+    """Test that DataFrame batches add up to the query result, in vector-sized batches."""
+    batches = list(contest.query_batches(QUERY, batch_size=4096))
+    assert [len(b) for b in batches] == [4096, 4096, 1808]
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), contest.query(QUERY))
+
+
+def test_arrow_batches(contest):
+    """Test that Arrow batches have exactly batch_size rows and take parameters."""
+    pytest.importorskip("pyarrow")
+    batches = list(contest.query_batches("SELECT * FROM range(?) t(i)", params=[2500], batch_size=1000, arrow=True))
+    assert [b.num_rows for b in batches] == [1000, 1000, 500]
+
+
+def test_batches_are_streamed(contest):
+    """Test that batches are fetched lazily and that other queries can run meanwhile."""
+    batches = contest.query_batches(QUERY, batch_size=2048)
+    first = next(batches)
+    assert contest.query("SELECT 42 AS answer")["answer"][0] == 42
+    assert next(batches)["i"].iloc[0] == len(first)
+    batches.close()
+    assert list(contest.query_batches("SELECT * FROM range(0) t(i)")) == []
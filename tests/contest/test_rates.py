@@ -0,0 +1,78 @@
+import duckdb
+import pandas as pd
+from datetime import datetime
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.manifest import ManifestEntry
+from hamcontestlog.contest.manifest import with_source_ids
+from hamcontestlog.contest.rates import RATE_TABLES, band_sql, rates_sql
+from hamcontestlog.log.base import LogBase
+
+
+def test_band_sql_maps_frequencies_to_bands():
+    """Test that frequencies in kHz map to bands in meters, and NULL outside the bands."""
+    con = duckdb.connect()
+    bands = con.execute(
+        f"SELECT {band_sql('f')} FROM (SELECT unnest([1830, 3525, 7044, 14041, 21000, 28500, 50100, 144000]) AS f)"
+    ).fetchall()
+    assert [b[0] for b in bands] == [160, 80, 40, 20, 15, 10, 6, None]
+
+
+def test_rates_sql_counts_qsos_per_bucket():
+    """Test that QSOs are counted per station, band, radio and time bucket."""
+    raw_logs = pd.DataFrame(
+        {
+            "mycall": ["EF6T", "EF6T", "EF6T", "EF6T"],
+            "frequency": [7044, 7044, 7044, 14041],
+            "radio": ["0", "0", "0", "1"],
+            "datetime": pd.to_datetime(
+                ["2024-11-23 00:00", "2024-11-23 00:09", "2024-11-23 00:10", "2024-11-23 00:01"]
+            ),
+        }
+    )
+    con = duckdb.connect()
+    con.execute("CREATE SCHEMA cw2024")
+    con.execute("CREATE TABLE cw2024.raw_logs AS SELECT * FROM raw_logs")
+    rates_10m = con.execute(f"{rates_sql('cw2024', '10m')} ORDER BY band DESC, period").fetchall()
+    assert [(band, radio, period.minute, qsos) for _, band, radio, period, qsos in rates_10m] == [
+        (40, "0", 0, 2),
+        (40, "0", 10, 1),
+        (20, "1", 0, 1),
+    ]
+    rates_1h = con.execute(f"{rates_sql('cw2024', '1h')} ORDER BY band DESC").fetchall()
+    assert [(band, qsos) for _, band, _, _, qsos in rates_1h] == [(40, 3), (20, 1)]
+
+
+def test_incremental_rates_match_full_recompute(tmp_path):
+    """Test that the rate tables updated log by log equal the rates computed from all of raw_logs."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    lines = {
+        "EF6T": [
+            "QSO:  7044 CW 2024-11-23 0000 EF6T  599 14  YR8D   599 20  0\n",
+            "QSO:  7044 CW 2024-11-23 0109 EF6T  599 14  N1IX   599 05  0\n",
+            "QSO: 14041 CW 2024-11-23 0110 EF6T  599 14  W0EAR  599 04  1\n",
+        ],
+        "EA3M": [
+            "QSO: 21030 CW 2024-11-23 0005 EA3M  599 14  JA1ABC 599 25  0\n",
+            "QSO: 21031 CW 2024-11-23 0006 EA3M  599 14  EF6T   599 14  0\n",
+        ],
+    }
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.manifest(schema="cw2024")
+        # The rate tables are built by the first log, and updated by the second
+        # log and by a new version of the first one
+        for call, qsos in [*lines.items(), ("EF6T", lines["EF6T"][:1])]:
+            source = f"{call.lower()}.log"
+            entry = ManifestEntry(source, str(len(qsos)), call, len(qsos), datetime.now())
+            frame = with_source_ids(LogBase.parse_qsos(qsos), source)
+            contest.replace_logs(schema="cw2024", entries=[entry], frames=[frame])
+            for resolution in RATE_TABLES:
+                incremental = contest.rates(schema="cw2024", resolution=resolution)
+                full = contest.query(
+                    f"SELECT * FROM ({rates_sql('cw2024', resolution)}) ORDER BY mycall, period, band, radio"
+                )
+                pd.testing.assert_frame_equal(incremental, full)
+        assert contest.rates(schema="cw2024", resolution="1h").groupby("mycall")["qsos"].sum().to_dict() == {
+            "EA3M": 2,
+            "EF6T": 1,
+        }
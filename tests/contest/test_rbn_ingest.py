@@ -0,0 +1,32 @@
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+
+def ingest(tmp_path, name, add):
+    contest = ContestCQWW(str(tmp_path / f"{name}.duckdb"))
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        added = add(contest)
+        spots = contest.con.execute("SELECT * FROM cw2024.raw_rbn ORDER BY id").fetchdf()
+    return added, spots
+
+
+@pytest.mark.parametrize("calls", [["EF6T"], ["EF6T", "K1AR", "W1AW"], []])
+def test_add_rbn_csv_matches_add_rbn(rbn_csv, rbn_day, tmp_path, calls):
+    """Test that SQL ingestion of a CSV stores the same spots as the pandas path, an empty list keeping all."""
+    rbn = ReverseBeaconReader(date=rbn_day)
+    added_csv, csv = ingest(tmp_path, "csv", lambda c: c.add_rbn_csv(schema="cw2024", paths=[rbn_csv], calls=calls))
+    added_frame, frame = ingest(tmp_path, "frame", lambda c: c.add_rbn(schema="cw2024", rbn=rbn, calls=calls))
+    assert added_csv == added_frame == len(rbn.data if not calls else rbn.data[rbn.data["dx"].isin(calls)])
+    assert added_csv > 0
+    assert csv.equals(frame)
+
+
+@pytest.mark.parametrize("engine", ["duckdb", "pandas"])
+def test_add_online_rbn_without_logs(rbn_day, tmp_path, engine):
+    """Test that both engines add every spot of the contest days to a year without logs."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    contest.add_online_rbn(years=[2024], mode="cw", engine=engine, workers=1)
+    n_spots = contest.con.execute("SELECT count(*) FROM cw2024.raw_rbn").fetchone()[0]
+    assert n_spots == len(ReverseBeaconReader(date=rbn_day).data)
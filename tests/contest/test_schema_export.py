@@ -0,0 +1,50 @@
+import os
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.log.base import LogBase
+
+
+LINES = [
+    "QSO:    7044 CW 2024-11-23 0000 EF6T             599 14    YR8D             599  20\n",
+    "QSO:   14041 CW 2024-11-24 2359 EF6T             599 14    W0EAR            599  04      1\n",
+]
+
+
+@pytest.fixture
+def contest(tmp_path):
+    contest = ContestCQWW(str(tmp_path / "source.duckdb"))
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.insert_log_frame(schema="cw2024", frame=LogBase.parse_qsos(LINES))
+        contest.update_rates(schema="cw2024")
+    return contest
+
+
+def test_schema_round_trip(contest, tmp_path):
+    """Test that an exported schema is loaded back with its rows, types and primary keys."""
+    directory = str(tmp_path / "cw2024")
+    counts = contest.export_schema(schema="cw2024", directory=directory)
+    assert counts["raw_logs"] == 2
+    assert sorted(os.listdir(os.path.join(directory, "raw_logs"))) == ["day=2024-11-23", "day=2024-11-24"]
+
+    target = ContestCQWW(str(tmp_path / "target.duckdb"))
+    assert target.import_schema(directory=directory) == counts
+    describe = "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'raw_logs'"
+    assert target.con.execute(describe).fetchall() == contest.con.execute(describe).fetchall()
+    assert target.query("SELECT * FROM cw2024.raw_logs ORDER BY id").equals(
+        contest.query("SELECT * FROM cw2024.raw_logs ORDER BY id")
+    )
+    with target.write_session():
+        target.insert_log_frame(schema="cw2024", frame=LogBase.parse_qsos(LINES))
+        assert target.con.execute("SELECT count(*) FROM cw2024.raw_logs").fetchone()[0] == 2
+
+    with pytest.raises(ValueError, match="raw_logs"):
+        target.import_schema(directory=directory)
+    assert target.import_schema(directory=directory, schema="copy")["raw_logs"] == 2
+
+
+def test_query_arrow(contest):
+    """Test that query results can be fetched as Arrow tables."""
+    pytest.importorskip("pyarrow")
+    table = contest.query_arrow("SELECT call FROM cw2024.raw_logs WHERE frequency > ? ORDER BY call", [10000])
+    assert table.column("call").to_pylist() == ["W0EAR"]
@@ -0,0 +1,83 @@
+import duckdb
+import pandas as pd
+from datetime import timedelta
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.spots import SPOTS_TABLE
+from hamcontestlog.contest.spots import qso_spots_sql
+
+
+def make_raw_logs():
+    return pd.DataFrame(
+        {
+            "id": ["a", "b", "c", "d", "e"],
+            "mycall": ["EF6T", "EF6T", "EF6T", "EF6T", "EA3M"],
+            "frequency": [7025, 7025, 14031, 7040, 7025],
+            "datetime": pd.to_datetime(
+                ["2024-11-23 00:05", "2024-11-23 00:30", "2024-11-23 00:05", "2024-11-23 00:12", "2024-11-23 00:05"]
+            ),
+        }
+    )
+
+
+def make_raw_rbn():
+    return pd.DataFrame(
+        {
+            "callsign": ["DK8NE", "OH6BG", "W3LPL", "DK8NE"],
+            "freq": [7025.1, 7025.2, 14025.0, 7025.0],
+            "band": [40, 40, 20, 40],
+            "dx": ["EF6T", "EF6T", "EF6T", "EA3M"],
+            "db": [20, 12, 8, 15],
+            "speed": [30, 31, 28, 26],
+            "datetime": pd.to_datetime(
+                ["2024-11-23 00:01", "2024-11-23 00:04", "2024-11-23 00:02", "2024-11-23 00:06"]
+            ),
+        }
+    )
+
+
+def test_qso_spots_sql_takes_last_spot_within_window():
+    """Test that each QSO gets the last spot of its station on its band, if recent enough."""
+    raw_logs = make_raw_logs()
+    raw_rbn = make_raw_rbn()
+    con = duckdb.connect()
+    con.execute("CREATE SCHEMA cw2024")
+    con.execute("CREATE TABLE cw2024.raw_logs AS SELECT * FROM raw_logs")
+    con.execute("CREATE TABLE cw2024.raw_rbn AS SELECT * FROM raw_rbn")
+    spots = con.execute(f"{qso_spots_sql('cw2024', timedelta(minutes=10))} ORDER BY id").fetchdf()
+    assert spots["spot_skimmer"].tolist()[:2] == ["OH6BG", None]
+    assert spots["spot_age"].tolist()[0] == 60
+    assert spots["running"].tolist() == [True, False, False, False, False]
+    # Spotted on 20 m, but too far from the QSO frequency to be running there
+    assert spots.loc[2, "spot_skimmer"] == "W3LPL"
+    # Spotted on another frequency of the band
+    assert spots.loc[3, "spot_skimmer"] == "OH6BG"
+    # The only spot of EA3M is after the QSO
+    assert pd.isna(spots.loc[4, "spot_skimmer"])
+
+    by_call = con.execute(qso_spots_sql("cw2024", by_call=True), {"mycalls": ["EA3M"]}).fetchdf()
+    assert by_call["id"].tolist() == ["e"]
+
+
+def test_correlate_rbn_by_call_equals_full(tmp_path):
+    """Test that correlating the QSOs of some stations gives the same table as a full rebuild."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with contest.write_session():
+        raw_logs = make_raw_logs()
+        raw_rbn = make_raw_rbn()
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.con.execute("CREATE TABLE cw2024.raw_logs AS SELECT * FROM raw_logs")
+        contest.con.execute("CREATE TABLE cw2024.raw_rbn AS SELECT * FROM raw_rbn")
+        assert contest.correlate_rbn(schema="cw2024") == 5
+
+        # A new QSO and spot of EA3M
+        contest.con.execute("INSERT INTO cw2024.raw_logs VALUES ('f', 'EA3M', 7025, '2024-11-23 00:09')")
+        contest.con.execute(
+            "INSERT INTO cw2024.raw_rbn VALUES ('OH6BG', 7025.1, 40, 'EA3M', 11, 27, '2024-11-23 00:08')"
+        )
+        assert contest.correlate_rbn(schema="cw2024", mycalls=["EA3M"]) == 2
+        query = f"SELECT * FROM cw2024.{SPOTS_TABLE} ORDER BY id"
+        incremental = contest.con.execute(query).fetchdf()
+        assert incremental["spot_skimmer"].tolist()[-1] == "OH6BG"
+
+        contest.correlate_rbn(schema="cw2024")
+        pd.testing.assert_frame_equal(incremental, contest.con.execute(query).fetchdf())
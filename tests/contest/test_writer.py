@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+from datetime import datetime
+import duckdb
+import pandas as pd
+import pytest
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.contest.manifest import MANIFEST_TABLE
+from hamcontestlog.contest.manifest import ManifestEntry
+from hamcontestlog.contest.writer import IngestWriter
+from hamcontestlog.log.base import LogBase
+from hamcontestlog.log.online import LogOnline
+
+
+class RecordingContest:
+    """Stand-in for ContestBase recording the logs replaced in each transaction."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.transactions = []
+
+    @contextmanager
+    def transaction(self):
+        self.transactions.append([])
+        yield
+
+    def replace_logs(self, schema, entries, frames):
+        if self.error is not None:
+            raise self.error
+        self.transactions[-1].extend(e.source for e in entries)
+
+
+def put(writer, source, n_rows):
+    entry = ManifestEntry(source, "hash", source.upper(), n_rows, datetime.now())
+    writer.put(schema="cw2024", entries=[entry], frame=pd.DataFrame({"id": [f"{source}_{i}" for i in range(n_rows)]}))
+
+
+def test_writer_flushes_by_logs():
+    """Test that a transaction is committed every batch_logs logs, and the rest on exit."""
+    contest = RecordingContest()
+    with IngestWriter(contest, batch_logs=2) as writer:
+        for source in "abcde":
+            put(writer, source, n_rows=1)
+    assert contest.transactions == [["a", "b"], ["c", "d"], ["e"]]
+    assert writer.n_logs == 5
+
+
+def test_writer_flushes_by_rows():
+    """Test that a transaction is committed once batch_rows QSOs are queued."""
+    contest = RecordingContest()
+    with IngestWriter(contest, batch_rows=5) as writer:
+        for source, n_rows in zip("abcd", [2, 3, 6, 1]):
+            put(writer, source, n_rows=n_rows)
+    assert contest.transactions == [["a", "b"], ["c"], ["d"]]
+
+
+def test_writer_error_reaches_caller():
+    """Test that an error of the writer thread is raised when leaving the block, and later logs are dropped."""
+    contest = RecordingContest(error=RuntimeError("disk full"))
+    with pytest.raises(RuntimeError, match="disk full"):
+        with IngestWriter(contest, batch_logs=1) as writer:
+            for source in "abc":
+                put(writer, source, n_rows=1)
+    assert len(contest.transactions) == 1
+    assert writer.n_logs == 0
+
+
+def test_writer_error_rolls_back_its_transaction(tmp_path):
+    """Test that a failed batch leaves no QSOs of its logs in the database."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    qsos = LogBase.parse_qsos(["QSO: 7044 CW 2024-11-23 0000 EF6T 599 14 YR8D 599 20\n"])
+    entry = ManifestEntry("ef6t.log", "hash", "EF6T", 1, datetime.now())
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        with pytest.raises(duckdb.Error):
+            with IngestWriter(contest, batch_logs=2) as writer:
+                writer.put(schema="cw2024", entries=[entry], frame=qsos)
+                writer.put(schema="cw2024", entries=[entry._replace(source="bad.log")], frame=qsos.drop(columns="id"))
+        # raw_logs was created within the rolled back transaction
+        assert not contest.has_table(schema="cw2024", table="raw_logs")
+
+
+def test_writer_skips_malformed_streaming_log(tmp_path, caplog):
+    """Test that a streaming log failing to parse is skipped and the other logs of its batch are written."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    text = "START-OF-LOG: 3.0\nCALLSIGN: {call}\nQSO: 7044 CW 2024-11-23 0000 {call} 599 14 YR8D 599 20\n"
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.manifest(schema="cw2024")
+        with IngestWriter(contest, batch_logs=10) as writer:
+            for call in ["EF6T", "EA1XX", "EA3M"]:
+                log_text = text.format(call=call)
+                if call == "EA1XX":
+                    log_text = log_text.replace(" YR8D 599 20", "")
+                log = LogOnline(path=f"{call.lower()}.log", batch_size=1, text=log_text)
+                writer.put_log(schema="cw2024", source=log.path, content_hash=call, log=log)
+        mycalls = contest.con.execute("SELECT mycall FROM cw2024.raw_logs ORDER BY mycall").fetchall()
+        sources = contest.con.execute(f"SELECT source FROM cw2024.{MANIFEST_TABLE} ORDER BY source").fetchall()
+    assert [c[0] for c in mycalls] == ["EA3M", "EF6T"]
+    assert [s[0] for s in sources] == ["ea3m.log", "ef6t.log"]
+    assert writer.n_logs == 2
+    assert "Skipping ea1xx.log: QSO line with missing fields" in caplog.text
@@ -93,3 +93,23 @@ def test_open_file():
     assert "CONTEST: CQ-WW-CW" in content
     assert "QSO:    7044 CW 2024-11-23 0003 EF6T             599 14    VE3NNT           599  04      0" in content
 
+
+
+def test_parse_qsos_columnar():
+    """Test the columnar parser on lines with and without the radio field."""
+    lines = [
+        "QSO:    7044 CW 2024-11-23 0000 EF6T             599 14    YR8D             599  20\n",
+        "QSO:   14041 CW 2024-11-23 2359 EF6T             599 14    W0EAR            599  04      1\n",
+    ]
+    qsos_df = LogBase.parse_qsos(lines)
+    assert list(qsos_df.columns) == [
+        "frequency", "mode", "datetime", "mycall", "myrst", "myexch",
+        "call", "rst", "exch", "radio", "id",
+    ]
+    assert qsos_df["frequency"].tolist() == [7044, 14041]
+    assert qsos_df["radio"].tolist() == ["0", "1"]
+    assert qsos_df["id"].tolist() == ["EF6T_0", "EF6T_1"]
+    assert qsos_df.loc[1, "datetime"] == datetime(2024, 11, 23, 23, 59)
+
+    with pytest.raises(ValueError, match="missing fields"):
+        LogBase.parse_qsos(["QSO: 7044 CW 2024-11-23 0000 EF6T\n"])
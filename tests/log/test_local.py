@@ -2,6 +2,7 @@ import pytest
 import pandas as pd
 from datetime import datetime
 from hamcontestlog.log.local import LogLocal
+from hamcontestlog.utils.frames import concat_frames
 import tempfile
 
 
@@ -73,3 +74,18 @@ def test_loglocal_open_file_reads_correctly():
     assert "CQ-WW-CW" in content
     assert "VE3NNT" not in content  # Confirming only a subset of QSOs were included
 
+
+
+def test_loglocal_streams_batches():
+    """Test that LogLocal in streaming mode yields the same QSOs in batches."""
+    with tempfile.NamedTemporaryFile(mode="w+", delete=False) as tmp:
+        tmp.write(SAMPLE_LOG)
+    eager = LogLocal(tmp.name)
+    streamed = LogLocal(tmp.name, batch_size=2)
+
+    assert streamed.streaming
+    batches = list(streamed.iter_log())
+    assert [len(b) for b in batches] == [2, 1]
+    pd.testing.assert_frame_equal(concat_frames(batches), eager.log)
+    assert batches[1].iloc[0]["id"] == "EF6T_2"
+    pd.testing.assert_frame_equal(streamed.metadata, eager.metadata)
@@ -2,7 +2,7 @@ import pytest
 import pandas as pd
 import io
 from datetime import datetime
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, MagicMock
 from hamcontestlog.log.online import LogOnline
 
 
@@ -31,13 +31,13 @@ QSO:   14041 CW 2024-11-23 0001 EF6T             599 14    W0EAR            599
 """
 
 
-@patch("hamcontestlog.log.online.requests.get")
-def test_logonline_parses_log_correctly(mock_get):
+@patch("hamcontestlog.log.online.get_session")
+def test_logonline_parses_log_correctly(mock_session):
     """Test that LogOnline parses metadata and QSO data from a mocked HTTP response."""
     mock_response = Mock()
     mock_response.status_code = 200
     mock_response.text = SAMPLE_LOG
-    mock_get.return_value = mock_response
+    mock_session.return_value.get.return_value = mock_response
 
     log = LogOnline("http://example.com/mock.log")
     metadata_df = log.metadata
@@ -59,13 +59,30 @@ def test_logonline_parses_log_correctly(mock_get):
     assert qsos_df.iloc[0]["datetime"] == expected_datetime
 
 
-@patch("hamcontestlog.log.online.requests.get")
-def test_logonline_raises_on_bad_status(mock_get):
+@patch("hamcontestlog.log.online.get_session")
+def test_logonline_raises_on_bad_status(mock_session):
     """Test that LogOnline raises a ValueError when URL fetch fails."""
     mock_response = Mock()
     mock_response.status_code = 404
-    mock_get.return_value = mock_response
+    mock_session.return_value.get.return_value = mock_response
 
     with pytest.raises(ValueError, match="Link does not exist"):
         LogOnline("http://example.com/404.log")
 
+
+@patch("hamcontestlog.log.online.get_session")
+def test_logonline_streams_batches(mock_session):
+    """Test that LogOnline in streaming mode parses the response line by line."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_lines.return_value = iter(SAMPLE_LOG.splitlines())
+    mock_session.return_value.get.return_value.__enter__.return_value = mock_response
+
+    log = LogOnline("http://example.com/mock.log", batch_size=1)
+    batches = list(log.iter_log())
+
+    mock_session.return_value.get.assert_called_once_with("http://example.com/mock.log", stream=True)
+    assert [len(b) for b in batches] == [1, 1]
+    assert batches[1].iloc[0]["call"] == "W0EAR"
+    assert batches[1].iloc[0]["id"] == "EF6T_1"
+    assert log.metadata.loc[0, "CALLSIGN"] == "EF6T"
@@ -0,0 +1,60 @@
+import datetime
+import os
+import duckdb
+import pandas as pd
+import pytest
+from hamcontestlog.rbn.archive import RbnArchive
+from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+
+def sort_spots(spots):
+    return spots.sort_values("id", ignore_index=True)
+
+
+def test_archive_read_matches_download(rbn_day, tmp_path):
+    """Test that spots read from the archive equal the downloaded and cleaned ones, dtypes included."""
+    downloaded = ReverseBeaconReader(date=rbn_day).data
+    archived = ReverseBeaconReader(date=rbn_day, archive=RbnArchive(str(tmp_path))).data
+    assert len(downloaded) == 5
+    pd.testing.assert_frame_equal(sort_spots(archived), sort_spots(downloaded))
+
+
+@pytest.fixture
+def archive(rbn_day, tmp_path):
+    # A quote in the path must not break the SQL of the archive
+    return RbnArchive(str(tmp_path / "o'neil archive"))
+
+
+def test_add_day_partitions_by_band(archive, rbn_day):
+    """Test that a day is archived as one partition per band, read back by band and call."""
+    archive.add_day(rbn_day)
+    assert archive.has_day(rbn_day)
+    files = archive.files(dates=[rbn_day])
+    assert [os.path.basename(os.path.dirname(path)) for path in files] == ["band=20", "band=40"]
+    assert archive.files(dates=[rbn_day], bands=[40]) == files[1:]
+    # No temporary directory is left behind
+    assert os.listdir(archive.directory) == [f"day={rbn_day:%Y-%m-%d}"]
+
+    spots = duckdb.connect().execute(f"SELECT band, dx FROM ({archive.scan_sql(dates=[rbn_day], bands=[40])})").fetchall()
+    assert sorted(spots) == [(40, "EA3M"), (40, "EF6T"), (40, "EF6T")]
+    assert sorted(archive.read(dates=[rbn_day], calls=["EA3M", "K1AR"])["dx"]) == ["EA3M", "K1AR"]
+
+
+def test_ensure_days_archives_missing_days_once(archive, rbn_day, monkeypatch):
+    """Test that only days not archived yet are downloaded."""
+    added = []
+    add_day = archive.add_day
+    monkeypatch.setattr(archive, "add_day", lambda date: added.append(date) or add_day(date))
+    archive.ensure_days([rbn_day])
+    archive.ensure_days([rbn_day])
+    assert added == [rbn_day]
+
+
+def test_missing_days_have_no_files(archive, rbn_day):
+    """Test that days not archived have no files, no scan and an empty frame with the spot dtypes."""
+    other = rbn_day + datetime.timedelta(days=1)
+    assert archive.files(dates=[other]) == []
+    assert archive.scan_sql(dates=[other]) is None
+    empty = archive.read(dates=[other])
+    assert empty.empty
+    assert empty.dtypes["band"] == "int16"
@@ -0,0 +1,60 @@
+import sqlite3
+import pytest
+from hamcontestlog.rbn.continents import ContinentCache
+
+
+CONTINENTS = {"EA": "EU", "K": "NA", "JA": "AS"}
+
+
+def resolve(prefix):
+    resolve.calls.append(prefix)
+    return CONTINENTS[prefix]
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    resolve.calls = []
+
+
+def test_lookup_resolves_each_prefix_once():
+    """Test that prefixes are resolved once and unknown ones map to None."""
+    cache = ContinentCache()
+    assert cache.lookup(["EA", "K", "XX"], resolve=resolve) == {"EA": "EU", "K": "NA", "XX": None}
+    assert cache.lookup(["EA", "XX", "JA"], resolve=resolve) == {"EA": "EU", "XX": None, "JA": "AS"}
+    assert sorted(resolve.calls) == ["EA", "JA", "K", "XX"]
+
+
+def test_lookup_is_persisted_across_instances(tmp_path):
+    """Test that lookups stored in the SQLite file are reused by a new cache, except unknown prefixes."""
+    path = str(tmp_path / "continents.sqlite")
+    ContinentCache(path).lookup(["EA", "XX"], resolve=resolve)
+    resolve.calls = []
+
+    assert ContinentCache(path).lookup(["EA", "XX", "K"], resolve=resolve) == {"EA": "EU", "XX": None, "K": "NA"}
+    assert sorted(resolve.calls) == ["K", "XX"]
+
+
+def test_unknown_prefix_is_resolved_by_a_later_cache(tmp_path):
+    """Test that a prefix unknown to one cache gets its continent once the resolver knows it."""
+    path = str(tmp_path / "continents.sqlite")
+    ContinentCache(path).lookup(["XX"], resolve=resolve)
+    with sqlite3.connect(path) as con:
+        assert con.execute("SELECT count(*) FROM continents").fetchone() == (0,)
+
+    CONTINENTS["XX"] = "OC"
+    try:
+        assert ContinentCache(path).lookup(["XX"], resolve=resolve) == {"XX": "OC"}
+    finally:
+        del CONTINENTS["XX"]
+    assert ContinentCache(path).lookup(["XX"], resolve=resolve) == {"XX": "OC"}
+    assert resolve.calls == ["XX", "XX"]
+
+
+def test_legacy_unknown_prefixes_are_resolved_again(tmp_path):
+    """Test that prefixes stored without a continent by earlier versions are not served from the file."""
+    path = str(tmp_path / "continents.sqlite")
+    ContinentCache(path)
+    with sqlite3.connect(path) as con:
+        con.execute("INSERT INTO continents VALUES ('JA', NULL)")
+    assert ContinentCache(path).lookup(["JA"], resolve=resolve) == {"JA": "AS"}
+    assert resolve.calls == ["JA"]
@@ -0,0 +1,25 @@
+import io
+import pandas as pd
+import pytest
+from hamcontestlog.rbn.rbn import ReverseBeaconReader
+from tests.conftest import RBN_CSV
+
+
+def normalized(frame):
+    """Values as Python objects, with every missing value as None."""
+    return frame.astype(object).where(frame.notna(), None)
+
+
+def test_read_csv_pyarrow_and_pandas_agree(monkeypatch):
+    """Test that the Arrow CSV reader and the pandas fallback read the same values and missing fields."""
+    pytest.importorskip("pyarrow")
+    arrow = ReverseBeaconReader.read_csv(io.BytesIO(RBN_CSV.encode()))
+    monkeypatch.setattr("hamcontestlog.rbn.rbn.find_spec", lambda name: None)
+    fallback = ReverseBeaconReader.read_csv(io.BytesIO(RBN_CSV.encode()))
+
+    assert list(arrow.columns) == list(fallback.columns) == list(ReverseBeaconReader.raw_dtypes)
+    pd.testing.assert_frame_equal(normalized(arrow), normalized(fallback))
+    # Empty fields are missing, the "NA" continent is North America
+    assert arrow["de_cont"].isna().tolist() == [False, True, False, False, False, False, False]
+    assert fallback["dx_cont"].isna().sum() == 3
+    assert (fallback["de_cont"] == "NA").sum() == 3
@@ -0,0 +1,42 @@
+import hashlib
+import pandas as pd
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.rbn.rbn import ReverseBeaconReader
+
+
+def test_pandas_and_sql_spot_ids_agree(rbn_csv, rbn_day, tmp_path):
+    """Test that spots cleaned by pandas and by SQL ingestion get the same ids."""
+    spots = ReverseBeaconReader(date=rbn_day).data
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.add_rbn_csv(schema="cw2024", paths=[rbn_csv], calls=spots["dx"].unique().tolist())
+        sql = contest.con.execute("SELECT dx, callsign, datetime, freq, id FROM cw2024.raw_rbn ORDER BY id").fetchdf()
+    expected = spots[["dx", "callsign", "datetime", "freq", "id"]].astype({"dx": object, "callsign": object})
+    pd.testing.assert_frame_equal(sql, expected.sort_values("id", ignore_index=True))
+
+
+def test_legacy_text_ids_are_migrated(rbn_day, tmp_path):
+    """Test that a raw_rbn table with SHA-256 text ids is migrated to unique BIGINT spot ids."""
+    spots = ReverseBeaconReader(date=rbn_day).data
+    legacy = pd.concat([spots, spots.iloc[:1]], ignore_index=True).astype(
+        {"callsign": object, "dx": object, "mode": object, "de_cont": object, "dx_cont": object}
+    )
+    key = legacy["dx"] + legacy["callsign"] + legacy["datetime"].astype(str) + legacy["freq"].astype(str)
+    legacy["id"] = [hashlib.sha256(k.encode()).hexdigest() for k in key]
+
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.con.execute("CREATE TABLE cw2024.raw_rbn AS SELECT * FROM legacy")
+        contest.migrate_rbn_ids(schema="cw2024")
+        types = dict(
+            contest.con.execute(
+                "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'raw_rbn'"
+            ).fetchall()
+        )
+        ids = [i[0] for i in contest.con.execute("SELECT id FROM cw2024.raw_rbn ORDER BY id").fetchall()]
+        # Spots already stored are skipped by their new ids
+        assert contest.add_rbn(schema="cw2024", rbn=ReverseBeaconReader(date=rbn_day)) == 0
+    assert types["id"] == "BIGINT"
+    assert ids == sorted(spots["id"].tolist())
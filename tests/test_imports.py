@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+
+# Cumulative import time allowed for the command line entry point, in seconds
+CLI_IMPORT_BUDGET = 0.5
+
+HEAVY_MODULES = ("duckdb", "numpy", "pandas", "pyhamtools", "requests")
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter, so that no module is imported yet."""
+    return subprocess.run([sys.executable, *options, "-c", code], capture_output=True, text=True, check=True)
+
+
+def test_cli_and_utils_do_not_import_heavy_modules():
+    """Test that the entry point and utils load pyhamtools, pandas, duckdb and requests lazily."""
+    out = run_python(
+        "import sys, hamcontestlog.__main__, hamcontestlog.utils\n"
+        f"print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert out.stdout.strip() == "[]"
+
+
+def test_cli_import_time_budget():
+    """Test that importing the command line entry point stays within its budget."""
+    out = run_python("import hamcontestlog.__main__", "-X", "importtime")
+    cumulative = next(
+        int(line.split("|")[1]) for line in out.stderr.splitlines() if line.rstrip().endswith("| hamcontestlog.__main__")
+    )
+    assert cumulative / 1e6 < CLI_IMPORT_BUDGET
+
+
+def test_contest_import_does_not_load_countryfile():
+    """Test that importing contests and RBN modules does not build a Callinfo (which downloads the countryfile)."""
+    run_python(
+        "import pyhamtools\n"
+        "def fail(*args, **kwargs):\n"
+        "    raise AssertionError('countryfile loaded at import time')\n"
+        "pyhamtools.LookupLib.__init__ = fail\n"
+        "import hamcontestlog.contest.cqww, hamcontestlog.contest.iaru, hamcontestlog.rbn.archive"
+    )
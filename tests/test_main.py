@@ -0,0 +1,66 @@
+import duckdb
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+from hamcontestlog import __main__
+
+
+@pytest.fixture
+def storage_path(tmp_path):
+    path = str(tmp_path / "contest.duckdb")
+    con = duckdb.connect(path)
+    con.execute("CREATE SCHEMA cw2024")
+    con.execute("CREATE TABLE cw2024.raw_logs AS SELECT * FROM (VALUES ('EF6T', 'K1AR'), ('EF6T', 'DL1ABC')) t(mycall, call)")
+    con.close()
+    return path
+
+
+def test_query_prints_result(storage_path):
+    """Test that the query command prints the result in the requested format."""
+    result = CliRunner().invoke(
+        __main__.main, ["--db", storage_path, "query", "SELECT call FROM cw2024.raw_logs ORDER BY call", "--format", "csv"]
+    )
+    assert result.exit_code == 0, result.output
+    assert result.output == "call\nDL1ABC\nK1AR\n"
+
+
+def test_export_with_profile(storage_path, tmp_path):
+    """Test that a table is exported to Parquet and the profile reports the export stage."""
+    output = str(tmp_path / "raw_logs.parquet")
+    result = CliRunner().invoke(__main__.main, ["--db", storage_path, "--profile", "export", "cw2024.raw_logs", output])
+    assert result.exit_code == 0, result.output
+    assert "2 rows written" in result.output
+    assert "export" in result.output.splitlines()[-1]
+    assert len(pd.read_parquet(output)) == 2
+
+
+def test_ingest_requires_db():
+    """Test that commands using the database fail with a usage error without --db."""
+    result = CliRunner(env={"HAMCONTESTLOG_DB": None}).invoke(__main__.main, ["ingest", "logs", "--year", "2024"])
+    assert result.exit_code == 2
+    assert "--db" in result.output
+
+
+def test_schema_export_and_import(storage_path, tmp_path):
+    """Test that a schema exported by one database is imported into another one."""
+    directory = str(tmp_path / "cw2024")
+    result = CliRunner().invoke(__main__.main, ["--db", storage_path, "export-schema", "cw2024", directory])
+    assert result.exit_code == 0, result.output
+    assert "cw2024.raw_logs: 2 rows" in result.output
+    target = str(tmp_path / "target.duckdb")
+    result = CliRunner().invoke(__main__.main, ["--db", target, "import-schema", directory, "--schema", "cw2024b"])
+    assert result.exit_code == 0, result.output
+    assert duckdb.connect(target).execute("SELECT count(*) FROM cw2024b.raw_logs").fetchone()[0] == 2
+
+
+def test_ingest_prints_progress_on_stderr(tmp_path):
+    """Test that the progress and warnings logged by an ingestion are printed by the CLI."""
+    log = "START-OF-LOG: 3.0\nCALLSIGN: EF6T\nQSO: 7044 CW 2024-11-23 0000 EF6T 599 14 YR8D 599 20\nEND-OF-LOG:\n"
+    (tmp_path / "ef6t.log").write_text(log)
+    (tmp_path / "broken.log").write_text(log.replace(" YR8D 599 20", ""))
+    args = ["--db", str(tmp_path / "contest.duckdb"), "ingest", "logs", "--path", str(tmp_path), "--schema", "cw2024"]
+    result = CliRunner().invoke(__main__.main, args + ["--parse-workers", "1"])
+    assert result.exit_code == 0, result.output
+    assert result.stdout == ""
+    assert f"Skipping {tmp_path / 'broken.log'}: QSO line with missing fields" in result.stderr
+    assert "1 logs ingested, 1 unchanged or skipped" in result.stderr
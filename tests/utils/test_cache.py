@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from unittest.mock import MagicMock
+from hamcontestlog.utils.cache import CacheMissError
+from hamcontestlog.utils.cache import HttpCache
+
+
+def make_session(responses):
+    """Mock session returning (status, body, headers) tuples in order."""
+    session = MagicMock()
+    mocks = []
+    for status, body, headers in responses:
+        response = MagicMock()
+        response.status_code = status
+        response.headers = headers
+        response.encoding = "utf-8"
+        response.iter_content.return_value = [body]
+        mocks.append(response)
+    session.get.return_value.__enter__.side_effect = mocks
+    return session
+
+
+def test_cache_stores_and_revalidates(tmp_path):
+    """Test that a cached URL is revalidated with its ETag and served on 304."""
+    cache = HttpCache(str(tmp_path))
+    session = make_session([(200, b"QSO: 1\nQSO: 2\n", {"ETag": '"abc"'}), (304, b"", {})])
+
+    first = cache.get("http://example.com/a.log", session=session)
+    assert first.status_code == 200
+    assert not first.from_cache
+    assert first.text == "QSO: 1\nQSO: 2\n"
+
+    second = cache.get("http://example.com/a.log", session=session)
+    assert second.from_cache
+    assert list(second.iter_lines()) == ["QSO: 1", "QSO: 2"]
+    assert session.get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+
+
+def test_cache_offline(tmp_path):
+    """Test that offline mode serves cached URLs and fails on misses."""
+    HttpCache(str(tmp_path)).get("http://example.com/a.log", session=make_session([(200, b"log", {})]))
+    offline = HttpCache(str(tmp_path), offline=True)
+    session = MagicMock()
+
+    assert offline.get("http://example.com/a.log", session=session).text == "log"
+    with pytest.raises(CacheMissError):
+        offline.get("http://example.com/b.log", session=session)
+    session.get.assert_not_called()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the size cap evicts the least recently used bodies."""
+    cache = HttpCache(str(tmp_path), max_size=10)
+    session = make_session([(200, b"aaaaaa", {}), (200, b"bbbbbb", {})])
+    cache.get("http://example.com/a.log", session=session)
+    cache.get("http://example.com/b.log", session=session)
+
+    with pytest.raises(CacheMissError):
+        HttpCache(str(tmp_path), offline=True).get("http://example.com/a.log", session=session)
+    assert HttpCache(str(tmp_path), offline=True).get("http://example.com/b.log", session=session).text == "bbbbbb"
+
+
+def test_cache_keeps_body_larger_than_max_size(tmp_path):
+    """Test that a body larger than the size cap is returned, and evicted by the next one."""
+    cache = HttpCache(str(tmp_path), max_size=4)
+    session = make_session([(200, b"aaaaaaaa", {}), (200, b"bbbbbbbb", {})])
+
+    first = cache.get("http://example.com/a.log", session=session)
+    assert first.content == b"aaaaaaaa"
+    assert HttpCache(str(tmp_path), offline=True).get("http://example.com/a.log", session=session).text == "aaaaaaaa"
+
+    second = cache.get("http://example.com/b.log", session=session)
+    assert list(second.iter_lines()) == ["bbbbbbbb"]
+    with pytest.raises(CacheMissError):
+        HttpCache(str(tmp_path), offline=True).get("http://example.com/a.log", session=session)
+
+
+def test_cache_downloads_again_when_evicted_before_304(tmp_path):
+    """Test that a 304 for a body evicted in the meantime downloads it again."""
+    cache = HttpCache(str(tmp_path))
+    session = make_session([(200, b"old", {"ETag": '"a"'}), (304, b"", {}), (200, b"new", {"ETag": '"b"'})])
+    cache.get("http://example.com/a.log", session=session)
+    hit = cache._hit
+
+    def evicted_hit(url, in_memory):
+        # Another thread evicts the body between the lookup and the 304
+        cache.max_size = 0
+        cache.evict()
+        cache.max_size, cache._hit = 2 * 1024**3, hit
+        return hit(url, in_memory)
+
+    cache._hit = evicted_hit
+    cached = cache.get("http://example.com/a.log", session=session, in_memory=True)
+    assert cached.content == b"new"
+    assert session.get.call_args.kwargs["headers"] == {}
+
+
+def test_cache_concurrent_gets_with_eviction(tmp_path):
+    """Test that threads sharing a small cache never lose the body they get."""
+    cache = HttpCache(str(tmp_path), max_size=64)
+
+    def get(i):
+        body = f"QSO: {i}\n".encode() * 10
+        response = MagicMock(status_code=200, headers={}, encoding="utf-8")
+        response.iter_content.return_value = [body]
+        session = MagicMock()
+        session.get.return_value.__enter__.return_value = response
+        cached = cache.get(f"http://example.com/{i % 8}.log", session=session, in_memory=True)
+        return cached.content == body and list(cached.iter_lines()) == [f"QSO: {i}"] * 10
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(get, range(200)))
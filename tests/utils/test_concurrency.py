@@ -0,0 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+from hamcontestlog.utils.concurrency import bounded_map
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool counting the tasks submitted to it."""
+
+    submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_bounded_map_limits_pending_futures():
+    """Test that no more than max_pending tasks are submitted and not yet consumed, and every item is yielded once."""
+    consumed = []
+    with CountingExecutor(max_workers=4) as executor:
+        for item, future in bounded_map(executor, lambda x: time.sleep(0.001 * (x % 3)) or x * 2, range(50), 3):
+            assert executor.submitted - len(consumed) <= 3
+            assert future.result() == item * 2
+            consumed.append(item)
+    assert sorted(consumed) == list(range(50))
+    assert executor.submitted == 50
@@ -0,0 +1,36 @@
+import pandas as pd
+from hamcontestlog.contest.cqww import ContestCQWW
+from hamcontestlog.log.base import QSO_SQL_TYPES, LogBase
+from hamcontestlog.utils.frames import concat_frames
+
+
+LINES = [
+    "QSO:    7044 CW 2024-11-23 0000 EF6T             599 14    YR8D             599  20\n",
+    "QSO:   14041 CW 2024-11-23 2359 EF6T             599 14    W0EAR            599  04      1\n",
+    "QSO:   21041 CW 2024-11-24 0100 EF6T             599 14    JA1ABC           599  25      1\n",
+]
+
+
+def test_concat_frames_keeps_categoricals():
+    """Test that batches with different categories concatenate into categoricals with all values."""
+    batches = [LogBase.parse_qsos(LINES[:2]), LogBase.parse_qsos(LINES[2:], start=2)]
+    frame = concat_frames(batches)
+    assert isinstance(frame["exch"].dtype, pd.CategoricalDtype)
+    assert frame["exch"].tolist() == ["20", "04", "25"]
+    pd.testing.assert_frame_equal(frame, LogBase.parse_qsos(LINES))
+
+
+def test_compact_frames_are_stored_with_plain_types(tmp_path):
+    """Test that categoricals and narrow integers are stored as VARCHAR and BIGINT columns, not ENUMs."""
+    contest = ContestCQWW(str(tmp_path / "contest.duckdb"))
+    with contest.write_session():
+        contest.con.execute("CREATE SCHEMA cw2024")
+        contest.insert_log_frame(schema="cw2024", frame=LogBase.parse_qsos(LINES))
+        types = dict(
+            contest.con.execute(
+                "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'raw_logs'"
+            ).fetchall()
+        )
+        radios = contest.con.execute("SELECT radio FROM cw2024.raw_logs ORDER BY id").fetchall()
+    assert types == QSO_SQL_TYPES
+    assert radios == [("0",), ("1",), ("1",)]
@@ -0,0 +1,15 @@
+from hamcontestlog.utils.http import get_session
+
+
+def test_session_retries_and_pools_connections():
+    """Test that the shared session retries 429/5xx responses with backoff and pools connections."""
+    session = get_session(pool_size=4, retries=3, backoff_factor=0.1)
+    for prefix in ["http://", "https://"]:
+        adapter = session.get_adapter(f"{prefix}example.com")
+        assert adapter.max_retries.total == 3
+        assert adapter.max_retries.backoff_factor == 0.1
+        assert set(adapter.max_retries.status_forcelist) == {429, 500, 502, 503, 504}
+        assert not adapter.max_retries.raise_on_status
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 4
+    assert get_session(pool_size=4, retries=3, backoff_factor=0.1) is session
+    assert get_session() is not session
@@ -0,0 +1,54 @@
+import duckdb
+import pandas as pd
+import pytest
+from pyhamtools import Callinfo
+from hamcontestlog.utils.prefixes import COUNTRYFILE_ATTRIBUTES
+from hamcontestlog.utils.prefixes import calls_info_sql
+from hamcontestlog.utils.prefixes import create_prefix_table
+from hamcontestlog.utils.prefixes import prefix_frame
+from tests.conftest import ENTITIES
+
+
+def test_prefix_frame_exports_countryfile(lookuplib):
+    """Test that prefixes and exact callsigns are exported with their data."""
+    prefixes = prefix_frame(lookuplib).set_index("prefix")
+    assert len(prefixes) == len(ENTITIES)
+    assert prefixes.loc["EA8", "continent"] == "AF"
+    assert prefixes.loc["EA8", "cqz"] == 33
+    assert prefixes["exact"].sum() == 1
+    assert prefixes.loc["EA8URE", "exact"]
+
+
+def test_lookuplib_keeps_countryfile_indices(lookuplib):
+    """Test that pyhamtools still keeps the countryfile entries in the private attributes prefix_frame reads."""
+    for attribute in COUNTRYFILE_ATTRIBUTES:
+        assert hasattr(lookuplib, attribute), f"pyhamtools LookupLib has no {attribute}"
+
+
+def test_prefix_frame_fails_clearly_without_indices():
+    """Test that a LookupLib without the countryfile indices raises a clear error."""
+    with pytest.raises(RuntimeError, match="has no _prefixes_index, _prefixes"):
+        prefix_frame(object())
+
+
+def test_calls_info_sql_matches_callinfo(lookuplib):
+    """Test that the vectorized lookup resolves calls like Callinfo."""
+    calls = [
+        "EA3M", "ea6sx", "EA8BH", "EA8URE", "DL1ABC", "DL1ABC/P", "EA8/DL1ABC", "DL1ABC/EA8", "K1AR",
+        "K1AR/6", "W6XX/KH6", "KH6/W6XX", "EA3M/QRP", "EA3M-1", "DL1ABC/EA6/P", "ZS1ABC",
+    ]
+    con = duckdb.connect()
+    create_prefix_table(con, name="call_prefixes", frame=prefix_frame(lookuplib))
+    con.execute("CREATE TABLE calls AS SELECT unnest(?::VARCHAR[]) AS call", [calls])
+    info = con.execute(calls_info_sql("calls")).fetchdf().set_index("call")
+
+    call_info = Callinfo(lookuplib)
+    for call in calls:
+        try:
+            expected = call_info.get_all(call)
+        except KeyError:
+            assert pd.isna(info.loc[call, "country"]), call
+            continue
+        assert info.loc[call, "country"] == expected["country"], call
+        assert info.loc[call, "continent"] == expected["continent"], call
+        assert info.loc[call, "cqz"] == expected["cqz"], call
@@ -0,0 +1,44 @@
+import threading
+import time
+import pytest
+from hamcontestlog.utils.profiling import hooked
+from hamcontestlog.utils.profiling import profiling
+from hamcontestlog.utils.profiling import stage
+
+
+def test_hooks_receive_events():
+    """Test that hooks get one event per task, including failed ones, and only while registered."""
+    events = []
+    with hooked(events.append):
+        with stage("download", nbytes=100) as task:
+            task.add(retries=2, cache_hits=1)
+        with pytest.raises(ValueError):
+            with stage("parse"):
+                raise ValueError("bad log")
+    with stage("write"):
+        pass
+    assert [(e.name, e.bytes, e.retries, e.cache_hits, e.failed) for e in events] == [
+        ("download", 100, 2, 1, False),
+        ("parse", 0, 0, 0, True),
+    ]
+
+
+def test_concurrent_tasks_count_wall_time_once():
+    """Test that overlapping tasks add up busy time but not wall time."""
+
+    def work():
+        with stage("download", nbytes=100) as task:
+            time.sleep(0.2)
+            task.add(rows=10)
+
+    with profiling() as profiler:
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    stats = profiler.stages["download"]
+    assert (stats.tasks, stats.rows, stats.bytes) == (4, 40, 400)
+    assert stats.busy >= 0.8
+    assert stats.wall < 0.6
+    assert "download" in profiler.report()